@@ -1,8 +1,13 @@
 """Agent module for ReAct loop implementation."""
 
-from .react_agent import ReActAgent
-
-__all__ = ["ReActAgent"]
+from .printshop_agent import OrderContext, OrderState, PrintShopAgent
+from .react_agent import AgentRun, ReActAgent
+from .trace import JsonlTraceSink, TraceBuffer
+
+__all__ = [
+    "OrderContext", "OrderState", "PrintShopAgent",
+    "AgentRun", "ReActAgent", "JsonlTraceSink", "TraceBuffer",
+]
 
 
 
@@ -0,0 +1,362 @@
+"""
+ReAct Agent for Print Shop Order Processing
+Implements the three-layer guardrail system with tool-based reasoning.
+"""
+
+import os
+import json
+import re
+import threading
+
+# Handle both relative and absolute imports
+try:
+    from tools.shop_capabilities import check_spec_compatibility
+    from tools.inventory_tool import check_stock
+    from tools.pricing_tool import quote_price
+    from tools.resolution_tool import evaluate_resolution, measure_artwork
+    from tools.analysis_context import AnalysisContext
+    from instrumentation import REJECTION, record_event
+    from guardrails.pipeline import COST_DECODE, COST_FILESYSTEM, COST_LOOKUP, GuardrailPipeline, Stage
+except ImportError:
+    from ..tools.shop_capabilities import check_spec_compatibility
+    from ..tools.inventory_tool import check_stock
+    from ..tools.pricing_tool import quote_price
+    from ..tools.resolution_tool import evaluate_resolution, measure_artwork
+    from ..tools.analysis_context import AnalysisContext
+    from ..instrumentation import REJECTION, record_event
+    from ..guardrails.pipeline import COST_DECODE, COST_FILESYSTEM, COST_LOOKUP, GuardrailPipeline, Stage
+
+# System prompt for the agent
+SYSTEM_PROMPT = """
+You are an AI Order Guardrail Agent for Tim's Print Shop. Your job is to validate orders
+and catch errors before they reach human technicians.
+
+You have access to three tools:
+1. check_inventory(paper_type, quantity) - Check if paper is in stock
+2. check_resolution(file_path, width_inch, height_inch) - Check image DPI quality
+3. calculate_price(size, paper_type, quantity) - Get official pricing
+
+CRITICAL RULES:
+- NEVER estimate or guess prices. ONLY use the calculate_price tool.
+- If you mention a price without calling calculate_price, that's a HALLUCINATION.
+- Always validate orders through all three guardrail layers:
+  Layer 1: Spec-Check (shop capabilities)
+  Layer 2: Pre-flight (file resolution)
+  Layer 3: Final Quote (must use calculate_price tool)
+
+When an order fails validation, clearly explain what's wrong and ask the user to fix it.
+"""
+
+
+class OrderContext:
+    """
+    Mutable state for processing one order: tool calls made and reasoning steps.
+    
+    A new context is created per order, so any number of orders can run through
+    one shared PrintShopAgent concurrently. Orders in one batch can share an
+    AnalysisContext so a file used by several line items is checked once, and
+    successive validations in one form session share one so that only the
+    tool calls whose inputs changed run again.
+    """
+    
+    def __init__(self, analysis=None):
+        self.tool_calls = []
+        self.reasoning_steps = []
+        self.analysis = analysis if analysis is not None else AnalysisContext()
+    
+    def record_tool_call(self, tool, args, result):
+        self.tool_calls.append({
+            "tool": tool,
+            "args": args,
+            "result": result
+        })
+
+
+class OrderState:
+    """A parsed order and the results of the guardrail stages that have run on it."""
+    
+    def __init__(self, context, paper, quantity, file_path, size_name, width_inch, height_inch):
+        self.context = context
+        self.paper = paper
+        self.quantity = quantity
+        self.file_path = file_path
+        self.size_name = size_name
+        self.width_inch = width_inch
+        self.height_inch = height_inch
+        self.inventory = None
+        self.price = None
+        self.resolution = None
+
+
+class PrintShopAgent:
+    """
+    ReAct-style agent for processing print orders with guardrails.
+    
+    The agent itself holds no per-order state (that lives in an OrderContext),
+    so a single instance can be shared across threads and requests.
+    
+    The guardrail layers run as a cost-ordered pipeline: lookups (spec check,
+    inventory, pricing) first, the file decode last, stopping at the first
+    failure - so an impossible or out-of-stock order never touches the file.
+    """
+    
+    def __init__(self):
+        # Each thread's most recent context, for callers that read agent.tool_calls afterwards
+        self._local = threading.local()
+        
+        self.pipeline = GuardrailPipeline([
+            Stage("spec_check", self._check_spec, COST_LOOKUP),
+            Stage("inventory", self._check_inventory, COST_LOOKUP),
+            Stage("quote", self._quote, COST_LOOKUP, requires=("spec_check", "inventory")),
+            Stage("output_guardrail", self._check_price_source, COST_LOOKUP, requires=("quote",)),
+            Stage("file_present", self._check_file_present, COST_FILESYSTEM),
+            Stage("preflight", self._preflight, COST_DECODE, requires=("spec_check", "file_present")),
+        ])
+    
+    @property
+    def tool_calls(self):
+        """Tool calls of the last order processed on this thread."""
+        context = getattr(self._local, "context", None)
+        return context.tool_calls if context else []
+    
+    @property
+    def reasoning_steps(self):
+        """Reasoning steps of the last order processed on this thread."""
+        context = getattr(self._local, "context", None)
+        return context.reasoning_steps if context else []
+    
+    def _extract_tool_call(self, text):
+        """Extract tool calls from agent response (format: TOOL_NAME(arg1, arg2))"""
+        pattern = r'(\w+)\(([^)]+)\)'
+        matches = re.findall(pattern, text)
+        return matches
+    
+    def _parse_tool_args(self, args_str):
+        """Parse tool arguments from string"""
+        # Simple parsing - handles strings and numbers
+        args = []
+        current = ""
+        in_quotes = False
+        
+        for char in args_str:
+            if char == '"' or char == "'":
+                in_quotes = not in_quotes
+            elif char == ',' and not in_quotes:
+                args.append(current.strip().strip('"').strip("'"))
+                current = ""
+                continue
+            current += char
+        
+        if current:
+            args.append(current.strip().strip('"').strip("'"))
+        
+        return args
+    
+    def process_order(self, order_data, context=None):
+        """
+        Main order processing function with three-layer guardrails.
+        
+        Args:
+            order_data: dict with keys:
+                - email: str
+                - name: str (optional)
+                - size: str (e.g., "8x10")
+                - paper: str (optional)
+                - quantity: int (default 1)
+                - file_path: str (path to uploaded file)
+                - filename: str
+            context: OrderContext to record into (a fresh one by default)
+        
+        Returns:
+            dict with validation results and response
+        """
+        context = context if context is not None else OrderContext()
+        self._local.context = context
+        
+        result = self._process_order(order_data, context)
+        if not result.get("valid"):
+            record_event(REJECTION, result.get("layer", "input"))
+        return result
+    
+    def _process_order(self, order_data, context):
+        """Parse the order, then run it through the guardrail pipeline (see process_order)."""
+        # Extract order details
+        size = order_data.get('size', '')
+        paper = order_data.get('paper', '100lb Matte')  # Default
+        quantity = order_data.get('quantity', 1)
+        file_path = order_data.get('file_path', '')
+        
+        # Parse size
+        size_parts = size.split(',')
+        if len(size_parts) == 2:
+            width_inch, height_inch = map(float, size_parts)
+            size_name = f"{int(width_inch)}x{int(height_inch)}"
+        else:
+            # Try to parse from size string like "8x10"
+            size_match = re.match(r'(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)', size)
+            if size_match:
+                width_inch = float(size_match.group(1))
+                height_inch = float(size_match.group(2))
+                size_name = size
+            else:
+                return {
+                    "valid": False,
+                    "error": "Invalid size format. Expected format: 'width,height' or '8x10'",
+                    "reasoning": context.reasoning_steps
+                }
+        
+        state = OrderState(context, paper, quantity, file_path, size_name, width_inch, height_inch)
+        rejection = self.pipeline.run(state)
+        if rejection is not None:
+            rejection["reasoning"] = context.reasoning_steps
+            return rejection
+        
+        # ============================================
+        # SUCCESS: All guardrails passed
+        # ============================================
+        resolution_result = state.resolution
+        price_result = state.price
+        return {
+            "valid": True,
+            "message": "Order validated successfully! All guardrails passed.",
+            "order_summary": {
+                "size": size_name,
+                "dimensions": f"{width_inch}\" x {height_inch}\"",
+                "paper": state.inventory.get("paper", paper),
+                "quantity": quantity,
+                "file_quality": {
+                    "dpi": resolution_result["dpi"],
+                    "quality": resolution_result["quality"],
+                    "pixel_dimensions": resolution_result["pixel_dimensions"]
+                },
+                "price": price_result["formatted_price"],
+                "price_breakdown": {
+                    "per_sheet": f"${price_result['per_sheet_price']:.2f}",
+                    "subtotal": f"${price_result['subtotal']:.2f}",
+                    "discount": f"{price_result['discount_rate']*100:.0f}%",
+                    "total": price_result["formatted_price"]
+                }
+            },
+            "tool_calls": context.tool_calls,
+            "reasoning": context.reasoning_steps
+        }
+    
+    # ============================================
+    # LAYER 1: SPEC-CHECK GUARDRAIL (Input)
+    # ============================================
+    def _check_spec(self, state):
+        context = state.context
+        context.reasoning_steps.append("🔍 Layer 1: Checking order specifications against shop capabilities...")
+        
+        order_spec = {
+            'paper': state.paper,
+            'size': state.size_name,
+            'quantity': state.quantity
+        }
+        
+        spec_check = context.analysis.call("check_spec_compatibility", check_spec_compatibility, order_spec=order_spec)
+        
+        if not spec_check["valid"]:
+            return {
+                "valid": False,
+                "layer": "spec_check",
+                "errors": spec_check["errors"],
+                "warnings": spec_check["warnings"],
+                "message": "Order rejected: " + "; ".join(spec_check["errors"])
+            }
+        
+        if spec_check["warnings"]:
+            context.reasoning_steps.append(f"⚠️ Warnings: {', '.join(spec_check['warnings'])}")
+        
+        context.reasoning_steps.append("✅ Layer 1 passed: Order specifications are valid.")
+        return None
+    
+    # ============================================
+    # LAYER 2: PRE-FLIGHT GUARDRAIL (Action)
+    # ============================================
+    def _check_file_present(self, state):
+        state.context.reasoning_steps.append("🔍 Layer 2: Checking file resolution (pre-flight)...")
+        
+        if not state.file_path or not os.path.exists(state.file_path):
+            return {
+                "valid": False,
+                "layer": "preflight",
+                "error": "File not found. Please upload a valid file."
+            }
+        return None
+    
+    def _preflight(self, state):
+        context = state.context
+        
+        # check_resolution: the file is measured once per context; the DPI for this size is arithmetic
+        measurement = context.analysis.call("measure_artwork", measure_artwork, file_path=state.file_path)
+        resolution_result = evaluate_resolution(measurement, state.width_inch, state.height_inch)
+        context.record_tool_call("check_resolution", [state.file_path, state.width_inch, state.height_inch],
+                                 resolution_result)
+        
+        if "error" in resolution_result:
+            return {
+                "valid": False,
+                "layer": "preflight",
+                "error": resolution_result["error"]
+            }
+        
+        if not resolution_result["valid"]:
+            return {
+                "valid": False,
+                "layer": "preflight",
+                "error": resolution_result["message"],
+                "dpi": resolution_result["dpi"],
+                "message": f"File quality too low: {resolution_result['message']}. Please upload a higher resolution image."
+            }
+        
+        context.reasoning_steps.append(f"✅ Layer 2 passed: {resolution_result['message']}")
+        state.resolution = resolution_result
+        return None
+    
+    # ============================================
+    # LAYER 3: FINAL QUOTE GUARDRAIL (Output)
+    # ============================================
+    def _check_inventory(self, state):
+        context = state.context
+        context.reasoning_steps.append("🔍 Layer 3: Checking inventory...")
+        
+        # Not memoized: stock can change between validations in one form session
+        inventory_result = check_stock(state.paper, state.quantity)
+        context.record_tool_call("check_inventory", [state.paper, state.quantity], inventory_result)
+        
+        if not inventory_result["available"]:
+            return {
+                "valid": False,
+                "layer": "inventory",
+                "error": inventory_result["message"],
+                "available_options": inventory_result.get("available_options", [])
+            }
+        
+        state.inventory = inventory_result
+        return None
+    
+    def _quote(self, state):
+        context = state.context
+        context.reasoning_steps.append("🔍 Layer 3: Calculating official price...")
+        
+        # Calculate price using official tool
+        price_result = context.analysis.call(
+            "calculate_price", quote_price, size=state.size_name, paper_type=state.paper, quantity=state.quantity
+        )
+        context.record_tool_call("calculate_price", [state.size_name, state.paper, state.quantity], price_result)
+        
+        context.reasoning_steps.append(f"✅ Layer 3 passed: Price calculated: {price_result['formatted_price']}")
+        state.price = price_result
+        return None
+    
+    def _check_price_source(self, state):
+        # OUTPUT GUARDRAIL: Verify no price hallucination
+        # This ensures the price came from the tool, not from the agent's imagination
+        if not any(call["tool"] == "calculate_price" for call in state.context.tool_calls):
+            return {
+                "valid": False,
+                "layer": "output_guardrail",
+                "error": "PRICE HALLUCINATION DETECTED: Agent attempted to provide price without using calculate_price tool."
+            }
+        return None
@@ -2,13 +2,19 @@
 
 from typing import Dict, Any, List, Optional, Callable
 import json
+import threading
+import time
+import uuid
 from pathlib import Path
 
+from .trace import JsonlTraceSink, RecentTraces, TraceBuffer, summarize_tool_calls
+
 # Handle both relative and absolute imports
 try:
     from tools.inventory_tool import check_inventory
     from tools.resolution_tool import check_resolution
     from tools.pricing_tool import calculate_price
+    from tools.analysis_context import AnalysisContext
     from guardrails.spec_check_guardrail import SpecCheckGuardrail
     from guardrails.preflight_guardrail import PreflightGuardrail
     from guardrails.quote_guardrail import QuoteGuardrail
@@ -17,11 +23,31 @@ except ImportError:
     from ..tools.inventory_tool import check_inventory
     from ..tools.resolution_tool import check_resolution
     from ..tools.pricing_tool import calculate_price
+    from ..tools.analysis_context import AnalysisContext
     from ..guardrails.spec_check_guardrail import SpecCheckGuardrail
     from ..guardrails.preflight_guardrail import PreflightGuardrail
     from ..guardrails.quote_guardrail import QuoteGuardrail
 
 
+class AgentRun:
+    """
+    Per-order state of a ReActAgent: tool call history, observations and the
+    AnalysisContext memo. One is created for each order, so a single agent can
+    process many orders concurrently.
+    
+    Histories are bounded ring buffers, and nothing outlives the order except
+    a small summary (and the full trace, if the agent has a trace sink).
+    """
+    
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self.tool_calls_history = TraceBuffer()
+        self.observation_history = TraceBuffer()
+        # Per-order memo of tool results, shared with the guardrails
+        self.context = AnalysisContext()
+
+
 class ReActAgent:
     """
     ReAct loop agent for processing print shop orders with multi-layered guardrails.
@@ -30,9 +56,20 @@ class ReActAgent:
     1. Think: Analyze the current situation
     2. Act: Use a tool or provide final answer
     3. Observe: Process tool results and continue
+    
+    The agent holds only shared, read-only state (guardrails and the tool
+    table); everything about an order lives in its AgentRun. Methods called
+    without an explicit run use the calling thread's current run.
     """
     
-    def __init__(self):
+    def __init__(self, trace_sink: Optional[JsonlTraceSink] = None):
+        """
+        Args:
+            trace_sink: Optional sink that receives each completed order's full trace
+        """
+        self.trace_sink = trace_sink
+        self.recent_traces = RecentTraces()
+        
         self.spec_check = SpecCheckGuardrail()
         self.preflight = PreflightGuardrail()
         self.quote_guardrail = QuoteGuardrail()
@@ -57,8 +94,26 @@ class ReActAgent:
             }
         }
         
-        self.tool_calls_history: List[Dict[str, Any]] = []
-        self.observation_history: List[str] = []
+        self._local = threading.local()
+    
+    def current_run(self) -> AgentRun:
+        """The calling thread's current run (created on first use)."""
+        run = getattr(self._local, "run", None)
+        if run is None:
+            run = self._local.run = AgentRun()
+        return run
+    
+    @property
+    def tool_calls_history(self) -> TraceBuffer:
+        return self.current_run().tool_calls_history
+    
+    @property
+    def observation_history(self) -> TraceBuffer:
+        return self.current_run().observation_history
+    
+    @property
+    def context(self) -> AnalysisContext:
+        return self.current_run().context
     
     def get_system_prompt(self) -> str:
         """Get the system prompt with shop capabilities."""
@@ -103,12 +158,16 @@ CRITICAL RULES:
         
         return base_prompt + tools_description
     
-    def call_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
+    def call_tool(self, tool_name: str, run: Optional[AgentRun] = None, **kwargs) -> Dict[str, Any]:
         """
         Call a tool by name.
         
+        Within an order, repeated calls with equivalent arguments are served
+        from the order's AnalysisContext instead of re-running the tool.
+        
         Args:
             tool_name: Name of the tool to call
+            run: The order's AgentRun (defaults to this thread's current run)
             **kwargs: Arguments to pass to the tool
         
         Returns:
@@ -121,12 +180,13 @@ CRITICAL RULES:
             }
         
         tool = self.tools[tool_name]
+        run = run if run is not None else self.current_run()
         
         try:
-            result = tool["function"](**kwargs)
+            result = run.context.call(tool_name, tool["function"], **kwargs)
             
             # Record tool call
-            self.tool_calls_history.append({
+            run.tool_calls_history.append({
                 "tool_name": tool_name,
                 "arguments": kwargs,
                 "result": result
@@ -138,7 +198,8 @@ CRITICAL RULES:
                 "error": f"Error calling tool {tool_name}: {str(e)}"
             }
     
-    def process_order(self, user_query: str, file_path: Optional[str] = None) -> Dict[str, Any]:
+    def process_order(self, user_query: str, file_path: Optional[str] = None,
+                      run: Optional[AgentRun] = None) -> Dict[str, Any]:
         """
         Process an order through the ReAct loop.
         
@@ -147,10 +208,25 @@ CRITICAL RULES:
         Args:
             user_query: The customer's order request
             file_path: Optional path to uploaded file
+            run: AgentRun to record into (a fresh one by default)
         
         Returns:
             Dictionary with processing result
         """
+        # Fresh state for this order: each file is inspected at most once
+        run = run if run is not None else AgentRun()
+        self._local.run = run
+        
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"status": "error"}
+        try:
+            result = self._run_order(run, user_query, file_path)
+            return result
+        finally:
+            self._finish_run(run, file_path, result, time.perf_counter() - started)
+    
+    def _run_order(self, run: AgentRun, user_query: str, file_path: Optional[str]) -> Dict[str, Any]:
+        """The order's ReAct steps (see process_order)."""
         # Layer 1: Spec-Check Guardrail (would be applied via system prompt in LLM integration)
         # For now, we'll validate in the processing logic
         
@@ -172,8 +248,8 @@ CRITICAL RULES:
             })
             current_step += 1
             
-            resolution_result = self.call_tool("check_resolution", file_path=file_path)
-            preflight_result = self.preflight.validate_file(file_path)
+            resolution_result = self.call_tool("check_resolution", run, file_path=file_path)
+            preflight_result = self.preflight.validate_file(file_path, run.context)
             
             if not preflight_result["valid"]:
                 return {
@@ -192,21 +268,49 @@ CRITICAL RULES:
             "status": "processing",
             "message": "Order processing (simplified PoC version - integrate with LLM for full functionality)",
             "steps": steps,
-            "tool_calls": self.tool_calls_history
+            "tool_calls": run.tool_calls_history.to_list(),
+            "analysis_cache": run.context.get_stats()
+        }
+    
+    def _finish_run(self, run: AgentRun, file_path: Optional[str], result: Dict[str, Any], duration: float):
+        """Keep a summary of the finished order in memory and stream its full trace to the sink."""
+        summary = {
+            "run_id": run.id,
+            "started_at": run.started_at,
+            "duration_ms": round(duration * 1000, 2),
+            "status": result.get("status"),
+            "tool_calls": summarize_tool_calls(run.tool_calls_history),
+            "dropped_tool_calls": run.tool_calls_history.dropped
         }
+        self.recent_traces.add(summary)
+        
+        if self.trace_sink is not None:
+            self.trace_sink.write({
+                **summary,
+                "file_path": file_path,
+                "tool_calls": run.tool_calls_history.to_list(),
+                "observations": run.observation_history.to_list(),
+                "analysis_cache": run.context.get_stats()
+            })
+    
+    def get_recent_traces(self) -> List[Dict[str, Any]]:
+        """Summaries of the most recently finished orders (oldest first)."""
+        return self.recent_traces.snapshot()
     
-    def validate_final_response(self, response_text: str) -> Dict[str, Any]:
+    def validate_final_response(self, response_text: str, run: Optional[AgentRun] = None) -> Dict[str, Any]:
         """
         Validate the final response using Layer 3 guardrail.
         
         Args:
             response_text: The agent's response text
+            run: The order's AgentRun (defaults to this thread's current run)
         
         Returns:
             Validation result
         """
+        run = run if run is not None else self.current_run()
         return self.quote_guardrail.validate_response(
             response_text, 
-            self.tool_calls_history
+            run.tool_calls_history
         )
 
@@ -0,0 +1,101 @@
+"""Bounded tool-call traces for ReActAgent runs, and a sink that streams them to disk."""
+
+import json
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Union
+
+# Per-order cap; a normal order makes a handful of calls, so this only bites on runaway loops
+MAX_TRACE_ENTRIES = 256
+
+# How many finished-order summaries an agent keeps in memory
+RECENT_TRACES = 32
+
+
+class TraceBuffer:
+    """
+    Append-only ring buffer of trace entries for one order.
+
+    Old entries are dropped once ``maxlen`` is reached (and counted), so a
+    misbehaving loop can't grow an order's trace without bound.
+    """
+
+    def __init__(self, maxlen: int = MAX_TRACE_ENTRIES):
+        self._entries: Deque[Any] = deque(maxlen=maxlen)
+        self.dropped = 0
+
+    def append(self, entry: Any):
+        if len(self._entries) == self._entries.maxlen:
+            self.dropped += 1
+        self._entries.append(entry)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._entries)[index]
+        return self._entries[index]
+
+    def to_list(self) -> List[Any]:
+        return list(self._entries)
+
+
+def summarize_tool_calls(tool_calls: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Tool name and outcome only - what the in-memory recent-trace ring keeps."""
+    summary = []
+    for call in tool_calls:
+        result = call.get("result")
+        summary.append({
+            "tool_name": call.get("tool_name"),
+            "ok": isinstance(result, dict) and "error" not in result
+        })
+    return summary
+
+
+class JsonlTraceSink:
+    """
+    Writes one JSON line per completed order trace, with size-based rotation.
+
+    Backed by logging's RotatingFileHandler, so writes from concurrent
+    threads are serialized and old files roll over instead of growing forever.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 50 * 1024 * 1024, backup_count: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            str(self.path), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger = logging.Logger(f"printshop.traces.{self.path}")
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+
+    def write(self, trace: Dict[str, Any]):
+        self._logger.info(json.dumps(trace, default=str))
+
+    def close(self):
+        self._handler.close()
+
+
+class RecentTraces:
+    """Thread-safe ring of the last N order summaries."""
+
+    def __init__(self, maxlen: int = RECENT_TRACES):
+        self._traces: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, summary: Dict[str, Any]):
+        with self._lock:
+            self._traces.append(summary)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._traces)
@@ -9,7 +9,10 @@ parent_dir = str(Path(__file__).parent.parent)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-from flask import Flask, request, jsonify
+import json
+import logging
+
+from flask import Flask, request, jsonify, send_file, stream_with_context, url_for
 
 # Initialize Flask app - MUST be named 'app' for Vercel
 app = Flask(__name__)
@@ -24,7 +27,11 @@ def index():
         "endpoints": {
             "upload": "/upload",
             "submit_order": "/submit-order",
-            "validate_order": "/validate-order"
+            "validate_order": "/validate-order",
+            "validate_orders": "/validate-orders",
+            "quote_grid": "/quote-grid",
+            "renditions": "/renditions/<rendition>/<filename>",
+            "metrics": "/metrics"
         }
     })
 
@@ -42,26 +49,72 @@ except ImportError:
     pass
 
 try:
-    from pdf2image import convert_from_bytes
+    from pdf2image import convert_from_path
     PDF_AVAILABLE = True
 except ImportError:
-    convert_from_bytes = None
     PDF_AVAILABLE = False
 
+from services.derivatives import DerivativeCache, DerivativeError, RENDITIONS
+from services.ingest import UploadRejected, make_ingest_request_class
+from services.batch import BatchError, BatchValidator, parse_batch
+from services.uploads import analyze_upload, store_upload, UploadError
+from services.validation_sessions import ValidationSessions
+from storage import UploadStore, OrderStore, ResultCache, configure_default_database
+from storage.result_cache import digest_from_path, sha256_file
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, instrument_flask_app, render_metrics
+from profiling import install_flask_profiling
+
 # Import agent
 try:
-    from agent import PrintShopAgent
+    from agent import PrintShopAgent, OrderContext
+    from tools.inventory_tool import commit_inventory, release_inventory, reserve_inventory
     agent = PrintShopAgent()
     AGENT_AVAILABLE = True
 except ImportError as e:
+    logging.getLogger(__name__).exception("Order agent failed to import; order endpoints will return 500")
     agent = None
     AGENT_AVAILABLE = False
     AGENT_ERROR = str(e)
 
+try:
+    from tools.pricing_tool import get_quote_grid
+    QUOTE_GRID_AVAILABLE = True
+except ImportError:
+    QUOTE_GRID_AVAILABLE = False
+
 # For Vercel serverless, use /tmp for uploads
 UPLOAD_FOLDER = '/tmp/uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Content-addressed uploads plus an on-disk analysis cache (/tmp is the only writable path)
+database = configure_default_database('/tmp/printshop.sqlite3')
+upload_store = UploadStore(UPLOAD_FOLDER, database)
+result_cache = ResultCache(database)
+order_store = OrderStore(database)
+
+# Renditions are rendered on first view; keep the LRU budget small in /tmp
+derivative_cache = DerivativeCache(os.path.join(UPLOAD_FOLDER, 'derivatives'), 128 * 1024 * 1024, database)
+
+# No background jobs here: a serverless instance is frozen once it has responded, and
+# another instance can't see its /tmp job table, so uploads are analyzed in the request
+
+# Batch line items run concurrently, sharing one file-analysis memo per batch
+batch_validator = BatchValidator(
+    lambda order, analysis: agent.process_order(order, OrderContext(analysis))
+)
+
+# Live form validation keeps per-session tool results (per warm instance)
+validation_sessions = ValidationSessions()
+
+# Stream file parts straight into the store, rejecting oversize/unsupported/bomb files mid-upload
+app.request_class = make_ingest_request_class(upload_store)
+
+# Per-layer/tool/route latency, rejections and cache hit ratios, exposed on /metrics
+instrument_flask_app(app)
+
+# Opt-in request profiling (see profiling.py); /tmp is the only writable path
+install_flask_profiling(app, output_dir=Path(os.environ.get('PRINTSHOP_PROFILE_DIR', '/tmp/profiles')))
+
 MIN_DPI = 225
 
 def send_approval_email(email, filename, status):
@@ -72,53 +125,77 @@ def send_approval_email(email, filename, status):
     print("-------------------------------")
     return True
 
+def resolve_upload(filename):
+    """Map a stored filename from the client to a path on disk ('' if it isn't a stored upload)."""
+    path = upload_store.resolve(filename)
+    return str(path) if path else ''
+
+@app.route('/quote-grid')
+def quote_grid():
+    """Precomputed price matrix with a strong ETag for browser/CDN caching."""
+    if not QUOTE_GRID_AVAILABLE:
+        return jsonify({"error": "Pricing not available"}), 500
+    
+    etag, body = get_quote_grid()
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Upload file endpoint."""
     if not PIL_AVAILABLE:
         return jsonify({"error": "Image processing not available"}), 500
-        
-    if 'file' not in request.files:
+
+    try:
+        files = request.files
+    except UploadRejected as e:
+        return jsonify({"error": e.description}), e.code
+
+    if 'file' not in files:
         return jsonify({"error": "No file uploaded"}), 400
     
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         return jsonify({"error": "No file selected"}), 400
 
-    filename = file.filename.lower()
-    filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-    
     try:
-        if filename.endswith('.pdf'):
-            if not PDF_AVAILABLE:
-                return jsonify({"error": "PDF conversion not available"}), 500
-            file_data = file.read()
-            images = convert_from_bytes(file_data)
-            img = images[0]
-            new_filename = filename.replace('.pdf', '.jpg')
-            filepath = os.path.join(UPLOAD_FOLDER, new_filename)
-            img.save(filepath, 'JPEG')
-        elif filename.endswith('.heic'):
-            img = Image.open(file)
-            new_filename = filename.replace('.heic', '.jpg')
-            filepath = os.path.join(UPLOAD_FOLDER, new_filename)
-            img.save(filepath, "JPEG")
-        else:
-            file.save(filepath)
-            img = Image.open(filepath)
-
-        width_px, height_px = img.size
-        
-        return jsonify({
-            "success": True,
-            "filename": os.path.basename(filepath),
-            "width": width_px,
-            "height": height_px,
-            "message": "File uploaded successfully"
-        })
+        source, metadata = store_upload(file, upload_store)
+        result = analyze_upload(lambda fraction, message: None, source, metadata, result_cache, derivative_cache)
+    except UploadRejected as e:
+        return jsonify({"error": e.description}), e.code
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": f"File processing error: {str(e)}"}), 500
 
+    response = {
+        "success": True,
+        "message": "File uploaded successfully",
+        "url": url_for('rendition', rendition='preview', name=source.filename),
+        "thumbnail_url": url_for('rendition', rendition='thumb', name=source.filename)
+    }
+    response.update(result)
+    return jsonify(response)
+
+@app.route('/renditions/<rendition>/<name>')
+def rendition(rendition, name):
+    """Thumbnail, web preview or full-size proof, rendered on first request."""
+    if rendition not in RENDITIONS:
+        return jsonify({"error": "Unknown rendition"}), 404
+    path = upload_store.resolve(name)
+    if path is None:
+        return jsonify({"error": "File not found"}), 404
+
+    digest = digest_from_path(path) or sha256_file(path)
+    try:
+        rendered = derivative_cache.get(digest, path, rendition)
+    except DerivativeError as e:
+        return jsonify({"error": str(e)}), 500
+    return send_file(rendered, max_age=86400, conditional=True)
+
 @app.route('/submit-order', methods=['POST'])
 def submit_order():
     """Submit order with AI Order Guardrail validation."""
@@ -131,16 +208,7 @@ def submit_order():
     data = request.json or {}
     
     filename = data.get('filename', '')
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
-    
-    if not os.path.exists(file_path):
-        base_name = os.path.splitext(filename)[0]
-        for ext in ['.jpg', '.jpeg', '.png', '.pdf']:
-            test_path = os.path.join(UPLOAD_FOLDER, base_name + ext)
-            if os.path.exists(test_path):
-                file_path = test_path
-                filename = os.path.basename(test_path)
-                break
+    file_path = resolve_upload(filename)
     
     order_data = {
         'email': data.get('email', ''),
@@ -164,22 +232,43 @@ def submit_order():
         }), 400
     
     order_summary = result.get('order_summary', {})
-    send_approval_email(
-        data.get('email', ''),
-        filename, 
-        f"Accepted - Order Total: {order_summary.get('price', 'N/A')}"
-    )
+    
+    # Hold the paper (atomic across workers) before accepting
+    reservation = reserve_inventory(order_summary.get('paper', ''), order_summary.get('quantity', 1))
+    if not reservation['reserved']:
+        return jsonify({
+            "success": False,
+            "error": reservation['message'],
+            "layer": "inventory",
+            "details": reservation,
+            "message": "Stock changed while your order was being checked. Please choose another paper or quantity."
+        }), 409
+    
+    try:
+        send_approval_email(
+            data.get('email', ''),
+            filename, 
+            f"Accepted - Order Total: {order_summary.get('price', 'N/A')}"
+        )
+    except Exception:
+        release_inventory(reservation['reservation_id'])
+        raise
+    commit_inventory(reservation['reservation_id'])
+    
+    # Queued for the order store's background writer
+    order_id = order_store.record(order_data, result, reservation['reservation_id'])
     
     return jsonify({
         "success": True,
         "message": "Order validated and submitted successfully! All guardrails passed.",
+        "order_id": order_id,
         "order_summary": order_summary,
         "reasoning": result.get('reasoning', [])
     })
 
 @app.route('/validate-order', methods=['POST'])
 def validate_order():
-    """Validate order without submitting."""
+    """Validate order without submitting; pass back session_id so re-validation re-runs only what changed."""
     if not AGENT_AVAILABLE:
         return jsonify({
             "error": "Agent not available",
@@ -189,7 +278,7 @@ def validate_order():
     data = request.json or {}
     
     filename = data.get('filename', '')
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
+    file_path = resolve_upload(filename)
     
     if not os.path.exists(file_path):
         return jsonify({
@@ -207,9 +296,49 @@ def validate_order():
         'filename': filename
     }
     
-    result = agent.process_order(order_data)
+    session_id, analysis = validation_sessions.get(data.get('session_id'))
+    result = agent.process_order(order_data, OrderContext(analysis))
+    result["session_id"] = session_id
     return jsonify(result)
 
+@app.route('/validate-orders', methods=['POST'])
+def validate_orders():
+    """Validate a batch of orders; streams one JSON line per order, in input order."""
+    if not AGENT_AVAILABLE:
+        return jsonify({
+            "error": "Agent not available",
+            "details": AGENT_ERROR if 'AGENT_ERROR' in globals() else "Unknown error"
+        }), 500
+    
+    try:
+        orders = parse_batch(request.get_json(silent=True))
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    order_datas = []
+    for data in orders:
+        filename = data.get('filename', '')
+        order_datas.append({
+            'email': data.get('email', ''),
+            'name': data.get('name', ''),
+            'size': data.get('size', ''),
+            'paper': data.get('paper', '100lb Matte'),
+            'quantity': data.get('quantity', 1),
+            'file_path': resolve_upload(filename),
+            'filename': filename
+        })
+    
+    def generate():
+        for index, result in batch_validator.validate(order_datas):
+            yield json.dumps({"index": index, "result": result}, default=str) + "\n"
+    
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text-format metrics for this process."""
+    return app.response_class(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/status')
 def status():
     """Check API status and dependencies."""
@@ -220,6 +349,7 @@ def status():
             "PIL": PIL_AVAILABLE,
             "PDF": PDF_AVAILABLE,
             "Agent": AGENT_AVAILABLE,
+            "QuoteGrid": QUOTE_GRID_AVAILABLE,
             "agent_error": AGENT_ERROR if not AGENT_AVAILABLE and 'AGENT_ERROR' in globals() else None
         }
     })
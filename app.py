@@ -1,11 +1,23 @@
 import os
+import json
 import smtplib
-from flask import Flask, render_template, request, jsonify, url_for
-from PIL import Image
+from flask import Flask, render_template, request, jsonify, url_for, send_file, stream_with_context
 from pillow_heif import register_heif_opener
-from pdf2image import convert_from_bytes
+from process_pool import get_process_pool
 from email.mime.text import MIMEText
-from agent import PrintShopAgent
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, instrument_flask_app, render_metrics
+from profiling import install_flask_profiling
+from agent import PrintShopAgent, OrderContext
+from tools.inventory_tool import commit_inventory, release_inventory, reserve_inventory
+from services.batch import BatchError, BatchValidator, parse_batch
+from services.derivatives import DerivativeCache, DerivativeError, RENDITIONS
+from services.ingest import UploadRejected, make_ingest_request_class
+from services.jobs import JobQueue, JobQueueFull, FAILED
+from services.uploads import analyze_upload, store_upload, UploadError
+from services.validation_sessions import ValidationSessions
+from storage import UploadStore, get_order_store, get_result_cache
+from storage.result_cache import digest_from_path, sha256_file
+from tools.pricing_tool import get_quote_grid
 
 # Register HEIC opener for Pillow
 register_heif_opener()
@@ -14,9 +26,45 @@ app = Flask(__name__)
 UPLOAD_FOLDER = 'static/uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Uploads are content-addressed; analysis results are cached on disk by digest
+upload_store = UploadStore(UPLOAD_FOLDER)
+result_cache = get_result_cache()
+
+# Accepted orders are written by a background thread, off the request path
+order_store = get_order_store()
+
+# Previews/thumbnails/proofs are rendered on first view and kept in a size-bounded LRU
+derivative_cache = DerivativeCache(os.path.join(UPLOAD_FOLDER, 'derivatives'))
+
+# Measuring and preview rendering run off the request thread
+job_queue = JobQueue(max_workers=2)
+
+# /upload answers inline when its job finishes this fast, otherwise returns 202 + job id
+UPLOAD_INLINE_WAIT_SECONDS = 0.5
+
+# With PRINTSHOP_PROCESS_WORKERS set, decoding/rasterizing runs in pre-started worker processes
+process_pool = get_process_pool()
+if process_pool is not None:
+    process_pool.warm()
+
+# Stream file parts straight into the store, rejecting oversize/unsupported/bomb files mid-upload
+app.request_class = make_ingest_request_class(upload_store)
+
+# Per-layer/tool/route latency, rejections and cache hit ratios, exposed on /metrics
+instrument_flask_app(app)
+
+# Opt-in profiling of 1 in PRINTSHOP_PROFILE_EVERY requests, or on request from PRINTSHOP_PROFILE_ADMIN_IPS
+install_flask_profiling(app)
+
 # Initialize the AI Order Guardrail Agent
 agent = PrintShopAgent()
 
+# Line items of a batch run concurrently and share one file-analysis memo
+batch_validator = BatchValidator(lambda order, analysis: agent.process_order(order, OrderContext(analysis)))
+
+# Live form validation keeps per-session tool results, so each change re-runs only what it affects
+validation_sessions = ValidationSessions()
+
 # Standard Print Sizes (Inches)
 PRINT_SIZES = {
     "3x5": (3, 5), "4x6": (4, 6), "5x7": (5, 7),
@@ -35,54 +83,100 @@ def send_approval_email(email, filename, status):
     print("-------------------------------")
     return True
 
+def resolve_upload(filename):
+    """Map a stored filename from the client to a path on disk ('' if it isn't a stored upload)."""
+    path = upload_store.resolve(filename)
+    return str(path) if path else ''
+
 @app.route('/')
 def index():
     return render_template('index.html', sizes=PRINT_SIZES)
 
+@app.route('/quote-grid')
+def quote_grid():
+    """
+    Full price matrix (size x paper x quantity break, with rush multipliers) for client-side re-pricing.
+    Served with a strong ETag derived from the pricing tables, so browsers and CDNs
+    can cache it and revalidate with If-None-Match.
+    """
+    etag, body = get_quote_grid()
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    if 'file' not in request.files:
+    # Parsing the form runs the ingest checks, so a rejection surfaces here
+    try:
+        files = request.files
+    except UploadRejected as e:
+        return jsonify({"error": e.description}), e.code
+
+    if 'file' not in files:
         return jsonify({"error": "No file uploaded"}), 400
     
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         return jsonify({"error": "No file selected"}), 400
 
-    filename = file.filename.lower()
-    filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-    
-    # --- CONVERSION LOGIC ---
-    img = None
-    
-    if filename.endswith('.pdf'):
-        # Convert first page of PDF to JPG
-        images = convert_from_bytes(file.read())
-        img = images[0]
-        new_filename = filename.replace('.pdf', '.jpg')
-        filepath = os.path.join(UPLOAD_FOLDER, new_filename)
-        img.save(filepath, 'JPEG')
-    elif filename.endswith('.heic'):
-        # Convert HEIC to JPG
-        img = Image.open(file)
-        new_filename = filename.replace('.heic', '.jpg')
-        filepath = os.path.join(UPLOAD_FOLDER, new_filename)
-        img.save(filepath, "JPEG")
-    else:
-        # Standard Save
-        file.save(filepath)
-        img = Image.open(filepath)
+    # --- STORAGE LOGIC ---
+    # Stored by content digest in the request; measuring and preview rendering
+    # run as a background job (both cached per digest).
+    try:
+        source, metadata = store_upload(file, upload_store)
+        job = job_queue.submit("upload", analyze_upload, source, metadata, result_cache, derivative_cache)
+    except UploadRejected as e:
+        return jsonify({"error": e.description}), e.code
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 500
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "2"}
+
+    response = {
+        "job_id": job.id,
+        "status_url": url_for('job_status', job_id=job.id),
+        "url": url_for('rendition', rendition='preview', name=source.filename),
+        "thumbnail_url": url_for('rendition', rendition='thumb', name=source.filename),
+        "filename": source.filename
+    }
 
     # --- DPI CALCULATION ---
-    # We pass the pixel dimensions back to the frontend
+    # We pass the pixel dimensions back to the frontend (here, or via /jobs/<id>)
     # The frontend will check these pixels against the selected physical inches
-    width_px, height_px = img.size
-    
-    return jsonify({
-        "url": url_for('static', filename=f'uploads/{os.path.basename(filepath)}'),
-        "width": width_px,
-        "height": height_px,
-        "filename": os.path.basename(filepath)
-    })
+    job = job_queue.wait(job.id, UPLOAD_INLINE_WAIT_SECONDS)
+    if job is not None and job.status == FAILED:
+        return jsonify({"error": job.error, "job_id": job.id}), 500
+    if job is not None and job.finished:
+        response.update(job.result)
+        return jsonify(response)
+    return jsonify(response), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Progress and, once done, the result of a background job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/renditions/<rendition>/<name>')
+def rendition(rendition, name):
+    """Serve a thumbnail, web preview or full-size proof, rendering it on first request."""
+    if rendition not in RENDITIONS:
+        return jsonify({"error": "Unknown rendition"}), 404
+    path = upload_store.resolve(name)
+    if path is None:
+        return jsonify({"error": "File not found"}), 404
+
+    digest = digest_from_path(path) or sha256_file(path)
+    try:
+        rendered = derivative_cache.get(digest, path, rendition)
+    except DerivativeError as e:
+        return jsonify({"error": str(e)}), 500
+    # Content-addressed: a given URL's bytes never change
+    return send_file(rendered, max_age=86400, conditional=True)
 
 @app.route('/submit-order', methods=['POST'])
 def submit_order():
@@ -92,20 +186,9 @@ def submit_order():
     """
     data = request.json
     
-    # Get file path from filename
+    # Get file path from the stored (digest) filename that /upload returned
     filename = data.get('filename', '')
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
-    
-    # Check if file exists (use original if converted)
-    if not os.path.exists(file_path):
-        # Try to find the file (might have been converted)
-        base_name = os.path.splitext(filename)[0]
-        for ext in ['.jpg', '.jpeg', '.png', '.pdf']:
-            test_path = os.path.join(UPLOAD_FOLDER, base_name + ext)
-            if os.path.exists(test_path):
-                file_path = test_path
-                filename = os.path.basename(test_path)
-                break
+    file_path = resolve_upload(filename)
     
     # Prepare order data for agent
     order_data = {
@@ -131,18 +214,37 @@ def submit_order():
             "message": result.get('message', 'Please fix the errors and try again.')
         }), 400
     
-    # Order passed all guardrails - proceed with submission
+    # Order passed all guardrails - hold the paper (atomic across workers) before accepting
+    reservation = reserve_inventory(result['order_summary']['paper'], result['order_summary']['quantity'])
+    if not reservation['reserved']:
+        return jsonify({
+            "success": False,
+            "error": reservation['message'],
+            "layer": "inventory",
+            "details": reservation,
+            "message": "Stock changed while your order was being checked. Please choose another paper or quantity."
+        }), 409
+    
     # Simulate "Accepted" Email
-    send_approval_email(
-        data['email'], 
-        filename, 
-        f"Accepted - Order Total: {result['order_summary']['price']}"
-    )
+    try:
+        send_approval_email(
+            data['email'], 
+            filename, 
+            f"Accepted - Order Total: {result['order_summary']['price']}"
+        )
+    except Exception:
+        release_inventory(reservation['reservation_id'])
+        raise
+    commit_inventory(reservation['reservation_id'])
+    
+    # Queued for the order store's background writer
+    order_id = order_store.record(order_data, result, reservation['reservation_id']) if order_store else None
     
     # Return success with order summary
     return jsonify({
         "success": True,
         "message": "Order validated and submitted successfully! All guardrails passed.",
+        "order_id": order_id,
         "order_summary": result['order_summary'],
         "reasoning": result.get('reasoning', [])
     })
@@ -152,12 +254,13 @@ def submit_order():
 def validate_order():
     """
     Validate order without submitting (preview/check only).
-    Useful for real-time validation feedback.
+    Useful for real-time validation feedback: send back the returned
+    session_id with each change and only the affected checks re-run.
     """
     data = request.json
     
     filename = data.get('filename', '')
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
+    file_path = resolve_upload(filename)
     
     if not os.path.exists(file_path):
         return jsonify({
@@ -175,10 +278,48 @@ def validate_order():
         'filename': filename
     }
     
-    result = agent.process_order(order_data)
+    session_id, analysis = validation_sessions.get(data.get('session_id'))
+    result = agent.process_order(order_data, OrderContext(analysis))
+    result["session_id"] = session_id
     
     return jsonify(result)
 
+@app.route('/validate-orders', methods=['POST'])
+def validate_orders():
+    """
+    Validate a batch of orders (e.g., a B2B customer's line items) in one request.
+    Orders run concurrently; a file shared by several line items is checked once.
+    Streams one JSON line per order, in input order: {"index": i, "result": {...}}
+    """
+    try:
+        orders = parse_batch(request.get_json(silent=True))
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    order_datas = []
+    for data in orders:
+        filename = data.get('filename', '')
+        order_datas.append({
+            'email': data.get('email', ''),
+            'name': data.get('name', ''),
+            'size': data.get('size', ''),
+            'paper': data.get('paper', '100lb Matte'),
+            'quantity': data.get('quantity', 1),
+            'file_path': resolve_upload(filename),
+            'filename': filename
+        })
+    
+    def generate():
+        for index, result in batch_validator.validate(order_datas):
+            yield json.dumps({"index": index, "result": result}, default=str) + "\n"
+    
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text-format metrics for this process."""
+    return app.response_class(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') != 'production'
@@ -0,0 +1,406 @@
+"""
+Async (ASGI) serving mode for the order API.
+
+Same endpoints as api/index.py, served by Starlette so one process can hold
+hundreds of open customer connections: request bodies are read with await,
+and blocking work (image checks, the agent, file writes, email) runs on a
+bounded thread pool - which in turn hands CPU-bound decoding to the warm
+process pool when PRINTSHOP_PROCESS_WORKERS is set.
+
+Run with:  uvicorn asgi:app --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.middleware import Middleware
+from starlette.routing import Route
+
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, render_metrics
+from process_pool import get_process_pool
+from services.batch import BatchError, BatchValidator, parse_batch
+from services.derivatives import DerivativeCache, DerivativeError, RENDITIONS
+from services.ingest import (
+    MULTIPART_OVERHEAD_BYTES, MultipartIngestor, UploadRejected, commit_ingested, max_upload_bytes
+)
+from services.jobs import FAILED, JobQueue, JobQueueFull
+from services.uploads import analyze_upload
+from services.validation_sessions import ValidationSessions
+from storage import UploadStore, get_order_store, get_result_cache
+from storage.result_cache import digest_from_path, sha256_file
+from agent import OrderContext, PrintShopAgent
+from tools.inventory_tool import commit_inventory, release_inventory, reserve_inventory
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+try:
+    from pdf2image import convert_from_path
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+try:
+    from tools.pricing_tool import get_quote_grid
+    QUOTE_GRID_AVAILABLE = True
+except ImportError:
+    QUOTE_GRID_AVAILABLE = False
+
+UPLOAD_FOLDER = os.environ.get("PRINTSHOP_UPLOAD_FOLDER", "static/uploads")
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+upload_store = UploadStore(UPLOAD_FOLDER)
+result_cache = get_result_cache()
+
+# The order guardrails; without them the order endpoints can't run, so an import error fails startup
+agent = PrintShopAgent()
+
+# Accepted orders are written by a background thread, off the event loop
+order_store = get_order_store()
+derivative_cache = DerivativeCache(os.path.join(UPLOAD_FOLDER, "derivatives"))
+job_queue = JobQueue(max_workers=2)
+
+# Threads for blocking calls; requests waiting on them cost nothing but a coroutine
+BLOCKING_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PRINTSHOP_ASGI_THREADS", "16")), thread_name_prefix="asgi-blocking"
+)
+
+# Batch line items run concurrently, sharing one file-analysis memo per batch
+batch_validator = BatchValidator(
+    lambda order, analysis: agent.process_order(order, OrderContext(analysis))
+)
+
+# Live form validation keeps per-session tool results, so each change re-runs only what it affects
+validation_sessions = ValidationSessions()
+
+# /upload answers inline when its job finishes this fast, otherwise returns 202 + job id
+UPLOAD_INLINE_WAIT_SECONDS = 0.5
+
+
+async def run_blocking(function, *args, **kwargs):
+    """Run a blocking call on the bounded executor without holding up the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(BLOCKING_EXECUTOR, functools.partial(function, *args, **kwargs))
+
+
+def send_approval_email(email, filename, status):
+    """Simulates sending an email"""
+    print(f"--- EMAIL SENT TO {email} ---")
+    print(f"Subject: Order Update - {status}")
+    print(f"Body: Your design '{filename}' is {status}.")
+    print("-------------------------------")
+    return True
+
+
+def resolve_upload(filename):
+    """Map a stored filename from the client to a path on disk ('' if it isn't a stored upload)."""
+    path = upload_store.resolve(filename)
+    return str(path) if path else ""
+
+
+def _order_data(data, file_path, filename):
+    return {
+        'email': data.get('email', ''),
+        'name': data.get('name', ''),
+        'size': data.get('size', ''),
+        'paper': data.get('paper', '100lb Matte'),
+        'quantity': data.get('quantity', 1),
+        'file_path': file_path,
+        'filename': filename
+    }
+
+
+async def _json_payload(request):
+    """The request's parsed JSON, or None if the body is empty or malformed."""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def _json_body(request):
+    """The request's JSON object, or {} for an empty, malformed or non-object body."""
+    data = await _json_payload(request)
+    return data if isinstance(data, dict) else {}
+
+
+def _etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header (comma-separated quoted tags, or *) names this ETag."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == f'"{etag}"':
+            return True
+    return False
+
+
+async def index(request):
+    """Root endpoint - returns API info."""
+    return JSONResponse({
+        "success": True,
+        "message": "Print Shop AI Order Guardrail API is working!",
+        "endpoints": {
+            "upload": "/upload",
+            "submit_order": "/submit-order",
+            "validate_order": "/validate-order",
+            "validate_orders": "/validate-orders",
+            "quote_grid": "/quote-grid",
+            "renditions": "/renditions/<rendition>/<filename>",
+            "jobs": "/jobs/<job_id>",
+            "status": "/status"
+        }
+    })
+
+
+async def quote_grid(request):
+    """Precomputed price matrix with a strong ETag for browser/CDN caching."""
+    if not QUOTE_GRID_AVAILABLE:
+        return JSONResponse({"error": "Pricing not available"}, status_code=500)
+
+    etag, body = get_quote_grid()
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "public, max-age=300"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def upload_file(request):
+    """Upload file endpoint: the body streams through the ingest checks as it arrives."""
+    if not PIL_AVAILABLE:
+        return JSONResponse({"error": "Image processing not available"}, status_code=500)
+
+    limit = max_upload_bytes()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit + MULTIPART_OVERHEAD_BYTES:
+        return JSONResponse({"error": f"File is larger than the {limit // (1024 * 1024)} MB limit."}, status_code=413)
+
+    ingestor = None
+    try:
+        ingestor = MultipartIngestor(request.headers.get("content-type", ""), str(upload_store.tmp_dir), limit)
+        async for chunk in request.stream():
+            # Parsing, hashing and the disk write happen off the event loop
+            await run_blocking(ingestor.write, chunk)
+
+        file = ingestor.file
+        if file is None:
+            return JSONResponse({"error": "No file uploaded"}, status_code=400)
+        if file.filename == '':
+            return JSONResponse({"error": "No file selected"}, status_code=400)
+
+        source = await run_blocking(commit_ingested, file, upload_store, file.filename)
+        job = await run_blocking(
+            job_queue.submit, "upload", analyze_upload, source, file.metadata, result_cache, derivative_cache
+        )
+    except UploadRejected as e:
+        return JSONResponse({"error": e.description}, status_code=e.code)
+    except JobQueueFull as e:
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "2"})
+    finally:
+        if ingestor is not None:
+            ingestor.close()
+
+    response = {
+        "success": True,
+        "job_id": job.id,
+        "status_url": request.app.url_path_for("job_status", job_id=job.id),
+        "filename": source.filename,
+        "url": request.app.url_path_for("rendition", rendition="preview", name=source.filename),
+        "thumbnail_url": request.app.url_path_for("rendition", rendition="thumb", name=source.filename)
+    }
+
+    job = await run_blocking(job_queue.wait, job.id, UPLOAD_INLINE_WAIT_SECONDS)
+    if job is not None and job.status == FAILED:
+        return JSONResponse({"error": f"File processing error: {job.error}", "job_id": job.id}, status_code=500)
+    if job is not None and job.finished:
+        response.update(job.result)
+        response["message"] = "File uploaded successfully"
+        return JSONResponse(response)
+    response["message"] = "File uploaded; processing continues in the background"
+    return JSONResponse(response, status_code=202)
+
+
+async def job_status(request):
+    """Background job progress and result."""
+    job = await run_blocking(job_queue.get, request.path_params["job_id"])
+    if job is None:
+        return JSONResponse({"error": "Unknown job"}, status_code=404)
+    return JSONResponse(job.to_dict())
+
+
+async def rendition(request):
+    """Thumbnail, web preview or full-size proof, rendered on first request."""
+    name = request.path_params["rendition"]
+    if name not in RENDITIONS:
+        return JSONResponse({"error": "Unknown rendition"}, status_code=404)
+    path = await run_blocking(upload_store.resolve, request.path_params["name"])
+    if path is None:
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    digest = digest_from_path(path) or await run_blocking(sha256_file, path)
+    try:
+        rendered = await run_blocking(derivative_cache.get, digest, path, name)
+    except DerivativeError as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+    return FileResponse(rendered, headers={"Cache-Control": "public, max-age=86400"})
+
+
+async def submit_order(request):
+    """Submit order with AI Order Guardrail validation."""
+    data = await _json_body(request)
+    filename = data.get('filename', '')
+    file_path = resolve_upload(filename)
+
+    order_data = _order_data(data, file_path, filename)
+    result = await run_blocking(agent.process_order, order_data)
+
+    if not result.get('valid', False):
+        return JSONResponse({
+            "success": False,
+            "error": result.get('error', result.get('message', 'Order validation failed')),
+            "layer": result.get('layer', 'unknown'),
+            "details": result,
+            "message": result.get('message', 'Please fix the errors and try again.')
+        }, status_code=400)
+
+    order_summary = result.get('order_summary', {})
+
+    # Hold the paper (atomic across workers) before accepting
+    reservation = await run_blocking(
+        reserve_inventory, order_summary.get('paper', ''), order_summary.get('quantity', 1)
+    )
+    if not reservation['reserved']:
+        return JSONResponse({
+            "success": False,
+            "error": reservation['message'],
+            "layer": "inventory",
+            "details": reservation,
+            "message": "Stock changed while your order was being checked. Please choose another paper or quantity."
+        }, status_code=409)
+
+    try:
+        await run_blocking(
+            send_approval_email,
+            data.get('email', ''),
+            filename,
+            f"Accepted - Order Total: {order_summary.get('price', 'N/A')}"
+        )
+    except Exception:
+        await run_blocking(release_inventory, reservation['reservation_id'])
+        raise
+    await run_blocking(commit_inventory, reservation['reservation_id'])
+
+    # Only queues the row, so it's safe to call on the event loop
+    order_id = order_store.record(order_data, result, reservation['reservation_id']) if order_store else None
+
+    return JSONResponse({
+        "success": True,
+        "message": "Order validated and submitted successfully! All guardrails passed.",
+        "order_id": order_id,
+        "order_summary": order_summary,
+        "reasoning": result.get('reasoning', [])
+    })
+
+
+async def validate_order(request):
+    """Validate order without submitting; pass back session_id so re-validation re-runs only what changed."""
+    data = await _json_body(request)
+    filename = data.get('filename', '')
+    file_path = resolve_upload(filename)
+
+    if not os.path.exists(file_path):
+        return JSONResponse({
+            "valid": False,
+            "error": "File not found. Please upload a file first."
+        }, status_code=400)
+
+    session_id, analysis = validation_sessions.get(data.get('session_id'))
+    result = await run_blocking(agent.process_order, _order_data(data, file_path, filename), OrderContext(analysis))
+    result["session_id"] = session_id
+    return JSONResponse(result)
+
+
+async def validate_orders(request):
+    """Validate a batch of orders; streams one JSON line per order, in input order."""
+    try:
+        orders = parse_batch(await _json_payload(request))
+    except BatchError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    order_datas = []
+    for data in orders:
+        filename = data.get('filename', '')
+        order_datas.append(_order_data(data, resolve_upload(filename), filename))
+    futures = batch_validator.submit(order_datas)
+
+    async def generate():
+        for index, future in enumerate(futures):
+            result = await asyncio.wrap_future(future)
+            yield json.dumps({"index": index, "result": result}, default=str) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def metrics(request):
+    """Prometheus text-format metrics for this process."""
+    return Response(render_metrics(), headers={"content-type": METRICS_CONTENT_TYPE})
+
+
+async def status(request):
+    """Check API status and dependencies."""
+    return JSONResponse({
+        "success": True,
+        "status": "online",
+        "mode": "asgi",
+        "dependencies": {
+            "PIL": PIL_AVAILABLE,
+            "PDF": PDF_AVAILABLE,
+            "QuoteGrid": QUOTE_GRID_AVAILABLE
+        }
+    })
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    process_pool = get_process_pool()
+    if process_pool is not None:
+        await run_blocking(process_pool.warm)
+    yield
+    if process_pool is not None:
+        process_pool.shutdown()
+    BLOCKING_EXECUTOR.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/quote-grid', quote_grid),
+        Route('/upload', upload_file, methods=['POST']),
+        Route('/jobs/{job_id}', job_status, name='job_status'),
+        Route('/renditions/{rendition}/{name}', rendition, name='rendition'),
+        Route('/submit-order', submit_order, methods=['POST']),
+        Route('/validate-order', validate_order, methods=['POST']),
+        Route('/validate-orders', validate_orders, methods=['POST']),
+        Route('/status', status),
+        Route('/metrics', metrics),
+    ],
+    middleware=[Middleware(MetricsMiddleware)],
+    lifespan=lifespan,
+)
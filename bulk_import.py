@@ -0,0 +1,224 @@
+"""
+Offline bulk order validation: orders stream in from CSV/JSONL, run through
+the guardrail agent on a process pool, and come out as JSONL in input order.
+
+By default each record is validated as a full order by PrintShopAgent (spec
+check, stock, price and the file's print resolution - the same checks as
+/submit-order). The "react" agent only pre-flights the record's request and file.
+
+Progress is checkpointed next to the output file, so an interrupted or
+crashed import resumes where it stopped instead of starting over.
+"""
+
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO, Tuple, Union
+
+from data.order_import import iter_order_records, order_from_record
+from process_pool import warm_worker
+
+AGENT_KINDS = ("printshop", "react")
+
+# Results in flight per worker; bounds memory and how far ahead of the output the pool runs
+IN_FLIGHT_PER_WORKER = 4
+
+# Per-process agent, created by the pool initializer
+_agent = None
+_agent_kind = None
+
+
+def _init_worker(agent_kind: str):
+    """Pool initializer: warm codecs/config and build this worker's agent once."""
+    global _agent, _agent_kind
+    warm_worker()
+    if agent_kind == "printshop":
+        from agent import PrintShopAgent
+        _agent = PrintShopAgent()
+    else:
+        from agent.react_agent import ReActAgent
+        _agent = ReActAgent()
+    _agent_kind = agent_kind
+
+
+def process_record(index: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one order in a worker; failures become an "error" entry instead of killing the import."""
+    try:
+        if _agent_kind == "printshop":
+            result = _agent.process_order(order_from_record(record))
+        else:
+            result = _agent.process_order(
+                user_query=record.get("customer_request") or record.get("query") or "",
+                file_path=record.get("file_path")
+            )
+        return {"index": index, "order_id": record.get("order_id"), "result": result}
+    except Exception as e:
+        return {"index": index, "order_id": record.get("order_id"), "error": f"{type(e).__name__}: {e}"}
+
+
+@dataclass
+class ImportStats:
+    """Counters for one import run."""
+    processed: int = 0
+    resumed_from: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def orders_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class Checkpoint:
+    """
+    Position of the last durably written result: the next input index and the
+    output file's size at that point. Written atomically (temp file + rename).
+    """
+
+    def __init__(self, output_path: Path, input_path: Path):
+        self.path = Path(f"{output_path}.checkpoint")
+        self.input_path = input_path
+
+    def _input_signature(self) -> Dict[str, Any]:
+        stat = self.input_path.stat()
+        return {"input": str(self.input_path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def load(self) -> Optional[Tuple[int, int]]:
+        """(next_index, output_bytes) if a checkpoint for this same input exists."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("signature") != self._input_signature():
+            return None
+        return data["next_index"], data["output_bytes"]
+
+    def save(self, next_index: int, output_bytes: int):
+        tmp_path = Path(f"{self.path}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "signature": self._input_signature(),
+                "next_index": next_index,
+                "output_bytes": output_bytes,
+                "saved_at": time.time()
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def run_import(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    agent_kind: str = "printshop",
+    workers: Optional[int] = None,
+    checkpoint_every: int = 100,
+    resume: bool = True,
+    progress_interval: float = 1.0,
+    log: TextIO = sys.stderr
+) -> ImportStats:
+    """
+    Validate every order in ``input_path`` and write results to ``output_path``.
+
+    Args:
+        input_path: .csv (with header) or .jsonl file of orders
+        output_path: JSONL file; one {"index", "order_id", "result"|"error"} line per order
+        agent_kind: "printshop" (PrintShopAgent, the full order) or "react" (ReActAgent, preflight only)
+        workers: Worker processes (default: CPU count)
+        checkpoint_every: Results between durable checkpoints
+        resume: Continue from an existing checkpoint for the same input
+        progress_interval: Seconds between progress lines on ``log``
+
+    Returns:
+        ImportStats for this run
+    """
+    if agent_kind not in AGENT_KINDS:
+        raise ValueError(f"agent_kind must be one of {AGENT_KINDS}")
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    workers = workers or os.cpu_count() or 1
+
+    checkpoint = Checkpoint(output_path, input_path)
+    position = checkpoint.load() if resume and output_path.exists() else None
+    if position is not None:
+        next_index, output_bytes = position
+        # Drop anything written after the checkpoint (possibly a torn last line)
+        os.truncate(output_path, output_bytes)
+        print(f"Resuming at order {next_index} ({output_bytes} bytes of output kept)", file=log)
+    else:
+        next_index = 0
+        checkpoint.clear()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"")
+
+    stats = ImportStats(resumed_from=next_index)
+    started = time.perf_counter()
+    last_report = started
+
+    try:
+        context = get_context("forkserver")
+    except ValueError:
+        context = get_context("spawn")
+
+    records = itertools.islice(enumerate(iter_order_records(input_path)), next_index, None)
+    in_flight = deque()
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+
+    with open(output_path, "ab") as out, ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(agent_kind,)
+    ) as executor:
+
+        def write_next():
+            nonlocal next_index, last_report
+            entry = in_flight.popleft().result()
+            out.write(json.dumps(entry, default=str).encode("utf-8") + b"\n")
+            next_index = entry["index"] + 1
+            stats.processed += 1
+            if "error" in entry:
+                stats.errors += 1
+
+            if stats.processed % checkpoint_every == 0:
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.save(next_index, out.tell())
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                rate = stats.processed / (now - started)
+                print(f"  {next_index} orders done ({stats.errors} errors), {rate:.1f} orders/sec", file=log)
+
+        try:
+            for index, record in records:
+                in_flight.append(executor.submit(process_record, index, record))
+                # Futures are drained oldest-first, so output stays in input order
+                if len(in_flight) >= max_in_flight:
+                    write_next()
+            while in_flight:
+                write_next()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint.save(next_index, out.tell())
+
+    # Every record was written: a rerun is a new import, not a resume
+    checkpoint.clear()
+    stats.elapsed = time.perf_counter() - started
+    return stats
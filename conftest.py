@@ -0,0 +1,17 @@
+"""
+Shared pytest setup.
+
+Tests get their own SQLite database (inventory, orders, caches), so they
+neither read nor draw down the stock of a local development server.
+"""
+
+import os
+import sys
+import tempfile
+
+TEST_ROOT = tempfile.mkdtemp(prefix="printshop-tests-")
+os.environ.setdefault("PRINTSHOP_DB_PATH", os.path.join(TEST_ROOT, "printshop.sqlite3"))
+os.environ.setdefault("PRINTSHOP_UPLOAD_FOLDER", os.path.join(TEST_ROOT, "uploads"))
+
+# The apps import top-level modules (agent, tools, storage, ...) from the repository root
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -1,8 +1,9 @@
 """Data structures for benchmark orders and order tracking."""
 
 from .benchmark_orders import BenchmarkOrder, load_benchmark_orders, save_benchmark_orders
+from .order_import import iter_order_records, order_from_record
 
-__all__ = ["BenchmarkOrder", "load_benchmark_orders", "save_benchmark_orders"]
+__all__ = ["BenchmarkOrder", "load_benchmark_orders", "save_benchmark_orders", "iter_order_records", "order_from_record"]
 
 
 
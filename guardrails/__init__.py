@@ -3,8 +3,9 @@
 from .spec_check_guardrail import SpecCheckGuardrail
 from .preflight_guardrail import PreflightGuardrail
 from .quote_guardrail import QuoteGuardrail
+from .pipeline import GuardrailPipeline, Stage
 
-__all__ = ["SpecCheckGuardrail", "PreflightGuardrail", "QuoteGuardrail"]
+__all__ = ["SpecCheckGuardrail", "PreflightGuardrail", "QuoteGuardrail", "GuardrailPipeline", "Stage"]
 
 
 
@@ -0,0 +1,93 @@
+"""Guardrail layers as a cost-ordered pipeline that stops at the first hard failure."""
+
+import heapq
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from instrumentation import LAYER, timed
+except ImportError:
+    from ..instrumentation import LAYER, timed
+
+# Relative cost estimates for stages
+COST_LOOKUP = 1        # dict/config lookups, arithmetic
+COST_FILESYSTEM = 10   # stat() and friends
+COST_DECODE = 1000     # opening, probing or rasterizing artwork
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One guardrail check.
+
+    ``run(state)`` returns a rejection result to stop the pipeline, or None to
+    continue. A stage runs only after every stage named in ``requires``.
+    """
+    name: str
+    run: Callable[[Any], Optional[Dict[str, Any]]]
+    cost: float = COST_LOOKUP
+    requires: Tuple[str, ...] = ()
+
+
+class GuardrailPipeline:
+    """
+    Runs stages cheapest-first, subject to their dependencies.
+
+    The order is fixed when the pipeline is built: among the stages whose
+    requirements are met, the cheapest runs next (ties keep declaration order).
+    An invalid order is therefore rejected by the cheapest check that can
+    catch it, and expensive stages such as file decoding only run for orders
+    that passed everything cheaper.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages = tuple(stages)
+        self.order = self._schedule(self.stages)
+
+    @staticmethod
+    def _schedule(stages: Sequence[Stage]) -> Tuple[Stage, ...]:
+        by_name = {}
+        for stage in stages:
+            if stage.name in by_name:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            by_name[stage.name] = stage
+        for stage in stages:
+            missing = [name for name in stage.requires if name not in by_name]
+            if missing:
+                raise ValueError(f"Stage {stage.name} requires unknown stage(s): {', '.join(missing)}")
+
+        position = {stage.name: index for index, stage in enumerate(stages)}
+        waiting_on = {stage.name: set(stage.requires) for stage in stages}
+        ready = [(stage.cost, position[stage.name], stage.name) for stage in stages if not stage.requires]
+        heapq.heapify(ready)
+
+        order: List[Stage] = []
+        while ready:
+            _, _, name = heapq.heappop(ready)
+            order.append(by_name[name])
+            for other, requires in waiting_on.items():
+                if name in requires:
+                    requires.discard(name)
+                    if not requires:
+                        stage = by_name[other]
+                        heapq.heappush(ready, (stage.cost, position[other], other))
+
+        if len(order) != len(stages):
+            scheduled = {stage.name for stage in order}
+            cyclic = [stage.name for stage in stages if stage.name not in scheduled]
+            raise ValueError(f"Stage dependencies form a cycle: {', '.join(cyclic)}")
+        return tuple(order)
+
+    def run(self, state: Any) -> Optional[Dict[str, Any]]:
+        """Run the stages in order; return the first rejection, or None if every stage passed."""
+        for stage in self.order:
+            with timed(LAYER, stage.name):
+                rejection = stage.run(state)
+            if rejection is not None:
+                return rejection
+        return None
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """The execution order, for logging and docs."""
+        return [{"name": stage.name, "cost": stage.cost, "requires": list(stage.requires)} for stage in self.order]
@@ -5,17 +5,26 @@ from typing import Dict, Any, Optional
 
 # Handle both relative and absolute imports
 try:
+    from instrumentation import LAYER, REJECTION, instrumented, record_event
+    from tools.analysis_context import AnalysisContext
+    from tools.config_store import get_config
     from tools.resolution_tool import check_resolution
 except ImportError:
+    from ..instrumentation import LAYER, REJECTION, instrumented, record_event
+    from ..tools.analysis_context import AnalysisContext
+    from ..tools.config_store import get_config
     from ..tools.resolution_tool import check_resolution
 
 class PreflightGuardrail:
     """Action guardrail that verifies technical files (PDFs/Images) before processing."""
     
-    def __init__(self):
-        self.min_resolution_dpi = 300  # Default, loaded from config in practice
+    @property
+    def min_resolution_dpi(self) -> int:
+        """Minimum DPI from the shared shop capability config."""
+        return get_config("shop_capabilities")["file_requirements"]["min_resolution_dpi"]
     
-    def validate_file(self, file_path: str) -> Dict[str, Any]:
+    @instrumented(LAYER, "preflight")
+    def validate_file(self, file_path: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Validate a file using the pre-flight guardrail.
         
@@ -23,6 +32,8 @@ class PreflightGuardrail:
         
         Args:
             file_path: Path to the file to validate
+            context: Optional per-request context; reuses a resolution check
+                     already made for this file during the same order
         
         Returns:
             Dictionary with validation result
@@ -30,6 +41,7 @@ class PreflightGuardrail:
         file_path = Path(file_path)
         
         if not file_path.exists():
+            record_event(REJECTION, "preflight")
             return {
                 "valid": False,
                 "error": f"File not found: {file_path}",
@@ -38,9 +50,13 @@ class PreflightGuardrail:
             }
         
         # Use the resolution tool to check file
-        resolution_result = check_resolution(file_path)
+        if context is not None:
+            resolution_result = context.call("check_resolution", check_resolution, file_path=file_path)
+        else:
+            resolution_result = check_resolution(file_path)
         
         if not resolution_result.get("valid", False):
+            record_event(REJECTION, "preflight")
             return {
                 "valid": False,
                 "error": resolution_result.get("error", "File validation failed"),
@@ -63,13 +79,13 @@ class PreflightGuardrail:
             "details": resolution_result
         }
     
-    def should_intervene(self, file_path: str) -> bool:
+    def should_intervene(self, file_path: str, context: Optional[AnalysisContext] = None) -> bool:
         """
         Determine if the guardrail should intervene (stop the order).
         
         Returns:
             True if intervention is needed, False otherwise
         """
-        result = self.validate_file(file_path)
+        result = self.validate_file(file_path, context)
         return not result.get("valid", False)
 
@@ -1,7 +1,13 @@
 """Layer 3: Final Quote Guardrail - Prevents price hallucinations."""
 
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable
+
+# Handle both relative and absolute imports
+try:
+    from instrumentation import LAYER, REJECTION, instrumented, record_event
+except ImportError:
+    from ..instrumentation import LAYER, REJECTION, instrumented, record_event
 
 class QuoteGuardrail:
     """Output guardrail that prevents the agent from generating prices without using the pricing tool."""
@@ -10,7 +16,8 @@ class QuoteGuardrail:
         self.price_pattern = re.compile(r'\$[\d,]+\.?\d*')
         self.allowed_price_source = "calculate_price_tool"
     
-    def validate_response(self, response_text: str, tool_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @instrumented(LAYER, "quote")
+    def validate_response(self, response_text: str, tool_calls: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Validate that any prices in the response came from the pricing tool.
         
@@ -43,6 +50,7 @@ class QuoteGuardrail:
         )
         
         if not pricing_tool_used:
+            record_event(REJECTION, "quote")
             return {
                 "valid": False,
                 "error": "Price mentioned in response but calculate_price tool was not used",
@@ -61,7 +69,7 @@ class QuoteGuardrail:
             "pricing_tool_used": True
         }
     
-    def should_intervene(self, response_text: str, tool_calls: List[Dict[str, Any]]) -> bool:
+    def should_intervene(self, response_text: str, tool_calls: Iterable[Dict[str, Any]]) -> bool:
         """
         Determine if the guardrail should intervene (block the response).
         
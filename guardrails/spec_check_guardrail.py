@@ -1,21 +1,42 @@
 """Layer 1: Spec-Check Guardrail - Validates order specifications against shop capabilities."""
 
-import json
-from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Mapping, Optional, List, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from instrumentation import LAYER, REJECTION, instrumented, record_event
+    from tools.config_store import CONFIG_STORE
+    from tools.paper_index import get_paper_index
+except ImportError:
+    from ..instrumentation import LAYER, REJECTION, instrumented, record_event
+    from ..tools.config_store import CONFIG_STORE
+    from ..tools.paper_index import get_paper_index
 
 class SpecCheckGuardrail:
     """Input guardrail that ensures customer orders are possible given shop capabilities."""
     
     def __init__(self):
-        self.capabilities = self._load_capabilities()
-        self.system_prompt_template = self._build_system_prompt()
+        # (config digest, prompt) swapped as one tuple so concurrent readers never see a mismatched pair
+        self._prompt_cache: Tuple[Optional[str], str] = (None, "")
+    
+    @property
+    def capabilities(self) -> Mapping[str, Any]:
+        """Current shop capabilities from the shared config store."""
+        return self._load_capabilities()
+    
+    def _load_capabilities(self) -> Mapping[str, Any]:
+        """Load shop capabilities from the shared config store."""
+        return CONFIG_STORE.get("shop_capabilities")
     
-    def _load_capabilities(self) -> Dict[str, Any]:
-        """Load shop capabilities from config."""
-        config_path = Path(__file__).parent.parent / "config" / "shop_capabilities.json"
-        with open(config_path, "r") as f:
-            return json.load(f)
+    @property
+    def system_prompt_template(self) -> str:
+        """System prompt, rebuilt only when the capability manifest changes on disk."""
+        digest = CONFIG_STORE.digest("shop_capabilities")
+        cached_digest, prompt = self._prompt_cache
+        if digest != cached_digest:
+            prompt = self._build_system_prompt()
+            self._prompt_cache = (digest, prompt)
+        return prompt
     
     def _build_system_prompt(self) -> str:
         """Build the system prompt with Shop Capability Manifest."""
@@ -62,6 +83,7 @@ CRITICAL RULES:
 """
         return prompt
     
+    @instrumented(LAYER, "spec_check")
     def validate_order_spec(self, order_spec: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate an order specification.
@@ -74,6 +96,7 @@ CRITICAL RULES:
         """
         errors = []
         warnings = []
+        capabilities = self.capabilities
         
         # Check paper stock
         paper_stock = order_spec.get("paper_stock")
@@ -84,10 +107,11 @@ CRITICAL RULES:
             errors.append("Paper stock not specified")
         else:
             # This would typically call check_inventory tool
-            if paper_stock not in self.capabilities["paper_stocks"]:
+            paper_stock = get_paper_index().resolve(paper_stock) or paper_stock
+            if paper_stock not in capabilities["paper_stocks"]:
                 errors.append(f"Paper stock '{paper_stock}' not available")
             else:
-                stock_info = self.capabilities["paper_stocks"][paper_stock]
+                stock_info = capabilities["paper_stocks"][paper_stock]
                 if color not in stock_info["colors"]:
                     errors.append(f"Color '{color}' not available for {paper_stock}")
                 if finish not in stock_info["finish"]:
@@ -95,23 +119,26 @@ CRITICAL RULES:
         
         # Check printing capabilities
         if order_spec.get("full_color") and order_spec.get("dark_paper"):
-            if not self.capabilities["printing_capabilities"]["white_ink"]:
+            if not capabilities["printing_capabilities"]["white_ink"]:
                 errors.append("Full-color printing on dark paper requires white ink, which is not available")
         
         # Check size limits
         width = order_spec.get("width_inches")
         height = order_spec.get("height_inches")
         if width and height:
-            max_w = self.capabilities["size_limits"]["max_width_inches"]
-            max_h = self.capabilities["size_limits"]["max_height_inches"]
-            min_w = self.capabilities["size_limits"]["min_width_inches"]
-            min_h = self.capabilities["size_limits"]["min_height_inches"]
+            max_w = capabilities["size_limits"]["max_width_inches"]
+            max_h = capabilities["size_limits"]["max_height_inches"]
+            min_w = capabilities["size_limits"]["min_width_inches"]
+            min_h = capabilities["size_limits"]["min_height_inches"]
             
             if width > max_w or height > max_h:
                 errors.append(f"Size {width}\" × {height}\" exceeds maximum {max_w}\" × {max_h}\"")
             if width < min_w or height < min_h:
                 errors.append(f"Size {width}\" × {height}\" is below minimum {min_w}\" × {min_h}\"")
         
+        if errors:
+            record_event(REJECTION, "spec_check")
+        
         return {
             "valid": len(errors) == 0,
             "errors": errors,
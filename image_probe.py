@@ -0,0 +1,573 @@
+"""
+Header-only image metadata probe.
+
+Reads just enough of a file (JPEG markers, PNG chunks, TIFF IFDs, HEIF boxes)
+to report pixel dimensions, DPI, EXIF orientation, color mode and ICC profile
+presence - without decoding any pixel data.
+"""
+
+import io
+import struct
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+# Never read more than this much of a single metadata segment/box into memory
+MAX_SEGMENT_BYTES = 1024 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1", b"avif"}
+
+# JPEG start-of-frame markers (C4 = DHT, C8 = JPG extension, CC = DAC are not frames)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+PNG_COLOR_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+JPEG_COLOR_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+
+TIFF_TAG_WIDTH = 256
+TIFF_TAG_HEIGHT = 257
+TIFF_TAG_BITS_PER_SAMPLE = 258
+TIFF_TAG_PHOTOMETRIC = 262
+TIFF_TAG_ORIENTATION = 274
+TIFF_TAG_SAMPLES_PER_PIXEL = 277
+TIFF_TAG_X_RESOLUTION = 282
+TIFF_TAG_Y_RESOLUTION = 283
+TIFF_TAG_RESOLUTION_UNIT = 296
+TIFF_TAG_EXTRA_SAMPLES = 338
+TIFF_TAG_ICC_PROFILE = 34675
+
+# TIFF field type -> (struct code, size in bytes)
+TIFF_TYPES = {
+    1: ("B", 1), 2: ("c", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8),
+    6: ("b", 1), 7: ("B", 1), 8: ("h", 2), 9: ("i", 4), 10: ("ii", 8),
+    11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8), 18: ("Q", 8),
+}
+
+
+class ProbeError(ValueError):
+    """Raised when a file's headers cannot be parsed."""
+
+
+class TruncatedHeaderError(ProbeError):
+    """Raised when the data ends before the headers do (e.g., probing a partial upload)."""
+
+
+@dataclass
+class ImageMetadata:
+    """Image properties read from file headers."""
+    format: str  # Pillow-style format name: "JPEG", "PNG", "TIFF", "HEIF"
+    width: int
+    height: int
+    dpi: Optional[Tuple[float, float]] = None
+    orientation: int = 1  # EXIF orientation, 1 = upright
+    color_mode: Optional[str] = None  # Pillow-style mode: "RGB", "L", "CMYK", ...
+    has_icc_profile: bool = False
+    bit_depth: Optional[int] = None
+
+    @property
+    def display_size(self) -> Tuple[int, int]:
+        """Pixel size after applying EXIF orientation (5-8 are rotated 90 degrees)."""
+        if self.orientation in (5, 6, 7, 8):
+            return self.height, self.width
+        return self.width, self.height
+
+    @property
+    def pixel_count(self) -> int:
+        return self.width * self.height
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["display_size"] = self.display_size
+        return result
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise TruncatedHeaderError("Unexpected end of file while reading headers")
+    return data
+
+
+# ---------------------------------------------------------------------------
+# TIFF / EXIF
+# ---------------------------------------------------------------------------
+
+def _read_ifd0(f: BinaryIO, base: int = 0) -> Tuple[Dict[int, Any], str]:
+    """
+    Read the first IFD of a TIFF structure starting at ``base`` in ``f``.
+
+    Returns:
+        Tuple of ({tag: value}, byte order)
+    """
+    f.seek(base)
+    header = _read_exact(f, 8)
+    if header[:2] == b"II":
+        order = "<"
+    elif header[:2] == b"MM":
+        order = ">"
+    else:
+        raise ProbeError("Invalid TIFF byte order")
+
+    magic = struct.unpack(order + "H", header[2:4])[0]
+    if magic == 42:
+        big = False
+        ifd_offset = struct.unpack(order + "I", header[4:8])[0]
+    elif magic == 43:
+        big = True
+        ifd_offset = struct.unpack(order + "Q", _read_exact(f, 8))[0]
+    else:
+        raise ProbeError("Invalid TIFF magic number")
+
+    f.seek(base + ifd_offset)
+    if big:
+        count = struct.unpack(order + "Q", _read_exact(f, 8))[0]
+        entry_size, inline_size = 20, 8
+    else:
+        count = struct.unpack(order + "H", _read_exact(f, 2))[0]
+        entry_size, inline_size = 12, 4
+    if count > 4096:
+        raise ProbeError("Implausible TIFF IFD entry count")
+    entries = _read_exact(f, count * entry_size)
+
+    wanted = {
+        TIFF_TAG_WIDTH, TIFF_TAG_HEIGHT, TIFF_TAG_BITS_PER_SAMPLE, TIFF_TAG_PHOTOMETRIC,
+        TIFF_TAG_ORIENTATION, TIFF_TAG_SAMPLES_PER_PIXEL, TIFF_TAG_X_RESOLUTION,
+        TIFF_TAG_Y_RESOLUTION, TIFF_TAG_RESOLUTION_UNIT, TIFF_TAG_EXTRA_SAMPLES,
+    }
+    tags: Dict[int, Any] = {}
+    for i in range(count):
+        entry = entries[i * entry_size:(i + 1) * entry_size]
+        if big:
+            tag, field_type, value_count = struct.unpack(order + "HHQ", entry[:12])
+            value_bytes = entry[12:20]
+        else:
+            tag, field_type, value_count = struct.unpack(order + "HHI", entry[:8])
+            value_bytes = entry[8:12]
+
+        if tag == TIFF_TAG_ICC_PROFILE:
+            tags[tag] = value_count > 0
+            continue
+        if tag not in wanted or field_type not in TIFF_TYPES:
+            continue
+
+        code, size = TIFF_TYPES[field_type]
+        total = size * value_count
+        if total > inline_size:
+            if total > MAX_SEGMENT_BYTES:
+                continue
+            offset = struct.unpack(order + ("Q" if big else "I"), value_bytes[:inline_size])[0]
+            position = f.tell()
+            f.seek(base + offset)
+            value_bytes = _read_exact(f, total)
+            f.seek(position)
+        values = struct.unpack(order + code * value_count, value_bytes[:total])
+
+        if field_type in (5, 10):
+            values = tuple(
+                values[j] / values[j + 1] if values[j + 1] else 0.0
+                for j in range(0, len(values), 2)
+            )
+        tags[tag] = values[0] if len(values) == 1 else values
+
+    return tags, order
+
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, tuple) else value
+
+
+def _tiff_dpi(tags: Dict[int, Any]) -> Optional[Tuple[float, float]]:
+    """Convert TIFF/EXIF resolution tags to dots per inch (None if absent or unitless)."""
+    x_res = tags.get(TIFF_TAG_X_RESOLUTION)
+    y_res = tags.get(TIFF_TAG_Y_RESOLUTION, x_res)
+    if not x_res:
+        return None
+    unit = _first(tags.get(TIFF_TAG_RESOLUTION_UNIT, 2))
+    if unit == 3:  # centimeters
+        return float(x_res) * 2.54, float(y_res) * 2.54
+    if unit == 2:  # inches
+        return float(x_res), float(y_res)
+    return None
+
+
+def _tiff_color_mode(tags: Dict[int, Any]) -> Optional[str]:
+    photometric = tags.get(TIFF_TAG_PHOTOMETRIC)
+    samples = tags.get(TIFF_TAG_SAMPLES_PER_PIXEL, 1)
+    bits = _first(tags.get(TIFF_TAG_BITS_PER_SAMPLE, 1))
+    has_alpha = TIFF_TAG_EXTRA_SAMPLES in tags
+
+    if photometric in (0, 1):
+        if bits == 1:
+            return "1"
+        return "LA" if samples >= 2 else ("I;16" if bits == 16 else "L")
+    if photometric in (2, 6):
+        return "RGBA" if samples >= 4 or has_alpha else "RGB"
+    if photometric == 3:
+        return "P"
+    if photometric == 5:
+        return "CMYK"
+    if photometric == 8:
+        return "LAB"
+    return None
+
+
+def _probe_tiff(f: BinaryIO) -> ImageMetadata:
+    tags, _ = _read_ifd0(f)
+    if TIFF_TAG_WIDTH not in tags or TIFF_TAG_HEIGHT not in tags:
+        raise ProbeError("TIFF is missing image dimensions")
+    return ImageMetadata(
+        format="TIFF",
+        width=int(tags[TIFF_TAG_WIDTH]),
+        height=int(tags[TIFF_TAG_HEIGHT]),
+        dpi=_tiff_dpi(tags),
+        orientation=int(tags.get(TIFF_TAG_ORIENTATION, 1)),
+        color_mode=_tiff_color_mode(tags),
+        has_icc_profile=bool(tags.get(TIFF_TAG_ICC_PROFILE, False)),
+        bit_depth=_first(tags.get(TIFF_TAG_BITS_PER_SAMPLE, 1)),
+    )
+
+
+def _parse_exif(payload: bytes) -> Dict[int, Any]:
+    """Parse the IFD0 tags of an EXIF payload (TIFF structure, without the "Exif\\0\\0" prefix)."""
+    try:
+        tags, _ = _read_ifd0(io.BytesIO(payload))
+    except (ProbeError, struct.error):
+        return {}
+    return tags
+
+
+# ---------------------------------------------------------------------------
+# JPEG
+# ---------------------------------------------------------------------------
+
+def _probe_jpeg(f: BinaryIO) -> ImageMetadata:
+    f.seek(2)  # past SOI
+    jfif_dpi: Optional[Tuple[float, float]] = None
+    exif_tags: Dict[int, Any] = {}
+    has_icc = False
+
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise TruncatedHeaderError("JPEG ended before a frame header was found")
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            raise TruncatedHeaderError("JPEG ended before a frame header was found")
+        code = marker[0]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue  # standalone markers have no length
+        if code == 0xD9:
+            raise ProbeError("JPEG has no frame header")
+
+        length = struct.unpack(">H", _read_exact(f, 2))[0] - 2
+        if length < 0:
+            raise ProbeError("Invalid JPEG segment length")
+
+        if code in JPEG_SOF_MARKERS:
+            precision, height, width, components = struct.unpack(">BHHB", _read_exact(f, 6))
+            dpi = jfif_dpi or _tiff_dpi(exif_tags)
+            return ImageMetadata(
+                format="JPEG",
+                width=width,
+                height=height,
+                dpi=dpi,
+                orientation=int(_first(exif_tags.get(TIFF_TAG_ORIENTATION, 1)) or 1),
+                color_mode=JPEG_COLOR_MODES.get(components),
+                has_icc_profile=has_icc,
+                bit_depth=precision,
+            )
+
+        if code == 0xE0 and length >= 12:  # APP0 / JFIF
+            payload = _read_exact(f, length)
+            if payload[:5] == b"JFIF\x00":
+                units, x_density, y_density = struct.unpack(">BHH", payload[7:12])
+                if units == 1 and x_density:
+                    jfif_dpi = (float(x_density), float(y_density))
+                elif units == 2 and x_density:
+                    jfif_dpi = (x_density * 2.54, y_density * 2.54)
+        elif code == 0xE1 and length <= MAX_SEGMENT_BYTES:  # APP1 / EXIF
+            payload = _read_exact(f, length)
+            if payload[:6] == b"Exif\x00\x00":
+                exif_tags = _parse_exif(payload[6:])
+        elif code == 0xE2 and length >= 12:  # APP2 / ICC profile chunk
+            has_icc = has_icc or _read_exact(f, 12) == b"ICC_PROFILE\x00"
+            f.seek(length - 12, io.SEEK_CUR)
+        else:
+            f.seek(length, io.SEEK_CUR)
+
+
+# ---------------------------------------------------------------------------
+# PNG
+# ---------------------------------------------------------------------------
+
+def _probe_png(f: BinaryIO) -> ImageMetadata:
+    f.seek(len(PNG_SIGNATURE))
+    length, chunk_type = struct.unpack(">I4s", _read_exact(f, 8))
+    if chunk_type != b"IHDR" or length < 13:
+        raise ProbeError("PNG is missing its IHDR chunk")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", _read_exact(f, 10))
+    f.seek(length - 10 + 4, io.SEEK_CUR)  # rest of IHDR + CRC
+
+    metadata = ImageMetadata(
+        format="PNG",
+        width=width,
+        height=height,
+        color_mode=PNG_COLOR_MODES.get(color_type),
+        bit_depth=bit_depth,
+    )
+
+    # Ancillary chunks we care about all precede the first IDAT
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        if chunk_type == b"pHYs" and length == 9:
+            x_ppu, y_ppu, unit = struct.unpack(">IIB", _read_exact(f, 9))
+            if unit == 1 and x_ppu:
+                metadata.dpi = (x_ppu * 0.0254, y_ppu * 0.0254)
+            f.seek(4, io.SEEK_CUR)
+        elif chunk_type == b"eXIf" and length <= MAX_SEGMENT_BYTES:
+            tags = _parse_exif(_read_exact(f, length))
+            metadata.orientation = int(_first(tags.get(TIFF_TAG_ORIENTATION, 1)) or 1)
+            f.seek(4, io.SEEK_CUR)
+        else:
+            if chunk_type == b"iCCP":
+                metadata.has_icc_profile = True
+            f.seek(length + 4, io.SEEK_CUR)
+
+    return metadata
+
+
+# ---------------------------------------------------------------------------
+# HEIF / HEIC (ISO base media file format)
+# ---------------------------------------------------------------------------
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """Yield (type, payload_start, payload_end) for each box in ``data[start:end]``."""
+    end = len(data) if end is None else end
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[position:position + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[position + 8:position + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return
+        yield box_type, position + header, min(position + size, end)
+        position += size
+
+
+def _read_top_level_box(f: BinaryIO, wanted: bytes) -> Optional[bytes]:
+    """Scan top-level boxes with seeks (skipping mdat) and return the payload of ``wanted``."""
+    f.seek(0)
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", _read_exact(f, 8))[0]
+            header_size = 16
+        if box_type == wanted:
+            payload_size = (size - header_size) if size else MAX_SEGMENT_BYTES
+            if payload_size > MAX_SEGMENT_BYTES:
+                raise ProbeError(f"HEIF '{wanted.decode()}' box is too large")
+            payload = f.read(payload_size)
+            if size and len(payload) < payload_size:
+                raise TruncatedHeaderError(f"HEIF '{wanted.decode()}' box is cut off")
+            return payload
+        if size == 0:
+            return None
+        if size < header_size:
+            raise ProbeError("Invalid HEIF box size")
+        f.seek(size - header_size, io.SEEK_CUR)
+
+
+def _probe_heif(f: BinaryIO) -> ImageMetadata:
+    meta = _read_top_level_box(f, b"meta")
+    if meta is None:
+        raise ProbeError("HEIF file has no meta box")
+    # The whole box was read, so a short field means a malformed box, not a partial upload
+    try:
+        return _parse_heif_meta(meta)
+    except (IndexError, struct.error) as e:
+        raise ProbeError(f"Malformed HEIF meta box: {e}")
+
+
+def _parse_heif_meta(meta: bytes) -> ImageMetadata:
+    primary_item: Optional[int] = None
+    properties: List[Tuple[bytes, bytes]] = []
+    associations: Dict[int, List[int]] = {}
+
+    for box_type, start, end in _iter_boxes(meta, 4):  # meta is a full box
+        if box_type == b"pitm":
+            pitm = meta[start:end]
+            primary_item = struct.unpack_from(">H" if pitm[0] == 0 else ">I", pitm, 4)[0]
+        elif box_type == b"iprp":
+            for sub_type, sub_start, sub_end in _iter_boxes(meta, start, end):
+                if sub_type == b"ipco":
+                    properties = [
+                        (prop_type, meta[prop_start:prop_end])
+                        for prop_type, prop_start, prop_end in _iter_boxes(meta, sub_start, sub_end)
+                    ]
+                elif sub_type == b"ipma":
+                    # Sliced so that a bad count fails here instead of reading the next box
+                    ipma = meta[sub_start:sub_end]
+                    version = ipma[0]
+                    flags = int.from_bytes(ipma[1:4], "big")
+                    entry_count = struct.unpack_from(">I", ipma, 4)[0]
+                    position = 8
+                    for _ in range(entry_count):
+                        if version < 1:
+                            item_id = struct.unpack_from(">H", ipma, position)[0]
+                            position += 2
+                        else:
+                            item_id = struct.unpack_from(">I", ipma, position)[0]
+                            position += 4
+                        count = ipma[position]
+                        position += 1
+                        indices = []
+                        for _ in range(count):
+                            if flags & 1:
+                                indices.append(struct.unpack_from(">H", ipma, position)[0] & 0x7FFF)
+                                position += 2
+                            else:
+                                indices.append(ipma[position] & 0x7F)
+                                position += 1
+                        associations[item_id] = indices
+
+    # Properties of the primary item (1-based indices into ipco); fall back to all of them
+    if primary_item is not None and primary_item in associations:
+        item_properties = [properties[i - 1] for i in associations[primary_item] if 0 < i <= len(properties)]
+    else:
+        item_properties = properties
+
+    width = height = None
+    rotation = 0
+    has_icc = False
+    has_alpha = False
+    for prop_type, payload in item_properties:
+        if prop_type == b"ispe" and len(payload) >= 12 and width is None:
+            width, height = struct.unpack(">II", payload[4:12])
+        elif prop_type == b"irot" and payload:
+            rotation = payload[0] & 0x03
+        elif prop_type == b"colr" and payload[:4] in (b"prof", b"rICC"):
+            has_icc = True
+    for item_id, indices in associations.items():
+        if item_id != primary_item and any(
+            0 < i <= len(properties) and properties[i - 1][0] == b"auxC"
+            and (b"alpha" in properties[i - 1][1] or b"auxid:1" in properties[i - 1][1]) for i in indices
+        ):
+            has_alpha = True
+
+    if width is None:
+        raise ProbeError("HEIF file has no image spatial extents (ispe)")
+
+    # irot is counter-clockwise quarter turns; map onto the equivalent EXIF orientation
+    orientation = {0: 1, 1: 8, 2: 3, 3: 6}[rotation]
+    return ImageMetadata(
+        format="HEIF",
+        width=width,
+        height=height,
+        orientation=orientation,
+        color_mode="RGBA" if has_alpha else "RGB",
+        has_icc_profile=has_icc,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+def detect_format(head: bytes) -> Optional[str]:
+    """
+    Identify a file from its first bytes (64 are enough in practice).
+
+    Returns:
+        "JPEG", "PNG", "TIFF", "HEIF", "PDF", or None if unrecognized
+    """
+    if head[:2] == b"\xff\xd8":
+        return "JPEG"
+    if head[:8] == PNG_SIGNATURE:
+        return "PNG"
+    if head[:4] in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+        return "TIFF"
+    if head[:5] == b"%PDF-":
+        return "PDF"
+    if head[4:8] == b"ftyp":
+        ftyp_size = struct.unpack(">I", head[:4])[0]
+        ftyp = head[8:min(ftyp_size, len(head))]
+        brands = {ftyp[i:i + 4] for i in range(0, len(ftyp) - 3, 4)}
+        if brands & HEIF_BRANDS:
+            return "HEIF"
+    return None
+
+
+def probe_stream(f: BinaryIO) -> ImageMetadata:
+    """
+    Probe an open, seekable binary stream.
+
+    Args:
+        f: Binary file object positioned anywhere (it is rewound)
+
+    Returns:
+        ImageMetadata read from the headers
+
+    Raises:
+        ProbeError: If the format is not recognized or the headers are malformed
+    """
+    f.seek(0)
+    head = f.read(16)
+    try:
+        if head[:2] == b"\xff\xd8":
+            return _probe_jpeg(f)
+        if head[:8] == PNG_SIGNATURE:
+            return _probe_png(f)
+        if head[:4] in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+            return _probe_tiff(f)
+        if head[4:8] == b"ftyp" and head[8:12] in HEIF_BRANDS:
+            return _probe_heif(f)
+        if head[4:8] == b"ftyp":
+            # Major brand may be generic; check the compatible brands list
+            ftyp = _read_top_level_box(f, b"ftyp") or b""
+            brands = {ftyp[i:i + 4] for i in range(8, len(ftyp) - 3, 4)}
+            if brands & HEIF_BRANDS:
+                return _probe_heif(f)
+    except struct.error as e:
+        # struct only fails on short buffers here - the headers were cut off
+        raise TruncatedHeaderError(f"Malformed image headers: {e}")
+    raise ProbeError("Unrecognized image format")
+
+
+def probe_bytes(data: bytes) -> ImageMetadata:
+    """Probe an in-memory prefix of a file (e.g., the first few KB of an upload)."""
+    return probe_stream(io.BytesIO(data))
+
+
+def probe_image(file_path: Union[str, Path]) -> ImageMetadata:
+    """
+    Probe an image file on disk without decoding pixels.
+
+    Args:
+        file_path: Path to a JPEG, PNG, TIFF or HEIF/HEIC file
+
+    Returns:
+        ImageMetadata read from the headers
+
+    Raises:
+        ProbeError: If the format is not recognized or the headers are malformed
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "rb", buffering=8192) as f:
+        return probe_stream(f)
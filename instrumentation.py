@@ -0,0 +1,108 @@
+"""
+Latency hooks for guardrail layers and tools.
+
+Layers and tools are wrapped in ``timed``/``instrumented``; anything that wants
+the timings (the performance benchmark, metrics) registers an observer. With no
+observers registered the hooks skip the clock entirely.
+
+Discrete outcomes (a layer rejecting an order, a cache hit or miss) go through
+``record_event`` to event observers in the same way.
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# Timing kinds
+LAYER = "layer"
+TOOL = "tool"
+
+# Event kinds (name is the layer or cache)
+REJECTION = "rejection"
+CACHE_HIT = "cache_hit"
+CACHE_MISS = "cache_miss"
+
+# observer(kind, name, seconds)
+Observer = Callable[[str, str, float], None]
+
+# event_observer(kind, name)
+EventObserver = Callable[[str, str], None]
+
+# Copy-on-write so the hot path reads them without locking
+_observers: Tuple[Observer, ...] = ()
+_event_observers: Tuple[EventObserver, ...] = ()
+_observers_lock = threading.Lock()
+
+
+def add_observer(observer: Observer):
+    """Start sending every timing to ``observer`` (called on the timed thread; keep it cheap)."""
+    global _observers
+    with _observers_lock:
+        _observers = _observers + (observer,)
+
+
+def remove_observer(observer: Observer):
+    global _observers
+    with _observers_lock:
+        _observers = tuple(registered for registered in _observers if registered is not observer)
+
+
+def add_event_observer(observer: EventObserver):
+    """Start sending every ``record_event`` to ``observer``."""
+    global _event_observers
+    with _observers_lock:
+        _event_observers = _event_observers + (observer,)
+
+
+def remove_event_observer(observer: EventObserver):
+    global _event_observers
+    with _observers_lock:
+        _event_observers = tuple(registered for registered in _event_observers if registered is not observer)
+
+
+def record_event(kind: str, name: str):
+    """Report a discrete outcome, e.g. ``record_event(REJECTION, "preflight")``."""
+    for observer in _event_observers:
+        observer(kind, name)
+
+
+class timed:
+    """
+    Context manager that reports the block's wall time as ``(kind, name)``.
+
+    Usage:
+        with timed(LAYER, "preflight"):
+            ...
+    """
+
+    __slots__ = ("kind", "name", "_started")
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self._started: Optional[float] = None
+
+    def __enter__(self) -> "timed":
+        self._started = time.perf_counter() if _observers else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._started is not None:
+            elapsed = time.perf_counter() - self._started
+            for observer in _observers:
+                observer(self.kind, self.name, elapsed)
+        return False
+
+
+def instrumented(kind: str, name: Optional[str] = None):
+    """Decorator form of ``timed``; the name defaults to the function's name."""
+    def decorator(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(kind, label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -148,6 +148,63 @@ def run_benchmark_test():
     print("=" * 60)
 
 
+def run_perf_benchmark(args):
+    """Benchmark both agent stacks on synthetic orders; writes a JSON report."""
+    import argparse
+    from perf_benchmark import ARTWORK_FORMATS, DEFAULT_MEGAPIXELS, STACKS, format_report, run_benchmark, write_report
+
+    parser = argparse.ArgumentParser(prog="main.py perf-benchmark")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--stacks", default=",".join(STACKS), help="Comma-separated: printshop,react")
+    parser.add_argument("--formats", default=",".join(ARTWORK_FORMATS))
+    parser.add_argument("--megapixels", default=",".join(f"{mp:g}" for mp in DEFAULT_MEGAPIXELS))
+    parser.add_argument("--concurrency", type=int, default=1, help="Orders in flight at once (threads)")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_report.json", help="JSON report path")
+    options = parser.parse_args(args)
+
+    report = run_benchmark(
+        orders=options.orders,
+        stacks=options.stacks.split(","),
+        formats=options.formats.split(","),
+        megapixels=[float(mp) for mp in options.megapixels.split(",")],
+        concurrency=options.concurrency,
+        warmup=options.warmup,
+        seed=options.seed
+    )
+    write_report(report, Path(options.output))
+    print(format_report(report))
+    print(f"\nReport written to {options.output}")
+
+
+def run_import_orders(args):
+    """Validate a CSV/JSONL order file in bulk; results go to a JSONL file."""
+    import argparse
+    from bulk_import import AGENT_KINDS, run_import
+
+    parser = argparse.ArgumentParser(prog="main.py import-orders")
+    parser.add_argument("input", help="Orders file (.csv with header row, or .jsonl)")
+    parser.add_argument("output", help="Results file (.jsonl)")
+    parser.add_argument("--agent", choices=AGENT_KINDS, default="printshop",
+                        help="printshop: full order checks; react: preflight of the request and file only")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+    options = parser.parse_args(args)
+
+    stats = run_import(
+        options.input,
+        options.output,
+        agent_kind=options.agent,
+        workers=options.workers,
+        checkpoint_every=options.checkpoint_every,
+        resume=not options.restart
+    )
+    print(f"Imported {stats.processed} orders ({stats.errors} errors) in {stats.elapsed:.1f}s "
+          f"- {stats.orders_per_second:.1f} orders/sec")
+
+
 def main():
     """Main function."""
     if len(sys.argv) > 1:
@@ -159,15 +216,21 @@ def main():
             test_tools()
         elif command == "benchmark":
             run_benchmark_test()
+        elif command == "perf-benchmark":
+            run_perf_benchmark(sys.argv[2:])
+        elif command == "import-orders":
+            run_import_orders(sys.argv[2:])
         else:
             print(f"Unknown command: {command}")
-            print("Available commands: test-guardrails, test-tools, benchmark")
+            print("Available commands: test-guardrails, test-tools, benchmark, perf-benchmark, import-orders")
     else:
         print("Print Shop AI Order Guardrail PoC")
         print("\nAvailable commands:")
         print("  python main.py test-guardrails  - Test all guardrail layers")
         print("  python main.py test-tools       - Test all tools")
         print("  python main.py benchmark        - Run benchmark order tests")
+        print("  python main.py perf-benchmark   - Latency/throughput benchmark (JSON report)")
+        print("  python main.py import-orders IN OUT - Validate a CSV/JSONL order file in bulk")
         print("\nOr run test_guardrails() for a quick demo")
 
 
@@ -0,0 +1,272 @@
+"""
+Prometheus text-format metrics for the order API.
+
+Layer/tool latencies, rejections and cache outcomes arrive through the
+instrumentation hooks; HTTP metrics come from ``instrument_flask_app`` or
+``MetricsMiddleware`` (ASGI). Everything is in-process: each worker process
+exposes its own series, as with any Prometheus multi-process target.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from instrumentation import (
+    CACHE_HIT, CACHE_MISS, LAYER, REJECTION, TOOL, add_event_observer, add_observer
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans header probes (sub-millisecond) to full PDF rasterization
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic counter, optionally labelled (label values passed as a tuple)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def label_sets(self) -> List[Labels]:
+        with self._lock:
+            return list(self._values)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Labels = ()):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {repr(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List = []
+        # Called before rendering, to refresh derived gauges
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+LAYER_LATENCY = REGISTRY.register(Histogram(
+    "printshop_layer_duration_seconds", "Time spent in each guardrail layer", ("layer",)))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "printshop_tool_duration_seconds", "Time spent in each tool call", ("tool",)))
+REJECTIONS = REGISTRY.register(Counter(
+    "printshop_rejections_total", "Orders rejected, by the layer that rejected them", ("layer",)))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "printshop_cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result")))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "printshop_cache_hit_ratio", "Hits / lookups since start, per cache", ("cache",)))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "printshop_http_requests_in_flight", "Requests currently being handled"))
+HTTP_IN_FLIGHT.set(0)
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "printshop_http_request_duration_seconds", "Request latency by endpoint", ("endpoint", "method")))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "printshop_http_requests_total", "Requests by endpoint, method and status", ("endpoint", "method", "status")))
+
+
+def _observe_timing(kind: str, name: str, seconds: float):
+    if kind == LAYER:
+        LAYER_LATENCY.observe(seconds, (name,))
+    elif kind == TOOL:
+        TOOL_LATENCY.observe(seconds, (name,))
+
+
+def _observe_event(kind: str, name: str):
+    if kind == REJECTION:
+        REJECTIONS.inc((name,))
+    elif kind == CACHE_HIT:
+        CACHE_REQUESTS.inc((name, "hit"))
+    elif kind == CACHE_MISS:
+        CACHE_REQUESTS.inc((name, "miss"))
+
+
+def _update_hit_ratios():
+    caches = {labels[0] for labels in CACHE_REQUESTS.label_sets()}
+    for cache in caches:
+        hits = CACHE_REQUESTS.value((cache, "hit"))
+        lookups = hits + CACHE_REQUESTS.value((cache, "miss"))
+        CACHE_HIT_RATIO.set(hits / lookups if lookups else 0.0, (cache,))
+
+
+REGISTRY.add_collector(_update_hit_ratios)
+
+_enabled = False
+_enable_lock = threading.Lock()
+
+
+def enable_metrics():
+    """Start collecting layer/tool/cache metrics in this process (idempotent)."""
+    global _enabled
+    with _enable_lock:
+        if not _enabled:
+            add_observer(_observe_timing)
+            add_event_observer(_observe_event)
+            _enabled = True
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def instrument_flask_app(app):
+    """Enable metrics and record in-flight count, latency and status of every Flask request."""
+    from flask import g, request
+
+    enable_metrics()
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _metrics_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        HTTP_IN_FLIGHT.dec()
+        endpoint = request.endpoint or "unmatched"
+        HTTP_LATENCY.observe(time.perf_counter() - started, (endpoint, request.method))
+        HTTP_REQUESTS.inc((endpoint, request.method, str(g.pop("metrics_status", 500))))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the same HTTP metrics as ``instrument_flask_app``."""
+
+    def __init__(self, app):
+        enable_metrics()
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router stores the matched endpoint in the (shared) scope
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            HTTP_LATENCY.observe(time.perf_counter() - started, (endpoint, scope["method"]))
+            HTTP_REQUESTS.inc((endpoint, scope["method"], str(status)))
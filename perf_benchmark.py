@@ -0,0 +1,402 @@
+"""
+Performance benchmark: synthetic orders with generated artwork, run through
+both agent stacks, reporting latency percentiles per guardrail layer and per
+tool, throughput and peak RSS. The JSON report is meant to be diffed between builds.
+"""
+
+import json
+import math
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from instrumentation import add_observer, remove_observer
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HEIF_AVAILABLE = True
+except ImportError:
+    HEIF_AVAILABLE = False
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+STACKS = ("printshop", "react")
+ARTWORK_FORMATS = ("jpeg", "png", "tiff", "pdf", "heic")
+DEFAULT_MEGAPIXELS = (1, 4, 12, 24)
+
+# Artwork alternates between these, so both preflight outcomes are exercised
+ARTWORK_DPI = (300, 150)
+
+# (width, height) in inches; the last two are outside the shop's size limits
+PRINT_SIZES = ((4, 6), (5, 7), (8, 10), (8.5, 11), (11, 17), (12, 18), (20, 30), (2, 3))
+
+# Paper as each stack names it; the last entry of each is unavailable or unknown
+FLAT_PAPERS = ("100lb Matte", "80lb Glossy", "110lb Cardstock", "65lb Text", "Metallic paper")
+PACKAGE_PAPERS = ("100lb_cardstock", "80lb_text", "14pt_cardstock", "kraft_cardstock")
+PAPER_COLORS = ("white", "white", "cream", "black")
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Artwork:
+    path: str
+    format: str
+    megapixels: float
+    dpi: int
+    bytes: int
+
+
+@dataclass
+class SyntheticOrder:
+    order_id: str
+    artwork: Artwork
+    width_inches: float
+    height_inches: float
+    paper: str
+    paper_stock: str
+    color: str
+    quantity: int
+    full_color: bool
+
+    def flat_order(self) -> Dict[str, Any]:
+        """The order as PrintShopAgent (app.py's /submit-order) receives it."""
+        return {
+            "email": f"bench-{self.order_id}@example.com",
+            "size": f"{self.width_inches:g}x{self.height_inches:g}",
+            "paper": self.paper,
+            "quantity": self.quantity,
+            "file_path": self.artwork.path,
+            "filename": Path(self.artwork.path).name
+        }
+
+    def spec(self) -> Dict[str, Any]:
+        """The order as SpecCheckGuardrail validates it."""
+        return {
+            "paper_stock": self.paper_stock,
+            "color": self.color,
+            "finish": "matte",
+            "full_color": self.full_color,
+            "dark_paper": self.color == "black",
+            "width_inches": self.width_inches,
+            "height_inches": self.height_inches
+        }
+
+    def customer_request(self) -> str:
+        return (f"I need {self.quantity} {self.width_inches:g}x{self.height_inches:g} prints "
+                f"on {self.color} {self.paper_stock.replace('_', ' ')}"
+                f"{', full color' if self.full_color else ''}")
+
+
+def _artwork_image(megapixels: float) -> "Image.Image":
+    """A photo-like 3:2 RGB image: smooth gradients plus grain, so it compresses realistically."""
+    width = int(math.sqrt(megapixels * 1_000_000 * 1.5))
+    height = int(width / 1.5)
+    size = (width, height)
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 40)
+    channel = Image.blend(gradient, noise, 0.35)
+    return Image.merge("RGB", (channel, channel.transpose(Image.Transpose.ROTATE_180), noise))
+
+
+def generate_artwork(
+    directory: Path,
+    formats: Sequence[str] = ARTWORK_FORMATS,
+    megapixels: Sequence[float] = DEFAULT_MEGAPIXELS
+) -> List[Artwork]:
+    """
+    Write one file per (format, megapixels) into ``directory``.
+
+    HEIC is skipped when pillow-heif isn't installed.
+    """
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow is required to generate benchmark artwork")
+    directory.mkdir(parents=True, exist_ok=True)
+
+    artwork = []
+    for mp_index, mp in enumerate(megapixels):
+        image = _artwork_image(mp)
+        for format_index, fmt in enumerate(formats):
+            if fmt == "heic" and not HEIF_AVAILABLE:
+                continue
+            dpi = ARTWORK_DPI[(mp_index + format_index) % len(ARTWORK_DPI)]
+            path = directory / f"art_{mp:g}mp_{dpi}dpi.{'jpg' if fmt == 'jpeg' else fmt}"
+            if fmt == "jpeg":
+                image.save(path, "JPEG", quality=90, dpi=(dpi, dpi))
+            elif fmt == "png":
+                image.save(path, "PNG", dpi=(dpi, dpi))
+            elif fmt == "tiff":
+                image.save(path, "TIFF", compression="tiff_lzw", dpi=(dpi, dpi))
+            elif fmt == "pdf":
+                # Page size is pixels / resolution, so the embedded image is placed at ``dpi``
+                image.save(path, "PDF", resolution=float(dpi))
+            elif fmt == "heic":
+                image.save(path, "HEIF", quality=85)
+            else:
+                raise ValueError(f"Unknown artwork format: {fmt}")
+            artwork.append(Artwork(str(path), fmt, mp, dpi, path.stat().st_size))
+    return artwork
+
+
+def synthetic_orders(count: int, artwork: Sequence[Artwork], seed: int = 0) -> List[SyntheticOrder]:
+    """Random but reproducible orders spread over the artwork, sizes and papers."""
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        width, height = rng.choice(PRINT_SIZES)
+        orders.append(SyntheticOrder(
+            order_id=f"BENCH-{i + 1:06d}",
+            artwork=rng.choice(artwork),
+            width_inches=width,
+            height_inches=height,
+            paper=rng.choice(FLAT_PAPERS),
+            paper_stock=rng.choice(PACKAGE_PAPERS),
+            color=rng.choice(PAPER_COLORS),
+            quantity=rng.choice((1, 10, 50, 100, 250, 500, 1000, 5000)),
+            full_color=rng.random() < 0.8
+        ))
+    return orders
+
+
+def percentiles(samples: Iterable[float]) -> Dict[str, Any]:
+    """Count, mean, p50/p95/p99 and max of latencies in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    summary = {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3)
+    }
+    for p in PERCENTILES:
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        summary[f"p{p}_ms"] = round(ordered[rank - 1] * 1000, 3)
+    summary["max_ms"] = round(ordered[-1] * 1000, 3)
+    return summary
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """High-water RSS of this process and of its reaped child processes."""
+    if not RESOURCE_AVAILABLE:
+        return {"self": None, "children": None}
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1)
+    }
+
+
+class LatencyRecorder:
+    """Instrumentation observer collecting raw timings per (kind, name)."""
+
+    def __init__(self):
+        self.samples: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+
+    def __call__(self, kind: str, name: str, seconds: float):
+        # list.append is atomic, so concurrent orders can record without a lock
+        self.samples[(kind, name)].append(seconds)
+
+    def summary(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        return {name: percentiles(values) for (k, name), values in sorted(self.samples.items()) if k == kind}
+
+
+def _printshop_runner() -> Callable[[SyntheticOrder], str]:
+    from agent import PrintShopAgent
+    agent = PrintShopAgent()
+
+    def run(order: SyntheticOrder) -> str:
+        result = agent.process_order(order.flat_order())
+        return "accepted" if result.get("valid") else f"rejected:{result.get('layer', 'input')}"
+    return run
+
+
+def _react_runner() -> Callable[[SyntheticOrder], str]:
+    """Drives ReActAgent through all three layers, the way the LLM loop would."""
+    from agent.react_agent import AgentRun, ReActAgent
+    agent = ReActAgent()
+
+    def run(order: SyntheticOrder) -> str:
+        spec = agent.spec_check.validate_order_spec(order.spec())
+        if not spec["valid"]:
+            return "rejected:spec_check"
+
+        agent_run = AgentRun()
+        agent.call_tool("check_inventory", agent_run, paper_stock=order.paper_stock,
+                        color=order.color, finish="matte")
+        result = agent.process_order(order.customer_request(), order.artwork.path, run=agent_run)
+        if result.get("status") == "rejected":
+            return f"rejected:{result.get('reason', 'preflight')}"
+
+        price = agent.call_tool("calculate_price", agent_run, paper_stock=order.paper_stock,
+                                quantity=order.quantity, width_inches=order.width_inches,
+                                height_inches=order.height_inches, full_color=order.full_color)
+        quote = agent.validate_final_response(f"Your total is ${price.get('total_price', 0):.2f}.", agent_run)
+        return "accepted" if quote["valid"] else "rejected:quote"
+    return run
+
+
+RUNNERS = {"printshop": _printshop_runner, "react": _react_runner}
+
+
+def benchmark_stack(stack: str, orders: Sequence[SyntheticOrder], concurrency: int = 1,
+                    warmup: int = 20, run: Optional[Callable[[SyntheticOrder], str]] = None) -> Dict[str, Any]:
+    """Run ``orders`` through one stack and summarize latencies, throughput and outcomes."""
+    if run is None:
+        run = RUNNERS[stack]()
+    for order in orders[:warmup]:
+        run(order)
+
+    recorder = LatencyRecorder()
+    outcomes: Counter = Counter()
+    outcomes_lock = threading.Lock()
+
+    def timed_run(order: SyntheticOrder):
+        started = time.perf_counter()
+        try:
+            outcome = run(order)
+        except Exception as e:
+            outcome = f"error:{type(e).__name__}"
+        recorder("order", stack, time.perf_counter() - started)
+        with outcomes_lock:
+            outcomes[outcome] += 1
+
+    add_observer(recorder)
+    started = time.perf_counter()
+    try:
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(timed_run, orders))
+        else:
+            for order in orders:
+                timed_run(order)
+    finally:
+        elapsed = time.perf_counter() - started
+        remove_observer(recorder)
+
+    return {
+        "orders": len(orders),
+        "elapsed_s": round(elapsed, 3),
+        "orders_per_second": round(len(orders) / elapsed, 2) if elapsed > 0 else None,
+        "order_latency": percentiles(recorder.samples[("order", stack)]),
+        "layers": recorder.summary("layer"),
+        "tools": recorder.summary("tool"),
+        "outcomes": dict(outcomes.most_common()),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_benchmark(
+    orders: int = 2000,
+    stacks: Sequence[str] = STACKS,
+    formats: Sequence[str] = ARTWORK_FORMATS,
+    megapixels: Sequence[float] = DEFAULT_MEGAPIXELS,
+    concurrency: int = 1,
+    warmup: int = 20,
+    seed: int = 0,
+    workdir: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Generate artwork and orders, benchmark each stack, and return the report.
+
+    Artwork goes to a temporary directory (removed afterwards) unless ``workdir`` is given.
+    """
+    for stack in stacks:
+        if stack not in RUNNERS:
+            raise ValueError(f"Unknown stack {stack!r}; expected one of {STACKS}")
+
+    temp_dir = None
+    if workdir is None:
+        temp_dir = tempfile.mkdtemp(prefix="printshop-bench-")
+        workdir = Path(temp_dir)
+    try:
+        generation_started = time.perf_counter()
+        artwork = generate_artwork(Path(workdir), formats, megapixels)
+        generation_s = time.perf_counter() - generation_started
+        order_list = synthetic_orders(orders, artwork, seed)
+
+        report = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "orders": orders,
+                "concurrency": concurrency,
+                "warmup": warmup,
+                "seed": seed,
+                "formats": sorted({item.format for item in artwork}),
+                "megapixels": list(megapixels),
+                "artwork_files": len(artwork),
+                "artwork_bytes": sum(item.bytes for item in artwork),
+                "artwork_generation_s": round(generation_s, 2)
+            },
+            "artwork": [asdict(item) for item in artwork],
+            "stacks": {}
+        }
+        for stack in stacks:
+            # A stack that can't be loaded (missing dependency, broken import) is reported, not fatal
+            try:
+                run = RUNNERS[stack]()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"Skipping stack '{stack}': could not load it ({error})", file=sys.stderr)
+                report["stacks"][stack] = {"skipped": error}
+                continue
+            report["stacks"][stack] = benchmark_stack(stack, order_list, concurrency, warmup, run=run)
+        report["peak_rss_mb"] = peak_rss_mb()
+        return report
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary of a benchmark report."""
+    lines = []
+    config = report["config"]
+    lines.append(f"{config['orders']} orders, {config['artwork_files']} artwork files "
+                 f"({', '.join(config['formats'])}), concurrency {config['concurrency']}")
+    for stack, result in report["stacks"].items():
+        lines.append("")
+        if "skipped" in result:
+            lines.append(f"[{stack}] skipped: {result['skipped']}")
+            continue
+        lines.append(f"[{stack}] {result['orders_per_second']} orders/sec, "
+                     f"peak RSS {result['peak_rss_mb']['self']} MB")
+        rows = [("order", result["order_latency"])]
+        rows += [(f"layer {name}", stats) for name, stats in result["layers"].items()]
+        rows += [(f"tool {name}", stats) for name, stats in result["tools"].items()]
+        lines.append(f"  {'':28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for label, stats in rows:
+            if not stats.get("count"):
+                continue
+            lines.append(f"  {label:28} {stats['count']:>7} {stats['p50_ms']:>9} "
+                         f"{stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+        lines.append("  outcomes: " + ", ".join(f"{k}={v}" for k, v in result["outcomes"].items()))
+    return "\n".join(lines)
+
+
+def write_report(report: Dict[str, Any], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
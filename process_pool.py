@@ -0,0 +1,142 @@
+"""
+Warm process pool for CPU-bound image work.
+
+HEIC decoding, PDF rasterization and JPEG encoding hold the GIL, so in a
+threaded server they serialize no matter how many threads there are. With
+PRINTSHOP_PROCESS_WORKERS set to a worker count, these calls run in a pool of
+pre-started processes instead: codecs are registered and config is parsed once
+per worker, file paths go in and only small result dicts come back.
+
+Unset or 0 (the default) runs everything inline, exactly as before.
+"""
+
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Optional
+
+PROCESS_WORKERS = int(os.environ.get("PRINTSHOP_PROCESS_WORKERS", "0") or 0)
+
+# Set in pool workers so nested calls run inline instead of re-submitting
+_IN_WORKER = False
+
+
+def warm_worker():
+    """Pool initializer: pay every import/registration cost once per worker."""
+    global _IN_WORKER
+    _IN_WORKER = True
+    # Ctrl-C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    try:
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+    except ImportError:
+        pass
+    try:
+        from PIL import Image
+        Image.init()  # load every format plugin now, not on first open
+    except ImportError:
+        pass
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        pass
+    try:
+        import pdf2image  # noqa: F401
+    except ImportError:
+        pass
+    try:
+        from tools.config_store import get_config
+        get_config("shop_capabilities")
+        get_config("pricing")
+    except Exception:
+        pass
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class WarmProcessPool:
+    """
+    A ProcessPoolExecutor started eagerly, with warmed workers.
+
+    Workers are started with forkserver (spawn where unavailable) rather than a
+    plain fork, so they never inherit the server's threads, locks or SQLite
+    connections. If the pool breaks (e.g., a worker is OOM-killed), it is
+    rebuilt once and the call is retried inline.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                try:
+                    context = get_context("forkserver")
+                except ValueError:
+                    context = get_context("spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context, initializer=warm_worker
+                )
+            return self._executor
+
+    def warm(self):
+        """Start every worker now so the first real request doesn't pay for it."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+            future.result()
+
+    def run(self, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a module-level function in a worker and return its result.
+
+        Arguments and the result are pickled, so pass paths, not images.
+        """
+        try:
+            return self._get_executor().submit(function, *args, **kwargs).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            return function(*args, **kwargs)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_default_pool: Optional[WarmProcessPool] = None
+_default_pid: Optional[int] = None
+_default_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[WarmProcessPool]:
+    """The process-wide pool, or None when process mode is off (or inside a worker)."""
+    global _default_pool, _default_pid
+    if PROCESS_WORKERS <= 0 or _IN_WORKER:
+        return None
+    with _default_lock:
+        # A forked server worker (e.g., gunicorn) gets its own pool
+        if _default_pool is None or _default_pid != os.getpid():
+            _default_pool = WarmProcessPool(PROCESS_WORKERS)
+            _default_pid = os.getpid()
+        return _default_pool
+
+
+def run_cpu_bound(function: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run ``function(*args, **kwargs)`` in the warm pool if enabled, else inline."""
+    pool = get_process_pool()
+    if pool is None:
+        return function(*args, **kwargs)
+    return pool.run(function, *args, **kwargs)
@@ -0,0 +1,246 @@
+"""
+On-demand request profiling.
+
+A profiled request runs under cProfile while a sampler thread records its
+stack every few milliseconds. Each profile is written to PRINTSHOP_PROFILE_DIR as:
+
+    <id>.collapsed  folded stacks ("a;b;c count"), for flamegraph.pl / speedscope
+    <id>.txt        top functions overall and in agent/, tools/ and PIL
+    <id>.prof       raw pstats dump (snakeviz, pstats)
+
+Requests are profiled when either:
+    - PRINTSHOP_PROFILE_EVERY=N is set: one request in every N, or
+    - they send ``X-Profile-Request: 1`` from an address in PRINTSHOP_PROFILE_ADMIN_IPS
+
+Only one request is profiled at a time; others run normally.
+"""
+
+import cProfile
+import gc
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PROFILE_EVERY = int(os.environ.get("PRINTSHOP_PROFILE_EVERY", "0") or 0)
+PROFILE_ADMIN_IPS = frozenset(
+    ip.strip() for ip in os.environ.get("PRINTSHOP_PROFILE_ADMIN_IPS", "").split(",") if ip.strip()
+)
+PROFILE_DIR = Path(os.environ.get("PRINTSHOP_PROFILE_DIR", "profiles"))
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("PRINTSHOP_PROFILE_INTERVAL_MS", "1")) / 1000
+
+PROFILE_HEADER = "X-Profile-Request"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Code summarized separately in the report: (label, path prefixes as shown by _short_path)
+SUMMARY_GROUPS = (
+    ("agent/", ("agent/",)),
+    ("tools/", ("tools/",)),
+    ("PIL", ("PIL/",)),
+)
+TOP_FUNCTIONS = 20
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent) + os.sep
+
+
+def _short_path(filename: str) -> str:
+    """Project-relative path, or the part after site-packages for libraries."""
+    if filename.startswith(_PROJECT_ROOT):
+        return filename[len(_PROJECT_ROOT):]
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return filename
+
+
+def _thread_frame(thread_id: int):
+    """
+    The current frame of another thread.
+
+    sys._current_frames() holds the interpreter's thread-list lock while it
+    allocates; a garbage collection started there can release the GIL to a
+    thread that is exiting (which needs that lock) and deadlock the process on
+    CPython < 3.12. Collections are held off for the duration of the call.
+    """
+    collecting = gc.isenabled()
+    if collecting:
+        gc.disable()
+    try:
+        return sys._current_frames().get(thread_id)
+    finally:
+        if collecting:
+            gc.enable()
+
+
+class StackSampler:
+    """Samples one thread's Python stack on an interval and folds the stacks into counts."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = _thread_frame(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _summary_rows(stats: pstats.Stats, prefixes: Optional[Tuple[str, ...]] = None,
+                  limit: int = TOP_FUNCTIONS) -> List[str]:
+    """Top functions by cumulative time, optionally only those in files under ``prefixes``."""
+    rows = []
+    for (filename, lineno, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        short = _short_path(filename)
+        if prefixes is not None and not short.replace(os.sep, "/").startswith(prefixes):
+            continue
+        rows.append((cumulative, own, calls, f"{name} ({short}:{lineno})"))
+    rows.sort(reverse=True)
+    return [f"  {cumulative * 1000:10.2f} {own * 1000:10.2f} {calls:8d}  {label}"
+            for cumulative, own, calls, label in rows[:limit]]
+
+
+def format_summary(stats: pstats.Stats, title: str, wall_seconds: float, samples: int) -> str:
+    lines = [title, f"wall {wall_seconds * 1000:.1f} ms, {samples} stack samples", ""]
+    header = f"  {'cum ms':>10} {'own ms':>10} {'calls':>8}  function"
+    sections = [("Top functions", None)] + [(f"Top in {label}", prefixes) for label, prefixes in SUMMARY_GROUPS]
+    for heading, prefixes in sections:
+        rows = _summary_rows(stats, prefixes)
+        lines.append(f"{heading}:")
+        lines.extend([header] + rows if rows else ["  (none)"])
+        lines.append("")
+    return "\n".join(lines)
+
+
+class RequestProfiler:
+    """Profiles the calling thread between start() and stop(), then writes the reports."""
+
+    def __init__(self, label: str, output_dir: Path = PROFILE_DIR):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.output_dir = output_dir
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(threading.get_ident())
+        self._started = 0.0
+
+    def start(self) -> "RequestProfiler":
+        self._started = time.perf_counter()
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def stop(self) -> Path:
+        """Stop profiling and write the reports; returns the summary path."""
+        self._profile.disable()
+        self._sampler.stop()
+        wall = time.perf_counter() - self._started
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / self.id
+        (base.with_suffix(".collapsed")).write_text(self._sampler.collapsed(), encoding="utf-8")
+        self._profile.dump_stats(str(base.with_suffix(".prof")))
+
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        summary_path = base.with_suffix(".txt")
+        summary_path.write_text(
+            format_summary(stats, self.label, wall, sum(self._sampler.stacks.values())), encoding="utf-8"
+        )
+        return summary_path
+
+
+class ProfilingPolicy:
+    """Decides which requests to profile: 1-in-N sampling or an admin's explicit header."""
+
+    def __init__(self, every: int = PROFILE_EVERY, admin_ips: Iterable[str] = PROFILE_ADMIN_IPS):
+        self.every = every
+        self.admin_ips = frozenset(admin_ips)
+        self._counter = itertools.count(1)
+        # One profile at a time keeps the overhead bounded when left on in production
+        self._slot = threading.Semaphore(1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.every > 0 or bool(self.admin_ips)
+
+    def wants(self, remote_addr: Optional[str], header_value: Optional[str]) -> bool:
+        if header_value == "1" and remote_addr in self.admin_ips:
+            return True
+        return self.every > 0 and next(self._counter) % self.every == 0
+
+    def acquire(self) -> bool:
+        return self._slot.acquire(blocking=False)
+
+    def release(self):
+        self._slot.release()
+
+
+def install_flask_profiling(app, policy: Optional[ProfilingPolicy] = None, output_dir: Path = PROFILE_DIR):
+    """Profile selected requests of a (threaded) Flask app; does nothing unless configured."""
+    from flask import g, request
+
+    policy = policy or ProfilingPolicy()
+    if not policy.enabled:
+        return
+
+    @app.before_request
+    def _profile_start():
+        if not policy.wants(request.remote_addr, request.headers.get(PROFILE_HEADER)):
+            return
+        if not policy.acquire():
+            return
+        try:
+            g.profiler = RequestProfiler(request.endpoint or "unmatched", output_dir).start()
+        except Exception:
+            policy.release()
+            raise
+
+    @app.after_request
+    def _profile_header(response):
+        profiler = g.get("profiler")
+        if profiler is not None:
+            response.headers[PROFILE_ID_HEADER] = profiler.id
+        return response
+
+    @app.teardown_request
+    def _profile_finish(exc):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return
+        try:
+            summary_path = profiler.stop()
+            app.logger.info("Profiled %s %s -> %s", request.method, request.path, summary_path)
+        except OSError:
+            app.logger.exception("Could not write request profile")
+        finally:
+            policy.release()
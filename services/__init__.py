@@ -0,0 +1,20 @@
+"""Request-handling services shared by the Flask apps (app.py and api/index.py)."""
+
+from .batch import BatchError, BatchValidator, parse_batch
+from .derivatives import DerivativeCache, DerivativeError, RENDITIONS
+from .ingest import IngestingFile, UploadRejected, make_ingest_request_class
+from .uploads import ProcessedUpload, UploadError, process_upload
+from .validation_sessions import ValidationSessions
+
+__all__ = [
+    "BatchError", "BatchValidator", "parse_batch",
+    "DerivativeCache", "DerivativeError", "RENDITIONS",
+    "IngestingFile", "UploadRejected", "make_ingest_request_class",
+    "ProcessedUpload", "UploadError", "process_upload",
+    "ValidationSessions",
+]
+
+
+
+
+
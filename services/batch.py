@@ -0,0 +1,72 @@
+"""Batch order validation: many line items in one request, checked concurrently."""
+
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from tools.analysis_context import AnalysisContext
+
+# Largest batch accepted in one request
+MAX_BATCH_ORDERS = 100
+
+
+class BatchError(ValueError):
+    """Raised when a batch request is malformed."""
+
+
+def parse_batch(payload: Any) -> List[Dict[str, Any]]:
+    """
+    Validate the shape of a batch request body.
+
+    Accepts ``{"orders": [...]}`` or a bare list of order objects.
+    """
+    orders = payload.get("orders") if isinstance(payload, dict) else payload
+    if not isinstance(orders, list) or not orders:
+        raise BatchError("Expected a non-empty list of orders")
+    if len(orders) > MAX_BATCH_ORDERS:
+        raise BatchError(f"At most {MAX_BATCH_ORDERS} orders per batch")
+    if not all(isinstance(order, dict) for order in orders):
+        raise BatchError("Each order must be an object")
+    return orders
+
+
+# process(order_data, shared analysis context) -> agent result
+OrderProcessor = Callable[[Dict[str, Any], AnalysisContext], Dict[str, Any]]
+
+
+class BatchValidator:
+    """
+    Runs a batch of orders through a shared agent on a bounded pool.
+
+    All orders in a batch share one AnalysisContext, so a file used by several
+    line items (at the same print size) is checked once however many orders
+    reference it - concurrent orders wait for the first check instead of
+    repeating it. Results are yielded in input order as soon as each is ready.
+    """
+
+    def __init__(self, process: OrderProcessor, max_workers: int = 8):
+        """
+        Args:
+            process: Validates one order, e.g.
+                ``lambda order, analysis: agent.process_order(order, OrderContext(analysis))``
+            max_workers: Orders validated at once (across all batches)
+        """
+        self.process = process
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch")
+
+    def _validate_one(self, order_data: Dict[str, Any], analysis: AnalysisContext) -> Dict[str, Any]:
+        try:
+            return self.process(order_data, analysis)
+        except Exception as e:
+            traceback.print_exc()
+            return {"valid": False, "error": f"Validation error: {e}"}
+
+    def submit(self, orders: List[Dict[str, Any]]) -> List[Future]:
+        """Start validating every order; returns one future per order, in input order."""
+        analysis = AnalysisContext()
+        return [self._executor.submit(self._validate_one, order, analysis) for order in orders]
+
+    def validate(self, orders: List[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (index, result) in input order; later orders keep running while earlier ones are sent."""
+        for index, future in enumerate(self.submit(orders)):
+            yield index, future.result()
@@ -0,0 +1,341 @@
+"""
+On-demand renditions of uploaded artwork (thumbnail, web preview, full-size proof).
+
+Nothing is rendered at upload time. A rendition is generated the first time
+someone requests it, stored on disk, and evicted least-recently-used once the
+cache grows past its byte budget.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from instrumentation import CACHE_HIT, CACHE_MISS, record_event
+from process_pool import run_cpu_bound
+from storage.sqlite import Database, WriteBatcher, get_default_database
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    from pdf2image import convert_from_path, pdfinfo_from_path
+    PDF_AVAILABLE = True
+except ImportError:
+    convert_from_path = None
+    pdfinfo_from_path = None
+    PDF_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF
+    FITZ_AVAILABLE = True
+except ImportError:
+    FITZ_AVAILABLE = False
+
+
+class Rendition(NamedTuple):
+    name: str
+    max_edge: Optional[int]  # longest edge in pixels; None = full size
+    quality: int
+
+
+RENDITIONS: Dict[str, Rendition] = {
+    "thumb": Rendition("thumb", 320, 80),
+    "preview": Rendition("preview", 1600, 85),
+    "proof": Rendition("proof", None, 92),
+}
+
+# Bump when rendering changes so old files are regenerated
+RENDITION_VERSION = 1
+
+# PDFs are rasterized at this DPI for full-size proofs (pdf2image's default)
+PDF_PROOF_DPI = 200
+
+# Formats browsers display as-is; small enough originals are served without re-encoding
+PASSTHROUGH_FORMATS = {"JPEG", "PNG"}
+
+# A cache hit refreshes the rendition's LRU timestamp at most this often (per process)
+TOUCH_INTERVAL_SECONDS = 60
+
+# Renditions whose last touch is remembered; the memo is reset beyond this (costing one extra touch each)
+MAX_TOUCH_MEMO = 10_000
+
+DEFAULT_MAX_BYTES = int(os.environ.get("PRINTSHOP_DERIVATIVE_CACHE_MB", "512")) * 1024 * 1024
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS derivatives (
+        digest TEXT NOT NULL,
+        rendition TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_access REAL NOT NULL,
+        PRIMARY KEY (digest, rendition)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_derivatives_last_access ON derivatives (last_access)",
+]
+
+
+class DerivativeError(Exception):
+    """Raised when a rendition can't be produced."""
+
+
+def pdf_page_size_points(path: Union[str, Path]) -> Optional[Tuple[float, float]]:
+    """Size of the first page in PDF points (1/72 inch), without rendering anything."""
+    if FITZ_AVAILABLE:
+        try:
+            with fitz.open(str(path)) as doc:
+                rect = doc[0].rect
+                return rect.width, rect.height
+        except Exception:
+            pass
+    if PDF_AVAILABLE:
+        try:
+            # e.g. "612 x 792 pts (letter)"
+            parts = pdfinfo_from_path(str(path))["Page size"].split()
+            return float(parts[0]), float(parts[2])
+        except Exception:
+            pass
+    return None
+
+
+def _pdf_dpi_for(path: Union[str, Path], max_edge: Optional[int]) -> int:
+    """Lowest DPI that gives the rendition its size (never above the proof DPI)."""
+    if max_edge is None:
+        return PDF_PROOF_DPI
+    page_points = pdf_page_size_points(path)
+    if not page_points or max(page_points) <= 0:
+        return PDF_PROOF_DPI
+    longest_inches = max(page_points) / 72.0
+    return max(1, min(PDF_PROOF_DPI, int(max_edge / longest_inches) + 1))
+
+
+def _to_rgb(img: "Image.Image") -> "Image.Image":
+    """Flatten to RGB for JPEG output (alpha composited onto white)."""
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def render_rendition(source_path: Union[str, Path], rendition: Rendition) -> "Image.Image":
+    """
+    Decode just enough of the source to produce the rendition.
+
+    JPEGs use draft mode, which has libjpeg decode at 1/2, 1/4 or 1/8 scale
+    directly; other formats are shrunk with reduce() before the final resample
+    (thumbnail's reducing_gap); PDFs rasterize page 1 only, at the needed DPI.
+    """
+    if not PIL_AVAILABLE:
+        raise DerivativeError("Image processing not available")
+
+    source_path = str(source_path)
+    if source_path.lower().endswith(".pdf"):
+        if not PDF_AVAILABLE:
+            raise DerivativeError("PDF conversion not available")
+        dpi = _pdf_dpi_for(source_path, rendition.max_edge)
+        pages = convert_from_path(source_path, dpi=dpi, first_page=1, last_page=1)
+        if not pages:
+            raise DerivativeError("PDF has no pages")
+        img = pages[0]
+    else:
+        img = Image.open(source_path)
+        if rendition.max_edge and img.format == "JPEG":
+            # Square request box: the scale chosen doesn't depend on EXIF orientation
+            img.draft("RGB", (rendition.max_edge, rendition.max_edge))
+        img = ImageOps.exif_transpose(img)
+
+    if rendition.max_edge:
+        img.thumbnail((rendition.max_edge, rendition.max_edge), reducing_gap=2.0)
+    return _to_rgb(img)
+
+
+def render_rendition_file(source_path: str, rendition: str, out_path: str) -> int:
+    """Render a rendition straight to ``out_path`` (runs in the process pool; returns bytes written)."""
+    spec = RENDITIONS[rendition]
+    try:
+        img = render_rendition(source_path, spec)
+    except DerivativeError:
+        raise
+    except Exception as e:
+        raise DerivativeError(f"Could not render {spec.name}: {e}") from e
+    img.save(out_path, "JPEG", quality=spec.quality, optimize=True, progressive=True)
+    return os.path.getsize(out_path)
+
+
+class DerivativeCache:
+    """
+    Lazily generated renditions, bounded by total size with LRU eviction.
+
+    Files live under ``<root>/<first two hex chars>/<digest>-<rendition>-v<N>.jpg``;
+    sizes and access times are tracked in SQLite so every worker process shares
+    one budget. Access times are only as fine as TOUCH_INTERVAL_SECONDS, and
+    are written in the background, so a cache hit costs no database write.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES,
+                 db: Optional[Database] = None):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.db = db or get_default_database()
+        self.db.ensure_schema("derivatives", SCHEMA)
+        self._writer = WriteBatcher(self.db, "derivative-touches")
+        # (digest, rendition) -> [lock, number of requests using it]
+        self._key_locks: Dict[Tuple[str, str], List] = {}
+        self._last_touch: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, digest: str, rendition: str) -> Path:
+        return self.root / digest[:2] / f"{digest}-{rendition}-v{RENDITION_VERSION}.jpg"
+
+    def get(self, digest: str, source_path: Union[str, Path], rendition: str) -> Path:
+        """
+        Get the path of a rendition, generating it on first use.
+
+        Small JPEG/PNG originals are returned as-is for sized renditions.
+
+        Args:
+            digest: SHA-256 of the source file
+            source_path: The uploaded original
+            rendition: Key of RENDITIONS ("thumb", "preview", "proof")
+
+        Returns:
+            Path to a browser-displayable file
+        """
+        spec = RENDITIONS.get(rendition)
+        if spec is None:
+            raise DerivativeError(f"Unknown rendition: {rendition}")
+
+        path = self.path_for(digest, rendition)
+        if path.exists():
+            self._touch(digest, rendition)
+            record_event(CACHE_HIT, "derivative")
+            return path
+
+        key = (digest, rendition)
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+
+        # Concurrent requests for the same rendition wait for one render
+        try:
+            with entry[0]:
+                if path.exists():
+                    self._touch(digest, rendition)
+                    record_event(CACHE_HIT, "derivative")
+                    return path
+                if self._can_pass_through(source_path, spec):
+                    return Path(source_path)
+                record_event(CACHE_MISS, "derivative")
+                self._render_to(path, source_path, spec)
+                self._record(digest, rendition, path.stat().st_size)
+        finally:
+            # The lock stays shared until the last request waiting on it is done
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+        self._evict()
+        return path
+
+    @staticmethod
+    def _can_pass_through(source_path: Union[str, Path], spec: Rendition) -> bool:
+        if not PIL_AVAILABLE or str(source_path).lower().endswith(".pdf"):
+            return False
+        try:
+            with Image.open(source_path) as img:
+                if img.format not in PASSTHROUGH_FORMATS:
+                    return False
+                return spec.max_edge is None or max(img.size) <= spec.max_edge
+        except Exception:
+            return False
+
+    def _render_to(self, path: Path, source_path: Union[str, Path], spec: Rendition):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".jpg")
+        os.close(fd)
+        try:
+            # Decode + encode happen in the warm process pool when enabled; only the path crosses over
+            run_cpu_bound(render_rendition_file, str(source_path), spec.name, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _record(self, digest: str, rendition: str, size: int):
+        now = time.time()
+        with self._lock:
+            self._last_touch[(digest, rendition)] = now
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO derivatives (digest, rendition, size, last_access) VALUES (?, ?, ?, ?)",
+                (digest, rendition, size, now)
+            )
+        except sqlite3.Error:
+            pass
+
+    def _touch(self, digest: str, rendition: str):
+        """Refresh a rendition's access time, at most once per TOUCH_INTERVAL_SECONDS, in the background."""
+        key = (digest, rendition)
+        now = time.time()
+        with self._lock:
+            if now - self._last_touch.get(key, 0.0) < TOUCH_INTERVAL_SECONDS:
+                return
+            if len(self._last_touch) >= MAX_TOUCH_MEMO:
+                self._last_touch.clear()
+            self._last_touch[key] = now
+        # Queued touches are group-committed; a failed one only makes the LRU slightly less exact
+        self._writer.submit(lambda conn: conn.execute(
+            "UPDATE derivatives SET last_access = ? WHERE digest = ? AND rendition = ?",
+            (now, digest, rendition)
+        ))
+
+    def total_bytes(self) -> int:
+        try:
+            row = self.db.execute("SELECT COALESCE(SUM(size), 0) AS total FROM derivatives").fetchone()
+        except sqlite3.Error:
+            return 0
+        return row["total"]
+
+    def _evict(self):
+        """Delete least-recently-used renditions until the cache fits its budget."""
+        try:
+            excess = self.total_bytes() - self.max_bytes
+            if excess <= 0:
+                return
+            victims = []
+            cursor = self.db.execute("SELECT digest, rendition, size FROM derivatives ORDER BY last_access")
+            for row in cursor:
+                victims.append((row["digest"], row["rendition"]))
+                excess -= row["size"]
+                if excess <= 0:
+                    break
+            cursor.close()
+            with self.db.transaction() as conn:
+                conn.executemany(
+                    "DELETE FROM derivatives WHERE digest = ? AND rendition = ?", victims
+                )
+        except sqlite3.Error:
+            return
+
+        for digest, rendition in victims:
+            try:
+                os.unlink(self.path_for(digest, rendition))
+            except OSError:
+                pass
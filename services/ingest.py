@@ -0,0 +1,291 @@
+"""
+Streaming upload ingestion.
+
+Multipart file parts are written straight to a temp file in the upload store
+while being hashed, size-checked and header-probed, so a bad upload is
+rejected as soon as it is recognized - before the rest of the body is read.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+from flask import Request
+from werkzeug.exceptions import HTTPException
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    MULTIPART_AVAILABLE = True
+except ImportError:
+    try:
+        from multipart.multipart import MultipartParser, parse_options_header
+        MULTIPART_AVAILABLE = True
+    except ImportError:
+        MULTIPART_AVAILABLE = False
+
+from image_probe import ImageMetadata, ProbeError, TruncatedHeaderError, detect_format, probe_bytes, probe_image
+from storage.upload_store import StoredUpload, UploadStore
+from tools.config_store import get_config
+
+# Formats we accept, by content (not by extension)
+ACCEPTED_FORMATS = {"JPEG", "PNG", "TIFF", "HEIF", "PDF"}
+
+# Start probing once this much has arrived; keep retrying (doubling) up to the max
+PROBE_START_BYTES = 64 * 1024
+PROBE_MAX_BYTES = 2 * 1024 * 1024
+
+# Same threshold at which Pillow refuses to open an image as a decompression bomb
+MAX_IMAGE_PIXELS = 2 * 89478485
+
+# Slack on top of the file limit for multipart boundaries and other form fields
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+
+class UploadRejected(HTTPException):
+    """An upload refused during ingestion (raised mid-stream, aborting the request body)."""
+
+    def __init__(self, description: str, code: int = 400):
+        super().__init__(description)
+        self.code = code
+
+
+def max_upload_bytes() -> int:
+    """Per-file size limit from config/shop_capabilities.json."""
+    return int(get_config("shop_capabilities")["file_requirements"]["max_file_size_mb"] * 1024 * 1024)
+
+
+class IngestingFile:
+    """
+    Writable temp file handed to werkzeug's multipart parser for each file part.
+
+    Every chunk is hashed and counted as it is written. The header probe runs on
+    the buffered prefix, so format, size and pixel-count limits trip early.
+    Once parsing finishes it behaves like a normal readable file.
+    """
+
+    def __init__(self, tmp_dir: str, filename: Optional[str], max_bytes: int):
+        self.filename = filename or ""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.format: Optional[str] = None
+        self.metadata: Optional[ImageMetadata] = None
+        self._hasher = hashlib.sha256()
+        self._prefix = bytearray()
+        self._next_probe_at = PROBE_START_BYTES
+        self._probe_done = False
+        self.committed = False
+
+        ext = os.path.splitext(self.filename)[1].lower()
+        fd, self.path = tempfile.mkstemp(dir=tmp_dir, suffix=ext)
+        self._file = os.fdopen(fd, "w+b")
+
+    # -- writing (called by the multipart parser) --------------------------
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self._discard()
+            raise UploadRejected(
+                f"File is larger than the {self.max_bytes // (1024 * 1024)} MB limit.", 413
+            )
+
+        self._hasher.update(data)
+        self._file.write(data)
+
+        if not self._probe_done:
+            self._prefix += data
+            if self.format is None and len(self._prefix) >= 64:
+                self._check_format()
+            if len(self._prefix) >= self._next_probe_at:
+                self._probe(complete=False)
+        return len(data)
+
+    def _check_format(self):
+        self.format = detect_format(bytes(self._prefix[:64]))
+        if self.format not in ACCEPTED_FORMATS:
+            self._discard()
+            raise UploadRejected(
+                "Unsupported file format. Please upload a JPG, PNG, TIFF, HEIC or PDF file.", 415
+            )
+
+    def _probe(self, complete: bool):
+        """Probe the headers seen so far; reject decompression bombs."""
+        if self.format == "PDF":
+            self._probe_done = True
+            return
+        try:
+            if complete and len(self._prefix) < self.size:
+                # Headers weren't in the prefix (e.g., TIFF with its IFD at the end)
+                self.metadata = probe_image(self.path)
+            else:
+                self.metadata = probe_bytes(bytes(self._prefix))
+        except TruncatedHeaderError:
+            if not complete and self._next_probe_at < PROBE_MAX_BYTES:
+                self._next_probe_at *= 2
+                return
+            if not complete:
+                return  # Re-checked against the whole file once it's written
+        except ProbeError:
+            pass  # Unusual but recognized file; later checks fall back to Pillow
+        self._probe_done = True
+        self._prefix = bytearray()
+
+        if self.metadata is not None and self.metadata.pixel_count > MAX_IMAGE_PIXELS:
+            self._discard()
+            raise UploadRejected(
+                f"Image is {self.metadata.width}x{self.metadata.height} pixels, which exceeds the "
+                f"{MAX_IMAGE_PIXELS:,} pixel safety limit.", 413
+            )
+
+    def finish(self):
+        """Run any checks that need the whole file (called once the part is complete)."""
+        if self.format is None:
+            self._check_format()
+        if not self._probe_done:
+            self._file.flush()
+            self._probe(complete=True)
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+    # -- reading (FileStorage / later consumers) ----------------------------
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def _discard(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def close(self):
+        """Close the file, deleting it unless it was moved into the upload store."""
+        if self.committed:
+            if not self._file.closed:
+                self._file.close()
+        else:
+            self._discard()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+
+def commit_ingested(stream: IngestingFile, store: UploadStore, original_filename: str) -> StoredUpload:
+    """Move a fully ingested upload into the store under its digest (no second read or hash)."""
+    stream.finish()
+    stream.flush()
+    ext = os.path.splitext(original_filename)[1].lower()
+    stored = store.commit_temp(stream.path, stream.sha256, stream.size, original_filename, ext)
+    stream.committed = True
+    stream.close()
+    return stored
+
+
+def make_ingest_request_class(store: UploadStore):
+    """
+    Build a Flask Request class whose file uploads stream through IngestingFile.
+
+    Usage: ``app.request_class = make_ingest_request_class(upload_store)``
+    """
+
+    class IngestRequest(Request):
+        def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+            limit = max_upload_bytes()
+            # Reject from the Content-Length header alone, before reading any of the body
+            if total_content_length is not None and total_content_length > limit + MULTIPART_OVERHEAD_BYTES:
+                raise UploadRejected(f"File is larger than the {limit // (1024 * 1024)} MB limit.", 413)
+            return IngestingFile(str(store.tmp_dir), filename, limit)
+
+    return IngestRequest
+
+
+class MultipartIngestor:
+    """
+    Push-style multipart parser for servers that hand us the raw body in chunks (ASGI).
+
+    The part named ``field_name`` streams into an IngestingFile with the same
+    checks as the Flask path; other parts are ignored. Feed it with write(),
+    then call close() if the upload is abandoned.
+    """
+
+    def __init__(self, content_type: str, tmp_dir: str, max_bytes: int, field_name: str = "file"):
+        if not MULTIPART_AVAILABLE:
+            raise UploadRejected("Multipart parsing not available", 500)
+        mimetype, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if mimetype != b"multipart/form-data" or not boundary:
+            raise UploadRejected("No file uploaded", 400)
+
+        self.tmp_dir = tmp_dir
+        self.max_bytes = max_bytes
+        self.field_name = field_name
+        self.file: Optional[IngestingFile] = None
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._current: Optional[IngestingFile] = None
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+        })
+
+    def write(self, chunk: bytes):
+        self._parser.write(chunk)
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._current = None
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.field_name or self.file is not None or b"filename" not in options:
+            return
+        filename = os.path.basename(options[b"filename"].decode("utf-8", "replace"))
+        self._current = IngestingFile(self.tmp_dir, filename, self.max_bytes)
+        self.file = self._current
+
+    def _on_part_data(self, data, start, end):
+        if self._current is not None:
+            self._current.write(data[start:end])
+
+    def close(self):
+        """Discard the temp file unless it was committed."""
+        if self.file is not None:
+            self.file.close()
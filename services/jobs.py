@@ -0,0 +1,190 @@
+"""
+In-process background jobs with status shared through SQLite.
+
+Slow per-upload work runs on a small bounded thread pool instead of inside the
+request. Job state is written to the shared database, so ``/jobs/<id>`` can be
+answered by any worker process on the host, not just the one running the job.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional
+
+from storage.sqlite import Database, get_default_database
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED_STATES = (DONE, FAILED)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        progress REAL NOT NULL,
+        message TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at)",
+]
+
+# A job function receives this as its first argument: progress(fraction, message)
+ProgressCallback = Callable[[float, str], None]
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued or running."""
+
+
+@dataclass
+class Job:
+    """Snapshot of a job's state."""
+    id: str
+    kind: str
+    status: str
+    progress: float
+    message: str
+    result: Optional[Any]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobQueue:
+    """
+    Bounded worker pool for background jobs.
+
+    At most ``max_workers`` jobs run at once and at most ``max_pending`` more
+    wait; beyond that submit() raises JobQueueFull so callers can shed load
+    instead of queueing without limit. Finished jobs are kept for
+    ``retention_seconds`` so clients can collect the result.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32,
+                 db: Optional[Database] = None, retention_seconds: float = 3600.0):
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.db = db or get_default_database()
+        self.db.ensure_schema("jobs", SCHEMA)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily and re-created after a fork (threads don't survive fork)
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, kind: str, function: Callable[..., Any], *args, **kwargs) -> Job:
+        """
+        Queue ``function(progress, *args, **kwargs)`` and return its job immediately.
+
+        The function's return value (JSON-serializable) becomes the job result;
+        an exception marks the job failed with its message.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Too many jobs in progress, please retry shortly.")
+
+        now = time.time()
+        job = Job(uuid.uuid4().hex, kind, QUEUED, 0.0, "Queued", None, None, now, now)
+        try:
+            self._prune(now)
+            self.db.execute(
+                "INSERT INTO jobs (id, kind, status, progress, message, result, error, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (job.id, kind, QUEUED, 0.0, job.message, now, now)
+            )
+            with self._lock:
+                self._events[job.id] = threading.Event()
+            self._get_executor().submit(self._run, job.id, function, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        return job
+
+    def _run(self, job_id: str, function: Callable[..., Any], args, kwargs):
+        def progress(fraction: float, message: str):
+            self._update(job_id, status=RUNNING, progress=max(0.0, min(1.0, fraction)), message=message)
+
+        try:
+            progress(0.0, "Started")
+            result = function(progress, *args, **kwargs)
+            self._update(job_id, status=DONE, progress=1.0, message="Done", result=json.dumps(result, default=str))
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, status=FAILED, message="Failed", error=str(e) or e.__class__.__name__)
+        finally:
+            self._slots.release()
+            with self._lock:
+                event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        try:
+            self.db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        except sqlite3.Error:
+            traceback.print_exc()
+
+    def _prune(self, now: float):
+        self.db.execute(
+            "DELETE FROM jobs WHERE updated_at < ? AND status IN (?, ?)",
+            (now - self.retention_seconds, DONE, FAILED)
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Current state of a job (from any process), or None if unknown or expired."""
+        try:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            status=row["status"],
+            progress=row["progress"],
+            message=row["message"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Wait up to ``timeout`` seconds for a job started by this process, then return its state."""
+        with self._lock:
+            event = self._events.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        return self.get(job_id)
@@ -0,0 +1,148 @@
+"""Upload handling: content-addressed storage plus cached dimensions (renditions are lazy)."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from image_probe import ImageMetadata, probe_image, ProbeError
+from storage.result_cache import ResultCache
+from storage.upload_store import StoredUpload, UploadStore
+
+from .derivatives import DerivativeCache, pdf_page_size_points
+from .ingest import IngestingFile, commit_ingested
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    from pdf2image import convert_from_path
+    PDF_AVAILABLE = True
+except ImportError:
+    convert_from_path = None
+    PDF_AVAILABLE = False
+
+# PDFs are measured as if rendered at this DPI (pdf2image's default, which the
+# frontend's pixel/DPI check has always been based on)
+PDF_NOMINAL_DPI = 200
+
+# Bump when the way dimensions are measured changes
+DIMENSIONS_VERSION = 2
+
+
+class UploadError(Exception):
+    """Raised when an upload can't be stored or measured."""
+
+
+@dataclass
+class ProcessedUpload:
+    """Result of handling one upload."""
+    source: StoredUpload  # the file exactly as uploaded
+    width: int
+    height: int
+
+
+def _image_size(path) -> Tuple[int, int]:
+    try:
+        return probe_image(path).display_size
+    except ProbeError:
+        if not PIL_AVAILABLE:
+            raise UploadError("Image processing not available")
+        with Image.open(path) as img:
+            return img.size
+
+
+def _pdf_size(path) -> Tuple[int, int]:
+    """Pixel size of page 1 at PDF_NOMINAL_DPI, from the page box rather than a render."""
+    page_points = pdf_page_size_points(path)
+    if page_points:
+        return (round(page_points[0] / 72.0 * PDF_NOMINAL_DPI),
+                round(page_points[1] / 72.0 * PDF_NOMINAL_DPI))
+    if not PDF_AVAILABLE:
+        raise UploadError("PDF conversion not available")
+    pages = convert_from_path(str(path), dpi=PDF_NOMINAL_DPI, first_page=1, last_page=1)
+    if not pages:
+        raise UploadError("PDF has no pages")
+    return pages[0].size
+
+
+def _upload_size(source: StoredUpload) -> Tuple[int, int]:
+    if source.ext == '.pdf':
+        return _pdf_size(source.path)
+    return _image_size(source.path)
+
+
+def store_upload(file, store: UploadStore) -> Tuple[StoredUpload, Optional[ImageMetadata]]:
+    """
+    Put an uploaded file into the store (the only step that must happen in the request).
+
+    Returns:
+        (stored file, header metadata if it was probed during ingestion)
+    """
+    if isinstance(file.stream, IngestingFile):
+        # Already on disk, hashed and probed while the request body was parsed
+        source = commit_ingested(file.stream, store, file.filename)
+        return source, file.stream.metadata
+    return store.put_stream(file.stream, file.filename), None
+
+
+def measure_upload(source: StoredUpload, metadata: Optional[ImageMetadata] = None,
+                   cache: Optional[ResultCache] = None) -> Tuple[int, int]:
+    """Pixel size the frontend's DPI check uses (cached per digest)."""
+    if metadata is not None:
+        return metadata.display_size
+    if cache is not None:
+        size = cache.get_or_compute(
+            "dimensions", source.digest, {"v": DIMENSIONS_VERSION},
+            lambda: list(_upload_size(source))
+        )
+        return size[0], size[1]
+    return _upload_size(source)
+
+
+def process_upload(file, store: UploadStore, cache: Optional[ResultCache] = None) -> ProcessedUpload:
+    """
+    Store an uploaded file and measure it for the frontend's DPI check.
+
+    No conversion happens here: previews, thumbnails and proofs are rendered on
+    first request by the DerivativeCache. Dimensions are cached per digest, so
+    re-uploading identical artwork does no image work at all.
+
+    Args:
+        file: werkzeug FileStorage from request.files
+        store: UploadStore to write into
+        cache: Optional ResultCache for measured dimensions
+
+    Returns:
+        ProcessedUpload
+    """
+    source, metadata = store_upload(file, store)
+    width, height = measure_upload(source, metadata, cache)
+    return ProcessedUpload(source, width, height)
+
+
+def analyze_upload(progress, source: StoredUpload, metadata: Optional[ImageMetadata] = None,
+                   cache: Optional[ResultCache] = None,
+                   derivatives: Optional[DerivativeCache] = None) -> Dict[str, Any]:
+    """
+    Background job for a stored upload: measure it and render its web preview.
+
+    Args:
+        progress: JobQueue progress callback
+        source: The stored upload
+        metadata: Header metadata from ingestion, if any
+        cache: Optional ResultCache for measured dimensions
+        derivatives: If given, the preview rendition is rendered now so the first view is instant
+
+    Returns:
+        {"filename", "width", "height"}
+    """
+    progress(0.1, "Measuring artwork")
+    width, height = measure_upload(source, metadata, cache)
+
+    if derivatives is not None:
+        progress(0.4, "Rendering preview")
+        derivatives.get(source.digest, source.path, "preview")
+
+    return {"filename": source.filename, "width": width, "height": height}
@@ -0,0 +1,83 @@
+"""
+Per-form-session state for live order validation.
+
+The order form calls ``/validate-order`` on every change of size, paper or
+quantity. Each session keeps one AnalysisContext across those calls, so a
+re-validation only re-runs the tool calls whose inputs changed: a size change
+redoes the DPI arithmetic (and the size-dependent spec and price lookups) from
+the already-measured file, and a quantity change redoes only the lookups that
+take quantity.
+
+Live stock is never memoized (it moves while the form is open), so every
+validation sees the current level; sessions only keep results that depend
+on nothing but their inputs.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from tools.analysis_context import AnalysisContext
+
+# Sessions idle longer than this start over
+SESSION_TTL_SECONDS = 10 * 60
+
+# Oldest sessions are dropped beyond this many per process
+MAX_SESSIONS = 10_000
+
+# Tool results kept per session; a form only ever needs the last few sizes/papers/quantities
+MAX_SESSION_ENTRIES = 64
+
+
+class _Session:
+    __slots__ = ("analysis", "last_used")
+
+    def __init__(self):
+        self.analysis = AnalysisContext(max_entries=MAX_SESSION_ENTRIES)
+        self.last_used = time.monotonic()
+
+
+class ValidationSessions:
+    """
+    LRU of validation sessions, keyed by an opaque id handed to the client.
+
+    Sessions live in process memory; a request that lands on another worker
+    (or after expiry) simply starts a fresh session, which costs one full validation.
+    """
+
+    def __init__(self, ttl_seconds: float = SESSION_TTL_SECONDS, max_sessions: int = MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str]) -> Tuple[str, AnalysisContext]:
+        """
+        The session's AnalysisContext, creating a session if ``session_id`` is
+        missing, unknown or expired.
+
+        Returns:
+            (session_id, analysis) - send the id back to the client
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None and now - session.last_used > self.ttl_seconds:
+                del self._sessions[session_id]
+                session = None
+
+            if session is None:
+                session_id = secrets.token_urlsafe(16)
+                session = self._sessions[session_id] = _Session()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.last_used = now
+            return session_id, session.analysis
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,22 @@
+"""Persistent storage for the Print Shop AI Order Guardrail system."""
+
+from .sqlite import Database, WriteBatcher, configure_default_database, get_default_database
+from .result_cache import ResultCache, get_result_cache
+from .upload_store import UploadStore, StoredUpload
+from .inventory_store import (
+    InventoryStore, InventoryError, InsufficientStock, Reservation, StockLevel, get_inventory_store
+)
+from .order_store import OrderStore, StoredOrder, get_order_store
+
+__all__ = [
+    "Database", "WriteBatcher", "configure_default_database", "get_default_database",
+    "ResultCache", "get_result_cache",
+    "UploadStore", "StoredUpload",
+    "InventoryStore", "InventoryError", "InsufficientStock", "Reservation", "StockLevel", "get_inventory_store",
+    "OrderStore", "StoredOrder", "get_order_store",
+]
+
+
+
+
+
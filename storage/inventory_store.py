@@ -0,0 +1,304 @@
+"""Paper stock levels and reservations, shared by every worker process through SQLite."""
+
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from .sqlite import Database, WriteBatcher, get_default_database
+
+# Unconfirmed holds are returned to stock after this long (e.g., the worker died mid-order)
+RESERVATION_TTL_SECONDS = 15 * 60
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS inventory (
+        paper TEXT PRIMARY KEY,
+        in_stock INTEGER NOT NULL DEFAULT 1,
+        on_hand INTEGER NOT NULL,
+        reserved INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        CHECK (reserved >= 0 AND reserved <= on_hand)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory_holds (
+        id TEXT PRIMARY KEY,
+        paper TEXT NOT NULL REFERENCES inventory (paper),
+        quantity INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_inventory_holds_expires ON inventory_holds (expires_at)",
+    # Bumped by every write; readers compare it to decide whether their cached levels are current
+    """
+    CREATE TABLE IF NOT EXISTS inventory_generation (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        generation INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO inventory_generation (id, generation) VALUES (0, 0)",
+]
+
+
+class InventoryError(Exception):
+    """A reservation could not be made or settled."""
+
+
+class InsufficientStock(InventoryError):
+    """Not enough unreserved sheets (or the paper is out of stock / unknown)."""
+
+    def __init__(self, message: str, level: Optional["StockLevel"] = None):
+        super().__init__(message)
+        self.level = level
+
+
+@dataclass(frozen=True)
+class StockLevel:
+    """One paper's stock as of the last write."""
+    paper: str
+    in_stock: bool
+    on_hand: int
+    reserved: int
+
+    @property
+    def free(self) -> int:
+        """Sheets that can still be reserved."""
+        return self.on_hand - self.reserved if self.in_stock else 0
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Sheets held for one order until committed or released."""
+    id: str
+    paper: str
+    quantity: int
+    expires_at: float
+
+
+class InventoryStore:
+    """
+    Paper stock with atomic reserve / commit / release.
+
+    A reservation moves sheets from free to reserved; committing it deducts
+    them from on-hand stock, releasing it (or letting it expire) frees them
+    again. Every change runs inside a write transaction that re-checks stock,
+    so two workers can never both take the last sheets; concurrent changes
+    from one process are group-committed. Reads are served from an
+    in-process cache of all levels, revalidated against a generation counter
+    that every write bumps - one primary-key lookup per read.
+    """
+
+    def __init__(self, db: Optional[Database] = None, reservation_ttl: float = RESERVATION_TTL_SECONDS):
+        self.db = db or get_default_database()
+        self.db.ensure_schema("inventory", SCHEMA)
+        self.reservation_ttl = reservation_ttl
+        self._writer = WriteBatcher(
+            self.db, "inventory-writer", expected_errors=(InventoryError, sqlite3.IntegrityError)
+        )
+        self._levels: Dict[str, StockLevel] = {}
+        self._generation = -1
+        self._cache_lock = threading.Lock()
+
+    # ---- reads --------------------------------------------------------
+
+    def levels(self) -> Dict[str, StockLevel]:
+        """All stock levels, from the cache when nothing has been written since it was filled."""
+        generation = self.db.execute(
+            "SELECT generation FROM inventory_generation WHERE id = 0"
+        ).fetchone()["generation"]
+        if generation == self._generation:
+            return self._levels
+
+        with self._cache_lock:
+            if generation != self._generation:
+                # One read transaction, so the levels and generation match
+                conn = self.db.connection()
+                conn.execute("BEGIN")
+                try:
+                    generation = conn.execute(
+                        "SELECT generation FROM inventory_generation WHERE id = 0"
+                    ).fetchone()["generation"]
+                    rows = conn.execute("SELECT paper, in_stock, on_hand, reserved FROM inventory").fetchall()
+                finally:
+                    conn.execute("COMMIT")
+                self._levels = {
+                    row["paper"]: StockLevel(row["paper"], bool(row["in_stock"]), row["on_hand"], row["reserved"])
+                    for row in rows
+                }
+                self._generation = generation
+            return self._levels
+
+    def level(self, paper: str) -> Optional[StockLevel]:
+        """Stock level of one paper, or None if it isn't stocked."""
+        return self.levels().get(paper)
+
+    # ---- writes -------------------------------------------------------
+
+    def seed(self, stock: Mapping[str, Mapping[str, Any]]):
+        """
+        Add papers that aren't in the store yet, e.g. from ``tools.inventory_tool.INVENTORY``.
+
+        Existing rows are left alone, so restarting a worker never resets
+        counts that orders have already drawn down.
+        """
+        def insert(conn: sqlite3.Connection):
+            now = time.time()
+            changed = 0
+            for paper, info in stock.items():
+                changed += conn.execute(
+                    "INSERT OR IGNORE INTO inventory (paper, in_stock, on_hand, reserved, updated_at) "
+                    "VALUES (?, ?, ?, 0, ?)",
+                    (paper, int(bool(info.get("available", True))), int(info.get("quantity", 0)), now)
+                ).rowcount
+            if changed:
+                _bump_generation(conn)
+
+        self._writer.submit(insert).result()
+
+    def set_level(self, paper: str, on_hand: int, in_stock: bool = True):
+        """Set a paper's on-hand count (a stock take or delivery). Outstanding holds stay reserved."""
+        def update(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT INTO inventory (paper, in_stock, on_hand, reserved, updated_at) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (paper) DO UPDATE SET in_stock = excluded.in_stock, "
+                "on_hand = excluded.on_hand, updated_at = excluded.updated_at",
+                (paper, int(in_stock), int(on_hand), time.time())
+            )
+            _bump_generation(conn)
+
+        self._writer.submit(update).result()
+
+    def reserve(self, paper: str, quantity: int, ttl: Optional[float] = None) -> Reservation:
+        """
+        Hold ``quantity`` sheets of ``paper``.
+
+        Raises:
+            InsufficientStock: the paper is unknown, out of stock, or has fewer free sheets
+        """
+        if quantity <= 0:
+            raise InventoryError(f"Quantity must be positive, got {quantity}")
+        ttl = self.reservation_ttl if ttl is None else ttl
+
+        def hold(conn: sqlite3.Connection) -> Reservation:
+            now = time.time()
+            _expire_holds(conn, now)
+            updated = conn.execute(
+                "UPDATE inventory SET reserved = reserved + ?, updated_at = ? "
+                "WHERE paper = ? AND in_stock AND on_hand - reserved >= ?",
+                (quantity, now, paper, quantity)
+            ).rowcount
+            if not updated:
+                row = conn.execute(
+                    "SELECT paper, in_stock, on_hand, reserved FROM inventory WHERE paper = ?", (paper,)
+                ).fetchone()
+                if row is None:
+                    raise InsufficientStock(f"Paper '{paper}' is not stocked.")
+                level = StockLevel(row["paper"], bool(row["in_stock"]), row["on_hand"], row["reserved"])
+                if not level.in_stock:
+                    raise InsufficientStock(f"Paper '{paper}' is currently out of stock.", level)
+                raise InsufficientStock(
+                    f"Only {level.free} sheets of '{paper}' available, but {quantity} requested.", level
+                )
+
+            reservation = Reservation(uuid.uuid4().hex, paper, quantity, now + ttl)
+            conn.execute(
+                "INSERT INTO inventory_holds (id, paper, quantity, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (reservation.id, paper, quantity, now, reservation.expires_at)
+            )
+            _bump_generation(conn)
+            return reservation
+
+        return self._writer.submit(hold).result()
+
+    def commit(self, reservation_id: str):
+        """
+        Deduct a held reservation from on-hand stock.
+
+        Raises:
+            InventoryError: the reservation doesn't exist (already settled, or expired)
+        """
+        def settle(conn: sqlite3.Connection):
+            hold = _take_hold(conn, reservation_id)
+            conn.execute(
+                "UPDATE inventory SET on_hand = on_hand - ?, reserved = reserved - ?, updated_at = ? "
+                "WHERE paper = ?",
+                (hold["quantity"], hold["quantity"], time.time(), hold["paper"])
+            )
+            _bump_generation(conn)
+
+        self._writer.submit(settle).result()
+
+    def release(self, reservation_id: str) -> bool:
+        """Return a held reservation to stock. Returns False if it was already settled or expired."""
+        def free(conn: sqlite3.Connection) -> bool:
+            try:
+                hold = _take_hold(conn, reservation_id)
+            except InventoryError:
+                return False
+            conn.execute(
+                "UPDATE inventory SET reserved = reserved - ?, updated_at = ? WHERE paper = ?",
+                (hold["quantity"], time.time(), hold["paper"])
+            )
+            _bump_generation(conn)
+            return True
+
+        return self._writer.submit(free).result()
+
+    def expire(self) -> int:
+        """Return expired holds to stock now (reserve() also does this). Returns how many were expired."""
+        return self._writer.submit(lambda conn: _expire_holds(conn, time.time())).result()
+
+
+def _bump_generation(conn: sqlite3.Connection):
+    conn.execute("UPDATE inventory_generation SET generation = generation + 1 WHERE id = 0")
+
+
+def _take_hold(conn: sqlite3.Connection, reservation_id: str) -> sqlite3.Row:
+    rows = conn.execute(
+        "DELETE FROM inventory_holds WHERE id = ? RETURNING paper, quantity", (reservation_id,)
+    ).fetchall()
+    if not rows:
+        raise InventoryError(f"Reservation '{reservation_id}' not found (already settled or expired).")
+    return rows[0]
+
+
+def _expire_holds(conn: sqlite3.Connection, now: float) -> int:
+    expired = conn.execute(
+        "DELETE FROM inventory_holds WHERE expires_at < ? RETURNING paper, quantity", (now,)
+    ).fetchall()
+    for hold in expired:
+        conn.execute(
+            "UPDATE inventory SET reserved = reserved - ?, updated_at = ? WHERE paper = ?",
+            (hold["quantity"], now, hold["paper"])
+        )
+    if expired:
+        _bump_generation(conn)
+    return len(expired)
+
+
+_default_store: Optional[InventoryStore] = None
+_default_lock = threading.Lock()
+
+
+def get_inventory_store(initial_stock: Optional[Mapping[str, Mapping[str, Any]]] = None) -> Optional[InventoryStore]:
+    """
+    Get the process-wide inventory store (None if the database can't be opened).
+
+    ``initial_stock`` seeds papers the database doesn't know yet the first time the store is opened.
+    """
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                try:
+                    store = InventoryStore()
+                    if initial_stock:
+                        store.seed(initial_stock)
+                except (OSError, sqlite3.Error):
+                    return None
+                _default_store = store
+    return _default_store
@@ -0,0 +1,275 @@
+"""Accepted orders, written in the background and indexed for the shop dashboard and re-orders."""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from .result_cache import digest_from_path, sha256_file
+from .sqlite import Database, WriteBatcher, get_default_database
+
+logger = logging.getLogger(__name__)
+
+ACCEPTED = "accepted"
+
+# A batch that fails (e.g., the database stayed locked past busy_timeout) is retried this many times
+MAX_WRITE_ATTEMPTS = 3
+
+# Default page size for the list queries
+DEFAULT_LIMIT = 50
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id TEXT PRIMARY KEY,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        status TEXT NOT NULL,
+        email TEXT NOT NULL,
+        name TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        file_digest TEXT,
+        paper TEXT,
+        size TEXT,
+        quantity INTEGER,
+        price TEXT,
+        reservation_id TEXT,
+        order_data TEXT NOT NULL,
+        guardrail_results TEXT NOT NULL,
+        tool_calls TEXT NOT NULL
+    )
+    """,
+    # Every list query filters on one column and pages newest-first by created_at
+    "CREATE INDEX IF NOT EXISTS idx_orders_status_created ON orders (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_email_created ON orders (email, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_digest_created ON orders (file_digest, created_at)",
+]
+
+_COLUMNS = (
+    "id", "created_at", "updated_at", "status", "email", "name", "filename", "file_digest",
+    "paper", "size", "quantity", "price", "reservation_id", "order_data", "guardrail_results", "tool_calls",
+)
+_JSON_COLUMNS = ("order_data", "guardrail_results", "tool_calls")
+_INSERT = f"INSERT OR REPLACE INTO orders ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+
+@dataclass
+class StoredOrder:
+    """One order as stored (``email`` is case-folded)."""
+    id: str
+    created_at: float
+    updated_at: float
+    status: str
+    email: str
+    name: str
+    filename: str
+    file_digest: Optional[str]
+    paper: Optional[str]
+    size: Optional[str]
+    quantity: Optional[int]
+    price: Optional[str]
+    reservation_id: Optional[str]
+    order_data: Dict[str, Any]
+    guardrail_results: Dict[str, Any]
+    tool_calls: List[Dict[str, Any]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _to_json(value: Any) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _row_to_order(row: Mapping[str, Any]) -> StoredOrder:
+    values = dict(row)
+    for column in _JSON_COLUMNS:
+        values[column] = json.loads(values[column])
+    return StoredOrder(**values)
+
+
+class OrderStore:
+    """
+    Orders accepted by ``/submit-order``, with their guardrail results and tool calls.
+
+    ``record`` only queues the row: a background writer commits everything
+    queued meanwhile in one transaction, so storing an order adds no disk
+    I/O to the request. Orders are visible to ``get`` in this process
+    immediately, and to the list queries once written (normally within
+    milliseconds). Hashing artwork that isn't content-addressed also
+    happens on the writer.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self.db = db or get_default_database()
+        self.db.ensure_schema("orders", SCHEMA)
+        self._writer = WriteBatcher(self.db, "order-writer")
+        # Queued but not yet committed, by id
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        atexit.register(self._flush_at_exit)
+
+    # ---- writes -------------------------------------------------------
+
+    def record(self, order_data: Mapping[str, Any], result: Mapping[str, Any],
+               reservation_id: Optional[str] = None, status: str = ACCEPTED) -> str:
+        """
+        Queue an order for storage.
+
+        Args:
+            order_data: The order as passed to the agent
+            result: The agent's result (order summary, reasoning, tool calls)
+            reservation_id: Inventory reservation taken for the order, if any
+
+        Returns:
+            The new order id
+        """
+        now = time.time()
+        summary = result.get("order_summary") or {}
+        file_path = order_data.get("file_path") or ""
+        row = {
+            "id": uuid.uuid4().hex,
+            "created_at": now,
+            "updated_at": now,
+            "status": status,
+            "email": (order_data.get("email") or "").strip().casefold(),
+            "name": order_data.get("name") or "",
+            "filename": order_data.get("filename") or "",
+            "file_digest": digest_from_path(file_path) if file_path else None,
+            "paper": summary.get("paper", order_data.get("paper")),
+            "size": summary.get("size", order_data.get("size")),
+            "quantity": summary.get("quantity", order_data.get("quantity")),
+            "price": summary.get("price"),
+            "reservation_id": reservation_id,
+            "order_data": dict(order_data),
+            "guardrail_results": {key: value for key, value in result.items() if key != "tool_calls"},
+            "tool_calls": list(result.get("tool_calls") or []),
+        }
+        with self._pending_lock:
+            self._pending[row["id"]] = row
+        self._queue(row, file_path, attempt=1)
+        return row["id"]
+
+    def _queue(self, row: Dict[str, Any], file_path: str, attempt: int):
+        def insert(conn: sqlite3.Connection):
+            if row["file_digest"] is None and file_path and os.path.isfile(file_path):
+                try:
+                    row["file_digest"] = sha256_file(file_path)
+                except OSError:
+                    pass
+            values = [_to_json(row[c]) if c in _JSON_COLUMNS else row[c] for c in _COLUMNS]
+            conn.execute(_INSERT, values)
+
+        def written(future):
+            error = future.exception()
+            if error is not None and attempt < MAX_WRITE_ATTEMPTS:
+                self._queue(row, file_path, attempt + 1)
+                return
+            if error is not None:
+                # Don't lose the order silently: the log line has everything needed to re-insert it
+                logger.error("Could not store order %s after %d attempts: %s\n%s",
+                             row["id"], attempt, error, _to_json(row))
+            with self._pending_lock:
+                self._pending.pop(row["id"], None)
+
+        self._writer.submit(insert).add_done_callback(written)
+
+    def set_status(self, order_id: str, status: str):
+        """Change an order's status (applied in the background, like ``record``)."""
+        now = time.time()
+        with self._pending_lock:
+            pending = self._pending.get(order_id)
+            if pending is not None:
+                pending["status"], pending["updated_at"] = status, now
+        self._writer.submit(lambda conn: conn.execute(
+            "UPDATE orders SET status = ?, updated_at = ? WHERE id = ?", (status, now, order_id)
+        ))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until every queued order has been written (or has failed for good and been logged)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Failed batches are re-queued by their callbacks, so keep going until nothing is pending
+            self._writer.flush(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            with self._pending_lock:
+                if not self._pending:
+                    return
+
+    def _flush_at_exit(self):
+        with self._pending_lock:
+            if not self._pending:
+                return
+        try:
+            self.flush(timeout=10)
+        except Exception:
+            logger.exception("Could not flush queued orders at exit")
+
+    # ---- reads --------------------------------------------------------
+
+    def get(self, order_id: str) -> Optional[StoredOrder]:
+        """Look up one order by id (includes orders still queued in this process)."""
+        with self._pending_lock:
+            pending = self._pending.get(order_id)
+            if pending is not None:
+                return StoredOrder(**pending)
+        row = self.db.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM orders WHERE id = ?", (order_id,)
+        ).fetchone()
+        return _row_to_order(row) if row else None
+
+    def _list(self, where: str, params: tuple, limit: int, before: Optional[float]) -> List[StoredOrder]:
+        clauses = [where] if where else []
+        if before is not None:
+            clauses.append("created_at < ?")
+            params = params + (before,)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM orders"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        return [_row_to_order(row) for row in self.db.execute(sql, params + (limit,)).fetchall()]
+
+    def recent(self, limit: int = DEFAULT_LIMIT, before: Optional[float] = None) -> List[StoredOrder]:
+        """Newest orders first. Pass the last order's ``created_at`` as ``before`` for the next page."""
+        return self._list("", (), limit, before)
+
+    def by_status(self, status: str, limit: int = DEFAULT_LIMIT, before: Optional[float] = None) -> List[StoredOrder]:
+        """Newest orders with a status (e.g. the dashboard's work queue)."""
+        return self._list("status = ?", (status,), limit, before)
+
+    def by_email(self, email: str, limit: int = DEFAULT_LIMIT, before: Optional[float] = None) -> List[StoredOrder]:
+        """A customer's orders, newest first (email matching ignores case)."""
+        return self._list("email = ?", (email.strip().casefold(),), limit, before)
+
+    def by_file_digest(self, digest: str, limit: int = DEFAULT_LIMIT,
+                       before: Optional[float] = None) -> List[StoredOrder]:
+        """Orders of the same artwork (by content digest), newest first - the basis for re-orders."""
+        return self._list("file_digest = ?", (digest,), limit, before)
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Order count per status (answered from the status index)."""
+        rows = self.db.execute("SELECT status, COUNT(*) AS n FROM orders GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+_default_store: Optional[OrderStore] = None
+_default_lock = threading.Lock()
+
+
+def get_order_store() -> Optional[OrderStore]:
+    """Get the process-wide order store (None if the database can't be opened)."""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                try:
+                    _default_store = OrderStore()
+                except (OSError, sqlite3.Error):
+                    return None
+    return _default_store
@@ -0,0 +1,170 @@
+"""Persistent cache of file analysis results, keyed by content digest."""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from instrumentation import CACHE_HIT, CACHE_MISS, record_event
+
+from .sqlite import Database, get_default_database
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Digests of files that aren't content-addressed, remembered per path (least recently used dropped first)
+MAX_REMEMBERED_DIGESTS = 4096
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS analysis_results (
+        kind TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        params TEXT NOT NULL,
+        value TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (kind, digest, params)
+    ) WITHOUT ROWID
+    """,
+]
+
+
+def sha256_file(path: Union[str, Path]) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def digest_from_path(path: Union[str, Path]) -> Optional[str]:
+    """Return the digest encoded in a content-addressed file name (``<sha256><ext>``), if any."""
+    stem = Path(path).name.split(".", 1)[0]
+    return stem if DIGEST_PATTERN.match(stem) else None
+
+
+class ResultCache:
+    """
+    Analysis results (preflight, resolution, conversions) stored in SQLite.
+
+    Entries are keyed by (kind, file digest, parameters), so re-uploads and
+    re-orders of identical artwork skip all image work - across restarts and
+    across every worker process sharing the database file.
+    """
+
+    def __init__(self, db: Optional[Database] = None, max_remembered_digests: int = MAX_REMEMBERED_DIGESTS):
+        self.db = db or get_default_database()
+        self.db.ensure_schema("analysis_results", SCHEMA)
+        self.max_remembered_digests = max_remembered_digests
+        # path -> (size, mtime_ns, digest)
+        self._digests: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._digest_lock = threading.Lock()
+
+    @staticmethod
+    def _params_key(params: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, kind: str, digest: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Get a cached result, or None."""
+        try:
+            row = self.db.execute(
+                "SELECT value FROM analysis_results WHERE kind = ? AND digest = ? AND params = ?",
+                (kind, digest, self._params_key(params))
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row["value"]) if row else None
+
+    def put(self, kind: str, digest: str, params: Optional[Dict[str, Any]], value: Any):
+        """Store a result (JSON-serializable). Failures to write are ignored - it's only a cache."""
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO analysis_results (kind, digest, params, value, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (kind, digest, self._params_key(params), json.dumps(value, default=str), time.time())
+            )
+        except sqlite3.Error:
+            pass
+
+    def get_or_compute(
+        self,
+        kind: str,
+        digest: str,
+        params: Optional[Dict[str, Any]],
+        compute: Callable[[], Any],
+        should_cache: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """Return the cached result, or compute, store and return it."""
+        cached = self.get(kind, digest, params)
+        if cached is not None:
+            record_event(CACHE_HIT, "result")
+            return cached
+        record_event(CACHE_MISS, "result")
+        value = compute()
+        if should_cache(value):
+            self.put(kind, digest, params, value)
+        return value
+
+    def file_digest(self, file_path: Union[str, Path]) -> str:
+        """
+        Get the SHA-256 of a file.
+
+        Content-addressed uploads carry their digest in the file name. Other
+        files are hashed once and the digest is reused while their size and
+        mtime are unchanged, so a repeat lookup costs one stat().
+        """
+        encoded = digest_from_path(file_path)
+        if encoded:
+            return encoded
+
+        path = str(Path(file_path).resolve())
+        stat = os.stat(path)
+        with self._digest_lock:
+            remembered = self._digests.get(path)
+            if remembered is not None and remembered[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._digests.move_to_end(path)
+                return remembered[2]
+
+        digest = sha256_file(path)
+        with self._digest_lock:
+            self._digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._digests.move_to_end(path)
+            while len(self._digests) > self.max_remembered_digests:
+                self._digests.popitem(last=False)
+        return digest
+
+    def cached_file_result(
+        self,
+        kind: str,
+        file_path: Union[str, Path],
+        params: Optional[Dict[str, Any]],
+        compute: Callable[[], Any],
+        should_cache: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """get_or_compute keyed by the digest of ``file_path`` (computes directly if the file is unreadable)."""
+        try:
+            digest = self.file_digest(file_path)
+        except OSError:
+            return compute()
+        return self.get_or_compute(kind, digest, params, compute, should_cache)
+
+
+_default_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the process-wide result cache (None if the database can't be opened)."""
+    global _default_cache
+    if _default_cache is None:
+        try:
+            _default_cache = ResultCache()
+        except (OSError, sqlite3.Error):
+            return None
+    return _default_cache
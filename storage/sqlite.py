@@ -0,0 +1,202 @@
+"""Shared SQLite plumbing: one WAL-mode database file, thread-local connections."""
+
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+DEFAULT_DB_PATH = Path(os.environ.get(
+    "PRINTSHOP_DB_PATH",
+    Path(__file__).parent.parent / "instance" / "printshop.sqlite3"
+))
+
+# Group commit: queued writes are applied together, in one transaction, up to this many at a time
+MAX_BATCH_SIZE = 256
+
+WriteOperation = Callable[[sqlite3.Connection], Any]
+
+
+class Database:
+    """
+    A SQLite database shared by every thread and process on the host.
+
+    WAL mode lets readers proceed while one writer commits, which is what we need
+    with several gunicorn workers hitting the same file. Each thread gets its own
+    connection; connections are re-opened after a fork.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_DB_PATH, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._schemas_applied = set()
+        self._schema_lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # isolation_level=None: autocommit, transactions are explicit via transaction()
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, tuple(params))
+
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in one transaction.
+
+        ``immediate`` takes the write lock up front (BEGIN IMMEDIATE), so
+        read-modify-write sequences can't interleave with other writers.
+        """
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def ensure_schema(self, name: str, statements: Iterable[str]):
+        """Apply ``CREATE ... IF NOT EXISTS`` statements once per process."""
+        if name in self._schemas_applied:
+            return
+        with self._schema_lock:
+            if name in self._schemas_applied:
+                return
+            conn = self.connection()
+            for statement in statements:
+                conn.execute(statement)
+            self._schemas_applied.add(name)
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class WriteBatcher:
+    """
+    Applies write operations queued by many threads in shared transactions.
+
+    Each BEGIN IMMEDIATE ... COMMIT takes the database write lock once and, in
+    WAL mode, appends one batch of pages to the log. Folding every write that
+    arrived meanwhile into the same transaction keeps sustained write rates
+    from turning into lock contention between worker processes.
+
+    Operations run on one background thread per process, each under its own
+    savepoint: one raising one of ``expected_errors`` is rolled back and its
+    future fails, while the rest of the batch still commits.
+    """
+
+    def __init__(self, db: Database, name: str = "db-writer", max_batch: int = MAX_BATCH_SIZE,
+                 expected_errors: Tuple[Type[BaseException], ...] = (sqlite3.IntegrityError,)):
+        self.db = db
+        self.name = name
+        self.max_batch = max_batch
+        self.expected_errors = expected_errors
+        self._queue: "queue.Queue[Tuple[WriteOperation, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, operation: WriteOperation) -> Future:
+        """Queue ``operation(conn)`` to run inside the next write transaction."""
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Wait until everything queued so far has been committed or has failed.
+
+        Raises:
+            concurrent.futures.TimeoutError: if that takes longer than ``timeout``
+        """
+        marker = self.submit(lambda conn: None)
+        done, _ = wait([marker], timeout)
+        if not done:
+            raise FuturesTimeoutError()
+
+    def _ensure_thread(self):
+        # Threads don't survive fork; a forked worker starts its own writer
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(batch)
+
+    def _apply(self, batch: List[Tuple[WriteOperation, Future]]):
+        results = []
+        try:
+            with self.db.transaction() as conn:
+                for operation, future in batch:
+                    conn.execute("SAVEPOINT op")
+                    try:
+                        results.append((future, operation(conn), None))
+                        conn.execute("RELEASE op")
+                    except self.expected_errors as e:
+                        conn.execute("ROLLBACK TO op")
+                        conn.execute("RELEASE op")
+                        results.append((future, None, e))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for future, value, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+
+_default_database: Optional[Database] = None
+_default_lock = threading.Lock()
+
+
+def configure_default_database(path: Union[str, Path]) -> Database:
+    """Point the process-wide database at ``path`` (e.g., /tmp on serverless hosts)."""
+    global _default_database
+    with _default_lock:
+        _default_database = Database(path)
+        return _default_database
+
+
+def get_default_database() -> Database:
+    """Get the process-wide database, creating it at DEFAULT_DB_PATH on first use."""
+    global _default_database
+    if _default_database is None:
+        with _default_lock:
+            if _default_database is None:
+                _default_database = Database(DEFAULT_DB_PATH)
+    return _default_database
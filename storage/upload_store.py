@@ -0,0 +1,161 @@
+"""Content-addressed storage for uploaded artwork."""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from .result_cache import DIGEST_PATTERN
+from .sqlite import Database, get_default_database
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS uploads (
+        original_filename TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        ext TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (original_filename, digest)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_uploads_filename_created ON uploads (original_filename, created_at)",
+]
+
+
+@dataclass
+class StoredUpload:
+    """A file in the upload store."""
+    digest: str
+    ext: str
+    size: int
+    path: Path
+    original_filename: str
+
+    @property
+    def filename(self) -> str:
+        """Stored (content-addressed) file name, e.g. ``<sha256>.jpg``."""
+        return f"{self.digest}{self.ext}"
+
+
+class UploadStore:
+    """
+    Stores uploads under their SHA-256 digest, indexed by original file name.
+
+    Identical files are stored once, two customers uploading "artwork.jpg" can't
+    overwrite each other, and the digest doubles as the key for cached analysis.
+    Clients refer to an upload by its stored name, never by the original one.
+    Layout: ``<root>/objects/<first two hex chars>/<digest><ext>``.
+    """
+
+    def __init__(self, root: Union[str, Path], db: Optional[Database] = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.tmp_dir = self.root / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.db = db or get_default_database()
+        self.db.ensure_schema("uploads", SCHEMA)
+
+    def object_path(self, digest: str, ext: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{ext}"
+
+    def relative_path(self, stored: StoredUpload) -> str:
+        """Path of a stored file relative to the store root (for building URLs)."""
+        return stored.path.relative_to(self.root).as_posix()
+
+    def put_stream(self, stream: BinaryIO, original_filename: str, ext: Optional[str] = None) -> StoredUpload:
+        """
+        Copy a stream into the store in chunks, hashing as it goes.
+
+        Args:
+            stream: Readable binary stream (e.g., werkzeug FileStorage.stream)
+            original_filename: Client-supplied file name, recorded in the index
+            ext: Extension to store under (defaults to the original's, lower-cased)
+
+        Returns:
+            StoredUpload for the (possibly already existing) object
+        """
+        ext = (ext if ext is not None else os.path.splitext(original_filename)[1]).lower()
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=ext)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: stream.read(COPY_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            return self.commit_temp(tmp_path, hasher.hexdigest(), size, original_filename, ext)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put_bytes(self, data: bytes, original_filename: str, ext: Optional[str] = None) -> StoredUpload:
+        """Store an in-memory file (e.g., a converted JPEG)."""
+        ext = (ext if ext is not None else os.path.splitext(original_filename)[1]).lower()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest, ext)
+        if not path.exists():
+            fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=ext)
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    out.write(data)
+                return self.commit_temp(tmp_path, digest, len(data), original_filename, ext)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        self._index(original_filename, digest, ext, len(data))
+        return StoredUpload(digest, ext, len(data), path, original_filename)
+
+    def commit_temp(self, tmp_path: Union[str, Path], digest: str, size: int,
+                    original_filename: str, ext: str) -> StoredUpload:
+        """Move a fully written temp file into place under its digest (atomic; dedupes)."""
+        path = self.object_path(digest, ext)
+        if path.exists():
+            os.unlink(tmp_path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, path)
+        self._index(original_filename, digest, ext, size)
+        return StoredUpload(digest, ext, size, path, original_filename)
+
+    def _index(self, original_filename: str, digest: str, ext: str, size: int):
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO uploads (original_filename, digest, ext, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (original_filename, digest, ext, size, time.time())
+            )
+        except sqlite3.Error:
+            pass  # The object itself is stored; only name lookup is affected
+
+    def get(self, digest: str, ext: str) -> Optional[StoredUpload]:
+        """Look up a stored object by digest and extension."""
+        path = self.object_path(digest, ext)
+        if not path.exists():
+            return None
+        return StoredUpload(digest, ext, path.stat().st_size, path, f"{digest}{ext}")
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """
+        Find the file for a stored name (``<digest><ext>``) sent back by the client.
+
+        Original file names are deliberately not accepted: they aren't unique,
+        so looking one up could hand out another customer's upload. Only the
+        digest name returned by the upload proves the client has the file.
+        """
+        name = os.path.basename(name or "")
+        stem, ext = os.path.splitext(name)
+        if not DIGEST_PATTERN.match(stem):
+            return None
+        path = self.object_path(stem, ext.lower())
+        return path if path.exists() else None
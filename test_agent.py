@@ -19,7 +19,7 @@ def create_test_image(width_px, height_px, filename):
     img.save(filepath, 'JPEG')
     return filepath
 
-def test_order_scenario(name, order_data, expected_result):
+def check_order_scenario(name, order_data, expected_result):
     """Test a single order scenario"""
     print(f"\n{'='*60}")
     print(f"TEST: {name}")
@@ -61,7 +61,7 @@ def run_tests():
     
     # Test 1: Valid order (should pass)
     test_file = create_test_image(2400, 3000, 'test_high_quality.jpg')  # 300 DPI for 8x10
-    results.append(test_order_scenario(
+    results.append(check_order_scenario(
         "Valid Order - High Quality",
         {
             'email': 'test@example.com',
@@ -76,7 +76,7 @@ def run_tests():
     
     # Test 2: Low DPI (should fail Layer 2)
     test_file = create_test_image(800, 1000, 'test_low_dpi.jpg')  # ~100 DPI for 8x10
-    results.append(test_order_scenario(
+    results.append(check_order_scenario(
         "Low DPI - Should Fail",
         {
             'email': 'test@example.com',
@@ -91,7 +91,7 @@ def run_tests():
     
     # Test 3: Invalid paper (should fail Layer 1)
     test_file = create_test_image(2400, 3000, 'test_invalid_paper.jpg')
-    results.append(test_order_scenario(
+    results.append(check_order_scenario(
         "Invalid Paper Type - Should Fail",
         {
             'email': 'test@example.com',
@@ -106,7 +106,7 @@ def run_tests():
     
     # Test 4: Size too large (should fail Layer 1)
     test_file = create_test_image(2400, 3000, 'test_oversized.jpg')
-    results.append(test_order_scenario(
+    results.append(check_order_scenario(
         "Oversized Print - Should Fail",
         {
             'email': 'test@example.com',
@@ -121,7 +121,7 @@ def run_tests():
     
     # Test 5: Acceptable DPI (should pass)
     test_file = create_test_image(1800, 2250, 'test_acceptable.jpg')  # 225 DPI for 8x10
-    results.append(test_order_scenario(
+    results.append(check_order_scenario(
         "Acceptable DPI - Should Pass",
         {
             'email': 'test@example.com',
@@ -145,6 +145,10 @@ def run_tests():
     
     return passed == total
 
+def test_agent_scenarios():
+    """pytest entry point: every scenario must get its expected result."""
+    assert run_tests()
+
 if __name__ == '__main__':
     success = run_tests()
     exit(0 if success else 1)
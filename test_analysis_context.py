@@ -0,0 +1,101 @@
+"""Tests for the per-order tool memo (tools/analysis_context.py)."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tools.analysis_context import AnalysisContext
+
+
+def test_equivalent_calls_share_one_result(tmp_path):
+    context = AnalysisContext()
+    calls = []
+
+    def tool(file_path, width):
+        calls.append((file_path, width))
+        return {"width": width}
+
+    first = context.call("tool", tool, file_path=str(tmp_path / "a.jpg"), width=8.0)
+    # Same file via a relative-looking path and an int width: same key
+    second = context.call("tool", tool, file_path=tmp_path / "." / "a.jpg", width=8)
+    assert first is second
+    assert len(calls) == 1
+    assert context.get_stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_exceptions_are_not_cached():
+    context = AnalysisContext()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("busy")
+        return "ok"
+
+    with pytest.raises(OSError):
+        context.memoize("key", flaky)
+    assert context.memoize("key", flaky) == "ok"
+    assert len(attempts) == 2
+
+
+def test_concurrent_callers_compute_once_and_count_every_call():
+    context = AnalysisContext()
+    computed = []
+    barrier = threading.Barrier(32)
+
+    def slow():
+        computed.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    def call(_):
+        barrier.wait()
+        return context.memoize("key", slow)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(call, range(32)))
+
+    assert results == ["value"] * 32
+    assert len(computed) == 1
+    stats = context.get_stats()
+    assert (stats["hits"], stats["misses"]) == (31, 1)
+
+
+def test_key_locks_are_dropped_after_success_and_failure():
+    context = AnalysisContext()
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            context.memoize(("measure", "corrupt.jpg"), lambda: int("not a number"))
+    assert context._key_locks == {}
+
+    context.memoize(("measure", "artwork.jpg"), lambda: 1)
+    assert context._key_locks == {}
+
+
+def test_bounded_context_drops_least_recently_used():
+    context = AnalysisContext(max_entries=2)
+    context.memoize("a", lambda: 1)
+    context.memoize("b", lambda: 2)
+    context.memoize("a", lambda: 1)  # "b" is now the oldest
+    context.memoize("c", lambda: 3)
+
+    assert context.get_stats()["entries"] == 2
+    assert context.memoize("a", lambda: "recomputed") == 1
+    assert context.memoize("b", lambda: "recomputed") == "recomputed"
+
+
+def test_validation_sessions_are_bounded():
+    from services.validation_sessions import MAX_SESSION_ENTRIES, ValidationSessions
+
+    sessions = ValidationSessions(max_sessions=2)
+    first, analysis = sessions.get(None)
+    assert analysis.max_entries == MAX_SESSION_ENTRIES
+    assert sessions.get(first)[1] is analysis
+
+    sessions.get(None)
+    sessions.get(None)
+    assert len(sessions) == 2
+    assert sessions.get(first)[1] is not analysis
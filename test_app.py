@@ -0,0 +1,229 @@
+"""
+Tests for the Flask order form API (app.py).
+
+Files are uploaded through /upload, as the order form does, and orders refer
+to them by the stored filename it returns.
+"""
+
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+import app as app_module
+from agent import printshop_agent
+from storage import get_inventory_store
+from tools.inventory_tool import INVENTORY
+
+
+@pytest.fixture
+def client():
+    app_module.app.config["TESTING"] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def stock():
+    """The shared inventory store; levels changed by a test are put back afterwards."""
+    store = get_inventory_store(INVENTORY)
+    saved = {paper: store.level(paper) for paper in INVENTORY}
+    yield store
+    for paper, level in saved.items():
+        store.set_level(paper, level.on_hand, level.in_stock)
+
+
+def upload_image(client, width_px, height_px, name="artwork.jpg", color="white"):
+    """Upload a JPEG through /upload and return the stored filename."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (width_px, height_px), color=color).save(buffer, "JPEG")
+    buffer.seek(0)
+    response = client.post("/upload", data={"file": (buffer, name)}, content_type="multipart/form-data")
+    assert response.status_code in (200, 202), response.get_json()
+    return response.get_json()["filename"]
+
+
+def order(filename, **overrides):
+    data = {
+        "email": "customer@example.com",
+        "name": "Test Customer",
+        "size": "8x10",
+        "paper": "100lb Matte",
+        "quantity": 10,
+        "filename": filename,
+    }
+    data.update(overrides)
+    return data
+
+
+def test_quote_grid_revalidates_with_its_etag(client):
+    first = client.get("/quote-grid")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] in ("public, max-age=300", "max-age=300, public")
+    etag = first.headers["ETag"]
+    assert "100lb Matte" in first.get_json()["prices"]["8x10"]
+
+    cached = client.get("/quote-grid", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    stale = client.get("/quote-grid", headers={"If-None-Match": '"quote-grid-stale"'})
+    assert stale.status_code == 200
+
+
+def test_upload_rejects_unsupported_files(client):
+    gif = io.BytesIO(b"GIF89a" + b"\x00" * 1024)
+    response = client.post("/upload", data={"file": (gif, "animation.gif")}, content_type="multipart/form-data")
+    assert response.status_code == 415
+    assert "Unsupported file format" in response.get_json()["error"]
+
+
+def test_upload_job_status(client):
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 400), color="white").save(buffer, "JPEG", dpi=(300, 300))
+    buffer.seek(0)
+    upload = client.post("/upload", data={"file": (buffer, "job.jpg")}, content_type="multipart/form-data")
+    body = upload.get_json()
+
+    status = client.get(body["status_url"])
+    assert status.status_code == 200
+    job = status.get_json()
+    assert job["id"] == body["job_id"]
+    assert job["kind"] == "upload"
+    assert client.get("/jobs/not-a-job").status_code == 404
+
+
+def test_order_form_prices_from_the_quote_grid(client):
+    page = client.get("/").get_data(as_text=True)
+    assert "fetch('/quote-grid')" in page
+    assert 'data-size="8.5x11"' in page
+
+
+def test_orders_refer_to_uploads_by_stored_name_only(client):
+    stored = upload_image(client, 2400, 3000, name="family-photo.jpg")
+    assert stored != "family-photo.jpg"
+
+    # Another customer guessing the original file name gets nothing
+    response = client.post("/validate-order", json=order("family-photo.jpg"))
+    assert response.status_code == 400
+    response = client.post("/submit-order", json=order("family-photo.jpg"))
+    assert response.status_code == 400
+    assert response.get_json()["layer"] == "preflight"
+
+
+def test_validate_order_reuses_session_results(client):
+    filename = upload_image(client, 2400, 3000)
+
+    first = client.post("/validate-order", json=order(filename))
+    assert first.status_code == 200
+    body = first.get_json()
+    assert body["valid"] is True
+    assert body["order_summary"]["file_quality"]["dpi"] == 300.0
+    session_id = body["session_id"]
+
+    second = client.post("/validate-order", json=order(filename, quantity=20, session_id=session_id))
+    assert second.status_code == 200
+    body = second.get_json()
+    assert body["valid"] is True
+    assert body["session_id"] == session_id
+    assert body["order_summary"]["quantity"] == 20
+
+    # The file was measured by the first call; the second only redid the quantity-dependent lookups
+    _, analysis = app_module.validation_sessions.get(session_id)
+    assert analysis.get_stats()["hits"] >= 1
+
+
+def test_validate_order_session_sees_live_stock(client, stock):
+    filename = upload_image(client, 2400, 3000)
+
+    body = client.post("/validate-order", json=order(filename, paper="65lb Text")).get_json()
+    assert body["valid"] is True
+
+    # Stock sold elsewhere while the form is open
+    stock.set_level("65lb Text", stock.level("65lb Text").reserved + 5)
+    body = client.post("/validate-order", json=order(filename, paper="65lb Text",
+                                                     session_id=body["session_id"])).get_json()
+    assert body["valid"] is False
+    assert body["layer"] == "inventory"
+
+
+def test_validate_order_rejects_unknown_file(client):
+    response = client.post("/validate-order", json=order("0" * 64 + ".jpg"))
+    assert response.status_code == 400
+    assert response.get_json()["valid"] is False
+
+
+def test_submit_order_race_for_last_sheets(client, monkeypatch, stock):
+    # Exactly one order's worth of sheets left
+    stock.set_level("110lb Cardstock", stock.level("110lb Cardstock").reserved + 10)
+    filename = upload_image(client, 2400, 3000)
+
+    # Both orders pass validation before either reserves
+    barrier = threading.Barrier(2)
+    reserve = app_module.reserve_inventory
+
+    def reserve_together(paper, quantity):
+        barrier.wait(timeout=10)
+        return reserve(paper, quantity)
+
+    monkeypatch.setattr(app_module, "reserve_inventory", reserve_together)
+
+    def submit(email):
+        with app_module.app.test_client() as racer:
+            return racer.post("/submit-order", json=order(filename, email=email, paper="110lb Cardstock"))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        responses = list(executor.map(submit, ["first@example.com", "second@example.com"]))
+
+    assert sorted(response.status_code for response in responses) == [200, 409]
+    accepted = next(response.get_json() for response in responses if response.status_code == 200)
+    rejected = next(response.get_json() for response in responses if response.status_code == 409)
+    assert accepted["order_id"]
+    assert rejected["layer"] == "inventory"
+    assert stock.level("110lb Cardstock").free == 0
+
+    app_module.order_store.flush(timeout=10)
+    stored = app_module.order_store.get(accepted["order_id"])
+    assert stored.paper == "110lb Cardstock" and stored.quantity == 10
+
+
+def test_validate_orders_streams_results_in_input_order(client, monkeypatch):
+    shared = upload_image(client, 2400, 3000, name="shared.jpg", color="white")
+    slow = upload_image(client, 1200, 1500, name="slow.jpg", color="black")
+
+    measured = []
+    measure = printshop_agent.measure_artwork
+
+    def spy(file_path):
+        measured.append(file_path)
+        if slow in file_path:
+            time.sleep(0.3)  # finishes last, but is listed first
+        return measure(file_path)
+
+    monkeypatch.setattr(printshop_agent, "measure_artwork", spy)
+
+    response = client.post("/validate-orders", json={"orders": [
+        order(slow, size="4x6"),
+        order(shared, size="8x10"),
+        order(shared, size="5x7", quantity=50),
+    ]})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert [line["result"]["order_summary"]["size"] for line in lines] == ["4x6", "8x10", "5x7"]
+    assert all(line["result"]["valid"] for line in lines)
+
+    # The shared file was measured once for both of its line items
+    assert sorted(path.rsplit("/", 1)[-1] for path in measured) == sorted([slow, shared])
+
+
+def test_validate_orders_rejects_malformed_batch(client):
+    response = client.post("/validate-orders", json={"orders": []})
+    assert response.status_code == 400
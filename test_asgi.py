@@ -0,0 +1,136 @@
+"""Tests for the ASGI (Starlette) order API in asgi.py."""
+
+import io
+import json
+
+import pytest
+from PIL import Image
+from starlette.testclient import TestClient
+
+import asgi
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(asgi.app) as client:
+        yield client
+
+
+def upload_image(client, width_px, height_px, name="artwork.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width_px, height_px), color="white").save(buffer, "PNG")
+    response = client.post("/upload", files={"file": (name, buffer.getvalue(), "image/png")})
+    assert response.status_code in (200, 202), response.json()
+    return response.json()["filename"]
+
+
+def order(filename, **overrides):
+    data = {
+        "email": "customer@example.com",
+        "size": "8x10",
+        "paper": "80lb Text",
+        "quantity": 5,
+        "filename": filename,
+    }
+    data.update(overrides)
+    return data
+
+
+def test_status_reports_online(client):
+    body = client.get("/status").json()
+    assert body["status"] == "online"
+    assert body["mode"] == "asgi"
+
+
+def test_upload_returns_job_and_dimensions(client):
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 400), color="white").save(buffer, "PNG")
+    response = client.post("/upload", files={"file": ("small.png", buffer.getvalue(), "image/png")})
+    assert response.status_code in (200, 202)
+    body = response.json()
+
+    job = client.get(body["status_url"]).json()
+    assert job["id"] == body["job_id"]
+    assert job["kind"] == "upload"
+
+
+def test_validate_order(client):
+    filename = upload_image(client, 2400, 3000)
+
+    first = client.post("/validate-order", json=order(filename))
+    assert first.status_code == 200
+    body = first.json()
+    assert body["valid"] is True
+    assert body["order_summary"]["file_quality"]["quality"] == "high"
+
+    low_res = client.post("/validate-order", json=order(filename, size="12x18", session_id=body["session_id"]))
+    assert low_res.json()["valid"] is False
+    assert low_res.json()["layer"] == "preflight"
+    assert low_res.json()["session_id"] == body["session_id"]
+
+
+def test_non_object_json_bodies_are_rejected_cleanly(client):
+    for body in ([order("artwork.png")], "artwork.png", 42):
+        response = client.post("/validate-order", json=body)
+        assert response.status_code == 400
+        assert response.json()["valid"] is False
+
+        response = client.post("/submit-order", json=body)
+        assert response.status_code == 400
+        assert response.json()["success"] is False
+
+
+def test_submit_order(client):
+    filename = upload_image(client, 2400, 3000)
+
+    response = client.post("/submit-order", json=order(filename))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["order_id"]
+    assert body["order_summary"]["paper"] == "80lb Text"
+
+    asgi.order_store.flush(timeout=10)
+    assert asgi.order_store.get(body["order_id"]).email == "customer@example.com"
+
+
+def test_submit_order_rejected_by_guardrail(client):
+    filename = upload_image(client, 2400, 3000)
+
+    response = client.post("/submit-order", json=order(filename, size="20x30"))
+    assert response.status_code == 400
+    assert response.json()["layer"] == "spec_check"
+
+
+def test_quote_grid_if_none_match_compares_whole_tags(client):
+    first = client.get("/quote-grid")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    assert client.get("/quote-grid", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/quote-grid", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get("/quote-grid", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get("/quote-grid", headers={"If-None-Match": "*"}).status_code == 304
+
+    # A tag that merely contains the current one is a different tag
+    stale = '"' + etag.strip('"') + '-stale"'
+    assert client.get("/quote-grid", headers={"If-None-Match": stale}).status_code == 200
+    assert client.get("/quote-grid", headers={"If-None-Match": etag.strip('"')}).status_code == 200
+
+
+def test_validate_orders_streams_ndjson(client):
+    filename = upload_image(client, 2400, 3000)
+
+    response = client.post("/validate-orders", json={"orders": [order(filename), order(filename, paper="Foil")]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in response.text.splitlines() if line]
+    results = [json.loads(line) for line in lines]
+    assert [result["index"] for result in results] == [0, 1]
+    assert results[0]["result"]["valid"] is True
+    assert results[1]["result"]["layer"] == "spec_check"
+
+    # A bare list is a batch too
+    response = client.post("/validate-orders", json=[order(filename)])
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[0])["result"]["valid"] is True
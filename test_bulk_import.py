@@ -0,0 +1,96 @@
+"""Tests for bulk order import (bulk_import.py, data/order_import.py)."""
+
+import io
+import json
+
+import pytest
+from PIL import Image
+
+from bulk_import import Checkpoint, run_import
+from data.order_import import iter_order_records, order_from_record
+
+
+@pytest.fixture
+def orders_file(tmp_path):
+    """A JSONL import of six orders: two bad ones (black paper, low resolution) among good ones."""
+    sharp = tmp_path / "sharp.jpg"
+    Image.new("RGB", (2400, 3000), color="white").save(sharp, "JPEG")
+    soft = tmp_path / "soft.jpg"
+    Image.new("RGB", (400, 500), color="white").save(soft, "JPEG")
+
+    records = [
+        {"order_id": "A1", "paper_stock": "80lb_text", "color": "white", "quantity": 10,
+         "width_inches": 8, "height_inches": 10, "file_path": str(sharp)},
+        {"order_id": "A2", "paper_stock": "100lb_cardstock", "color": "black", "quantity": 10,
+         "width_inches": 8, "height_inches": 10, "file_path": str(sharp)},
+        {"order_id": "A3", "paper": "100lb Matte", "size": "5x7", "quantity": 5, "file_path": str(sharp)},
+        {"order_id": "A4", "paper": "100lb Matte", "size": "8x10", "quantity": 5, "file_path": str(soft)},
+        {"order_id": "A5", "paper": "65lb Text", "size": "4x6", "quantity": 20, "file_path": str(sharp)},
+        {"order_id": "A6", "paper": "80lb Glossy", "size": "8.5x11", "quantity": 1, "file_path": str(sharp)},
+    ]
+    path = tmp_path / "orders.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    return path
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def outcome(entry):
+    result = entry["result"]
+    return "valid" if result["valid"] else result.get("layer")
+
+
+def test_order_from_record_maps_import_fields():
+    order = order_from_record({"order_id": "1", "paper_stock": "100lb_cardstock", "color": "black",
+                               "quantity": 500, "width_inches": 3.5, "height_inches": 2.0,
+                               "file_path": "/uploads/cards.pdf"})
+    assert order["paper"] == "black 100lb_cardstock"
+    assert order["size"] == "3.5x2"
+    assert order["quantity"] == 500
+    assert order["filename"] == "cards.pdf"
+
+    order = order_from_record({"paper": "100lb Matte", "color": "white", "size": "8x10"})
+    assert (order["paper"], order["size"], order["quantity"]) == ("100lb Matte", "8x10", 1)
+
+
+def test_csv_records_are_coerced(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("order_id,quantity,width_inches,full_color,paper\n,12,8.5,yes,\n", encoding="utf-8")
+    (record,) = iter_order_records(path)
+    assert record == {"order_id": "1", "quantity": 12, "width_inches": 8.5, "full_color": True, "paper": None}
+
+
+def test_import_validates_full_orders(orders_file, tmp_path):
+    output = tmp_path / "results.jsonl"
+    stats = run_import(orders_file, output, workers=2, log=io.StringIO())
+
+    results = read_results(output)
+    assert [entry["order_id"] for entry in results] == ["A1", "A2", "A3", "A4", "A5", "A6"]
+    assert [outcome(entry) for entry in results] == ["valid", "spec_check", "valid", "preflight", "valid", "valid"]
+    assert results[0]["result"]["order_summary"]["paper"] == "80lb Text"
+    assert (stats.processed, stats.errors) == (6, 0)
+
+    # A complete run leaves no checkpoint behind
+    assert not Checkpoint(output, orders_file).path.exists()
+
+
+def test_import_resumes_after_interruption(orders_file, tmp_path):
+    output = tmp_path / "results.jsonl"
+    run_import(orders_file, output, workers=2, log=io.StringIO())
+    complete = output.read_bytes()
+
+    # Simulate a crash after three results were checkpointed and part of a fourth was written
+    lines = complete.splitlines(keepends=True)
+    kept = b"".join(lines[:3])
+    output.write_bytes(kept + lines[3][:10])
+    Checkpoint(output, orders_file).save(3, len(kept))
+
+    log = io.StringIO()
+    stats = run_import(orders_file, output, workers=2, log=log)
+
+    assert "Resuming at order 3" in log.getvalue()
+    assert (stats.resumed_from, stats.processed) == (3, 3)
+    assert output.read_bytes() == complete
+    assert not Checkpoint(output, orders_file).path.exists()
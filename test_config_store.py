@@ -0,0 +1,68 @@
+"""Tests for the hot-reloadable config store (tools/config_store.py)."""
+
+import json
+import os
+
+import pytest
+
+from tools.config_store import ConfigStore, thaw
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    (tmp_path / "pricing.json").write_text(json.dumps({"rush_surcharge": {"rush": 1.25}, "sizes": [1, 2]}))
+    return tmp_path
+
+
+def rewrite(path, data):
+    """Write new contents with a later mtime, as an editor would."""
+    stat = os.stat(path)
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_is_parsed_once_and_read_only(config_dir):
+    store = ConfigStore(config_dir, check_interval=0)
+    first = store.snapshot("pricing")
+    assert store.snapshot("pricing") is first
+    assert first.data["sizes"] == (1, 2)
+    with pytest.raises(TypeError):
+        first.data["rush_surcharge"]["rush"] = 2.0
+    assert thaw(first.data) == {"rush_surcharge": {"rush": 1.25}, "sizes": [1, 2]}
+
+
+def test_edits_are_picked_up_after_the_check_interval(config_dir):
+    store = ConfigStore(config_dir, check_interval=3600)
+    digest = store.digest("pricing")
+    rewrite(config_dir / "pricing.json", {"rush_surcharge": {"rush": 1.5}})
+
+    assert store.get("pricing")["rush_surcharge"]["rush"] == 1.25
+    store.invalidate("pricing")
+    assert store.get("pricing")["rush_surcharge"]["rush"] == 1.5
+    assert store.digest("pricing") != digest
+
+
+def test_touched_but_unchanged_file_keeps_its_parsed_data(config_dir):
+    store = ConfigStore(config_dir, check_interval=0)
+    first = store.snapshot("pricing")
+    path = config_dir / "pricing.json"
+    os.utime(path, ns=(first.mtime_ns, first.mtime_ns + 1_000_000_000))
+
+    second = store.snapshot("pricing")
+    assert second.data is first.data
+    assert second.mtime_ns != first.mtime_ns
+
+
+def test_broken_edit_keeps_serving_the_last_good_config(config_dir):
+    store = ConfigStore(config_dir, check_interval=0)
+    good = store.get("pricing")
+    path = config_dir / "pricing.json"
+    path.write_text('{"rush_surcharge": ')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+
+    assert store.get("pricing") is good
+
+
+def test_missing_file_raises(config_dir):
+    with pytest.raises(OSError):
+        ConfigStore(config_dir).get("shop_capabilities")
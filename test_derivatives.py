@@ -0,0 +1,106 @@
+"""Tests for the rendition cache (services/derivatives.py)."""
+
+import threading
+
+import pytest
+from PIL import Image
+
+from services import derivatives as derivatives_module
+from services.derivatives import DerivativeCache
+from storage import Database
+
+
+DIGEST = "ab" * 32
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DerivativeCache(tmp_path / "derivatives", db=Database(tmp_path / "cache.sqlite3"))
+
+
+@pytest.fixture
+def artwork(tmp_path):
+    # TIFF is never passed through, so every rendition is rendered
+    path = tmp_path / "artwork.tif"
+    Image.new("RGB", (640, 480), "navy").save(path)
+    return path
+
+
+def last_access(cache):
+    cache._writer.flush()
+    return cache.db.execute(
+        "SELECT last_access FROM derivatives WHERE digest = ? AND rendition = 'thumb'", (DIGEST,)
+    ).fetchone()["last_access"]
+
+
+def test_concurrent_requests_render_once_and_drop_the_lock(cache, artwork, monkeypatch):
+    renders = []
+    render_to = cache._render_to
+    barrier = threading.Barrier(8)
+
+    def counted(path, source_path, spec):
+        renders.append(spec.name)
+        render_to(path, source_path, spec)
+
+    monkeypatch.setattr(cache, "_render_to", counted)
+
+    def request():
+        barrier.wait()
+        return cache.get(DIGEST, artwork, "thumb")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(request())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert renders == ["thumb"]
+    assert len(set(results)) == 1 and results[0].exists()
+    assert cache._key_locks == {}
+
+
+def test_key_lock_is_shared_until_its_last_waiter_leaves(cache, artwork, monkeypatch):
+    rendering, release = threading.Event(), threading.Event()
+    render_to = cache._render_to
+
+    def slow(path, source_path, spec):
+        rendering.set()
+        release.wait(5)
+        render_to(path, source_path, spec)
+
+    monkeypatch.setattr(cache, "_render_to", slow)
+    first = threading.Thread(target=cache.get, args=(DIGEST, artwork, "thumb"))
+    first.start()
+    rendering.wait(5)
+    second = threading.Thread(target=cache.get, args=(DIGEST, artwork, "thumb"))
+    second.start()
+
+    # Both requests hold the same entry while the render is in progress
+    for _ in range(500):
+        with cache._lock:
+            if cache._key_locks[(DIGEST, "thumb")][1] == 2:
+                break
+        threading.Event().wait(0.01)
+    assert cache._key_locks[(DIGEST, "thumb")][1] == 2
+
+    release.set()
+    first.join()
+    second.join()
+    assert cache._key_locks == {}
+
+
+def test_cache_hits_touch_at_most_once_per_interval(cache, artwork, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(derivatives_module.time, "time", lambda: clock[0])
+
+    cache.get(DIGEST, artwork, "thumb")
+    assert last_access(cache) == 1000.0
+
+    clock[0] += 1
+    cache.get(DIGEST, artwork, "thumb")
+    assert last_access(cache) == 1000.0
+
+    clock[0] += derivatives_module.TOUCH_INTERVAL_SECONDS
+    cache.get(DIGEST, artwork, "thumb")
+    assert last_access(cache) == clock[0]
@@ -0,0 +1,89 @@
+"""Tests for the header-only image probe (image_probe.py) and the resolution check built on it."""
+
+import io
+import struct
+
+import pytest
+from PIL import Image
+
+from image_probe import ProbeError, TruncatedHeaderError, probe_bytes, probe_image
+from tools.resolution_tool import check_resolution
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def heif(ipma: bytes, pitm: bytes = b"\x00\x00\x00\x00\x00\x01") -> bytes:
+    ispe = box(b"ispe", b"\x00\x00\x00\x00" + struct.pack(">II", 4032, 3024))
+    irot = box(b"irot", b"\x01")  # a quarter turn counter-clockwise
+    iprp = box(b"iprp", box(b"ipco", ispe + irot) + box(b"ipma", ipma))
+    meta = box(b"meta", b"\x00\x00\x00\x00" + box(b"pitm", pitm) + iprp)
+    return box(b"ftyp", b"heic\x00\x00\x00\x00mif1heic") + meta + box(b"mdat", b"\x00" * 64)
+
+
+# Item 1 has properties 1 (ispe) and 2 (irot)
+VALID_IPMA = b"\x00\x00\x00\x00" + struct.pack(">IHB", 1, 1, 2) + b"\x01\x02"
+
+
+def encoded(fmt: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (120, 80), "white").save(buffer, fmt, **params)
+    return buffer.getvalue()
+
+
+def test_heif_dimensions_and_rotation():
+    metadata = probe_bytes(heif(VALID_IPMA))
+    assert metadata.format == "HEIF"
+    assert (metadata.width, metadata.height) == (4032, 3024)
+    assert metadata.display_size == (3024, 4032)
+
+
+@pytest.mark.parametrize("ipma", [
+    # Claims three entries but holds one
+    b"\x00\x00\x00\x00" + struct.pack(">IHB", 3, 1, 2) + b"\x01\x02",
+    # Association count runs past the end of the box
+    b"\x00\x00\x00\x00" + struct.pack(">IHB", 1, 1, 9) + b"\x01",
+    # Entry count itself is cut short
+    b"\x00\x00\x00\x00\x00\x00",
+], ids=["entry-count", "association-count", "short-header"])
+def test_malformed_heif_ipma_raises_probe_error(ipma):
+    with pytest.raises(ProbeError) as excinfo:
+        probe_bytes(heif(ipma))
+    assert not isinstance(excinfo.value, TruncatedHeaderError)
+
+
+def test_malformed_heif_pitm_raises_probe_error():
+    with pytest.raises(ProbeError):
+        probe_bytes(heif(VALID_IPMA, pitm=b"\x00\x00\x00\x00\x00"))
+
+
+def test_heif_prefix_that_cuts_the_meta_box_is_truncated():
+    data = heif(VALID_IPMA)
+    with pytest.raises(TruncatedHeaderError):
+        probe_bytes(data[:len(data) - 90])
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG", "TIFF"])
+def test_truncated_headers_raise_truncated_header_error(fmt):
+    data = encoded(fmt, dpi=(300, 300))
+    assert (probe_bytes(data).width, probe_bytes(data).height) == (120, 80)
+    with pytest.raises(TruncatedHeaderError):
+        probe_bytes(data[:20])
+
+
+def test_unrecognized_data_raises_probe_error():
+    with pytest.raises(ProbeError):
+        probe_bytes(b"GIF89a" + b"\x00" * 32)
+
+
+def test_resolution_check_uses_the_displayed_orientation(tmp_path):
+    exif = Image.Exif()
+    exif[274] = 6  # rotated 90 degrees clockwise
+    path = tmp_path / "portrait.jpg"
+    path.write_bytes(encoded("JPEG", dpi=(300, 300), exif=exif.tobytes()))
+
+    assert probe_image(path).display_size == (80, 120)
+    result = check_resolution(path)
+    assert (result["width_px"], result["height_px"]) == (80, 120)
+    assert result["orientation"] == 6
@@ -0,0 +1,123 @@
+"""Tests for streaming upload ingestion (services/ingest.py)."""
+
+import hashlib
+import io
+import struct
+import zlib
+
+import pytest
+from PIL import Image
+
+from services.ingest import (
+    MAX_IMAGE_PIXELS, PROBE_START_BYTES, IngestingFile, MultipartIngestor, UploadRejected, commit_ingested,
+)
+from storage import Database, UploadStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadStore(tmp_path / "uploads", db=Database(tmp_path / "uploads.sqlite3"))
+
+
+def png_header(width, height):
+    """A PNG signature and IHDR chunk claiming ``width`` x ``height`` pixels."""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr
+            + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr)))
+
+
+def jpeg_bytes(width=300, height=200):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, "JPEG", dpi=(300, 300))
+    return buffer.getvalue()
+
+
+def stream(store, name, max_bytes=10 * 1024 * 1024):
+    return IngestingFile(str(store.tmp_dir), name, max_bytes)
+
+
+def write_in_chunks(ingesting, data, chunk=4096):
+    for i in range(0, len(data), chunk):
+        ingesting.write(data[i:i + chunk])
+
+
+def temp_files(store):
+    return list(store.tmp_dir.iterdir())
+
+
+def test_accepted_upload_is_hashed_probed_and_committed(store):
+    data = jpeg_bytes()
+    ingesting = stream(store, "photo.JPG")
+    write_in_chunks(ingesting, data, chunk=100)
+
+    stored = commit_ingested(ingesting, store, "photo.JPG")
+    assert ingesting.format == "JPEG"
+    assert (ingesting.metadata.width, ingesting.metadata.height) == (300, 200)
+    assert stored.digest == hashlib.sha256(data).hexdigest()
+    assert store.resolve(stored.filename).read_bytes() == data
+    assert temp_files(store) == []
+
+
+def test_unsupported_format_is_rejected_from_the_first_bytes(store):
+    ingesting = stream(store, "animation.gif")
+    with pytest.raises(UploadRejected) as excinfo:
+        ingesting.write(b"GIF89a" + b"\x00" * 58)
+    assert excinfo.value.code == 415
+    assert temp_files(store) == []
+
+
+def test_oversize_upload_is_rejected_mid_stream(store):
+    ingesting = stream(store, "huge.jpg", max_bytes=8192)
+    data = jpeg_bytes(1200, 1200)
+    with pytest.raises(UploadRejected) as excinfo:
+        write_in_chunks(ingesting, data)
+    assert excinfo.value.code == 413
+    assert ingesting.size <= 8192 + 4096
+    assert temp_files(store) == []
+
+
+def test_decompression_bomb_is_rejected_at_the_first_probe(store):
+    ingesting = stream(store, "bomb.png")
+    header = png_header(20000, 20000)
+    assert 20000 * 20000 > MAX_IMAGE_PIXELS
+    ingesting.write(header + b"\x00" * 64)
+    with pytest.raises(UploadRejected) as excinfo:
+        ingesting.write(b"\x00" * PROBE_START_BYTES)
+    assert excinfo.value.code == 413
+    assert "pixel safety limit" in excinfo.value.description
+    assert temp_files(store) == []
+
+
+def test_headers_that_are_not_in_the_prefix_are_probed_when_complete(store):
+    # A JPEG whose frame header sits behind a large comment segment
+    data = jpeg_bytes()
+    comment = b"\xff\xfe" + struct.pack(">H", 65000) + b"x" * 64998
+    data = data[:2] + comment * 3 + data[2:]
+    ingesting = stream(store, "commented.jpg")
+    write_in_chunks(ingesting, data, chunk=16384)
+    assert ingesting.metadata is None
+
+    ingesting.finish()
+    assert (ingesting.metadata.width, ingesting.metadata.height) == (300, 200)
+    ingesting.close()
+
+
+def test_multipart_ingestor_streams_only_the_file_part(store):
+    data = jpeg_bytes()
+    body = (
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"file\"; filename=\"photo.jpg\"\r\n"
+        b"Content-Type: image/jpeg\r\n\r\n" + data + b"\r\n--XyZ--\r\n"
+    )
+    ingestor = MultipartIngestor("multipart/form-data; boundary=XyZ", str(store.tmp_dir), 10 * 1024 * 1024)
+    for i in range(0, len(body), 1000):
+        ingestor.write(body[i:i + 1000])
+
+    assert ingestor.file.filename == "photo.jpg"
+    assert commit_ingested(ingestor.file, store, "photo.jpg").size == len(data)
+
+
+def test_multipart_ingestor_requires_a_multipart_body(store):
+    with pytest.raises(UploadRejected) as excinfo:
+        MultipartIngestor("application/json", str(store.tmp_dir), 1024)
+    assert excinfo.value.code == 400
@@ -0,0 +1,120 @@
+"""Tests for the shared inventory store (storage/inventory_store.py) and the reservation tools."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from storage import Database, InsufficientStock, InventoryError, InventoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore(Database(tmp_path / "inventory.sqlite3"))
+    store.seed({"100lb Matte": {"available": True, "quantity": 100},
+                "80lb Glossy": {"available": False, "quantity": 50}})
+    return store
+
+
+def test_seed_keeps_existing_levels(store):
+    reservation = store.reserve("100lb Matte", 10)
+    store.commit(reservation.id)
+    store.seed({"100lb Matte": {"available": True, "quantity": 100}})
+    assert store.level("100lb Matte").on_hand == 90
+
+
+def test_reserve_commit_release(store):
+    first = store.reserve("100lb Matte", 30)
+    second = store.reserve("100lb Matte", 20)
+    level = store.level("100lb Matte")
+    assert (level.on_hand, level.reserved, level.free) == (100, 50, 50)
+
+    store.commit(first.id)
+    assert store.release(second.id) is True
+    level = store.level("100lb Matte")
+    assert (level.on_hand, level.reserved, level.free) == (70, 0, 70)
+
+    # Settled reservations can't be settled again
+    assert store.release(first.id) is False
+    with pytest.raises(InventoryError):
+        store.commit(second.id)
+
+
+def test_reserve_rejects_short_unknown_and_out_of_stock(store):
+    with pytest.raises(InsufficientStock) as excinfo:
+        store.reserve("100lb Matte", 101)
+    assert excinfo.value.level.free == 100
+    with pytest.raises(InsufficientStock):
+        store.reserve("80lb Glossy", 1)
+    with pytest.raises(InsufficientStock):
+        store.reserve("Vellum", 1)
+    with pytest.raises(InventoryError):
+        store.reserve("100lb Matte", 0)
+
+
+def test_expired_reservations_return_to_stock(store):
+    store.reserve("100lb Matte", 40, ttl=-1)
+    assert store.level("100lb Matte").reserved == 40
+    assert store.expire() == 1
+    assert store.level("100lb Matte").free == 100
+
+
+def test_concurrent_reservations_never_oversell(store):
+    barrier = threading.Barrier(16)
+
+    def take(_):
+        barrier.wait()
+        taken = 0
+        for _ in range(10):
+            try:
+                store.reserve("100lb Matte", 1)
+                taken += 1
+            except InsufficientStock:
+                pass
+        return taken
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        taken = sum(executor.map(take, range(16)))
+
+    assert taken == 100
+    level = store.level("100lb Matte")
+    assert (level.reserved, level.free) == (100, 0)
+
+
+def test_levels_cache_sees_writes_from_another_store(tmp_path, store):
+    # A second store on the same file stands in for another worker process
+    other = InventoryStore(Database(store.db.path))
+    assert other.level("100lb Matte").free == 100
+    store.reserve("100lb Matte", 25)
+    assert other.level("100lb Matte").free == 75
+
+
+def test_reservation_tools(monkeypatch, store):
+    from tools import inventory_tool
+
+    monkeypatch.setattr(inventory_tool, "get_inventory_store", lambda initial_stock=None: store)
+
+    reservation = inventory_tool.reserve_inventory("100lb matte", 60)
+    assert reservation["reserved"] is True
+    assert reservation["paper"] == "100lb Matte"
+    assert inventory_tool.check_stock("100lb Matte", 50)["available"] is False
+
+    refused = inventory_tool.reserve_inventory("100lb Matte", 60)
+    assert refused["reserved"] is False
+    assert "Only 40 sheets" in refused["message"]
+    assert inventory_tool.reserve_inventory("Vellum", 1)["reserved"] is False
+
+    assert inventory_tool.commit_inventory(reservation["reservation_id"]) is True
+    assert inventory_tool.commit_inventory(reservation["reservation_id"]) is False
+    assert inventory_tool.check_stock("100lb Matte", 40)["quantity_available"] == 40
+    assert inventory_tool.release_inventory(reservation["reservation_id"]) is False
+
+
+def test_reservation_tools_without_a_store(monkeypatch):
+    from tools import inventory_tool
+
+    monkeypatch.setattr(inventory_tool, "get_inventory_store", lambda initial_stock=None: None)
+
+    assert inventory_tool.reserve_inventory("100lb Matte", 1)["reserved"] is False
+    assert inventory_tool.commit_inventory("missing") is False
+    assert inventory_tool.release_inventory("missing") is False
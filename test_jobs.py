@@ -0,0 +1,102 @@
+"""Tests for the background job queue (services/jobs.py)."""
+
+import threading
+
+import pytest
+
+from services.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobQueueFull
+from storage import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(tmp_path / "jobs.sqlite3")
+
+
+def test_job_runs_to_done_with_its_result(db):
+    queue = JobQueue(max_workers=1, db=db)
+    started, proceed = threading.Event(), threading.Event()
+
+    def work(progress, width, height):
+        progress(0.5, "Measuring")
+        started.set()
+        proceed.wait(5)
+        return {"pixels": width * height}
+
+    job = queue.submit("measure", work, 30, 20)
+    assert job.status == QUEUED
+
+    started.wait(5)
+    running = queue.get(job.id)
+    assert (running.status, running.progress, running.message) == (RUNNING, 0.5, "Measuring")
+    assert not running.finished
+
+    proceed.set()
+    done = queue.wait(job.id, 5)
+    assert done.status == DONE and done.finished
+    assert done.progress == 1.0
+    assert done.result == {"pixels": 600}
+    assert done.to_dict()["kind"] == "measure"
+
+
+def test_failed_job_records_the_error(db):
+    queue = JobQueue(max_workers=1, db=db)
+
+    def work(progress):
+        raise ValueError("Cannot open image")
+
+    failed = queue.wait(queue.submit("measure", work).id, 5)
+    assert failed.status == FAILED
+    assert failed.error == "Cannot open image"
+    assert failed.result is None
+
+
+def test_progress_is_clamped(db):
+    queue = JobQueue(max_workers=1, db=db)
+    submitted = threading.Event()
+    seen = []
+
+    def work(progress):
+        submitted.wait(5)  # job_id is bound once submit returns
+        progress(7.0, "Overshoot")
+        seen.append(queue.get(job_id).progress)
+
+    job_id = queue.submit("measure", work).id
+    submitted.set()
+    queue.wait(job_id, 5)
+    assert seen == [1.0]
+
+
+def test_full_queue_sheds_load_and_frees_slots(db):
+    queue = JobQueue(max_workers=1, max_pending=1, db=db)
+    proceed = threading.Event()
+
+    first = queue.submit("slow", lambda progress: proceed.wait(5))
+    second = queue.submit("slow", lambda progress: proceed.wait(5))
+    with pytest.raises(JobQueueFull):
+        queue.submit("slow", lambda progress: None)
+
+    proceed.set()
+    queue.wait(first.id, 5)
+    queue.wait(second.id, 5)
+    third = queue.submit("fast", lambda progress: "ok")
+    assert queue.wait(third.id, 5).result == "ok"
+
+
+def test_status_is_visible_to_another_queue_on_the_same_database(db):
+    job = JobQueue(max_workers=1, db=db)
+    job_id = job.submit("measure", lambda progress: [1, 2]).id
+    job.wait(job_id, 5)
+
+    other = JobQueue(max_workers=1, db=db)
+    assert other.get(job_id).result == [1, 2]
+    assert other.get("unknown") is None
+
+
+def test_finished_jobs_expire_after_retention(db):
+    queue = JobQueue(max_workers=1, db=db, retention_seconds=0)
+    finished = queue.submit("measure", lambda progress: 1).id
+    queue.wait(finished, 5)
+
+    queue.wait(queue.submit("measure", lambda progress: 2).id, 5)
+    assert queue.get(finished) is None
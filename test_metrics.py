@@ -0,0 +1,77 @@
+"""Tests for the Prometheus metrics (metrics.py) and the instrumentation hooks they observe."""
+
+import pytest
+
+import app as app_module
+import instrumentation
+from instrumentation import CACHE_HIT, CACHE_MISS, LAYER, REJECTION, record_event, timed
+from metrics import (
+    CACHE_REQUESTS, CONTENT_TYPE, LAYER_LATENCY, REJECTIONS, Counter, Histogram, Registry, render_metrics,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("layer",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, ("preflight",))
+    registry = Registry()
+    registry.register(histogram)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{layer="preflight",le="0.1"} 1',
+        'latency_seconds_bucket{layer="preflight",le="1"} 3',
+        'latency_seconds_bucket{layer="preflight",le="+Inf"} 4',
+        'latency_seconds_sum{layer="preflight"} 6.05',
+        'latency_seconds_count{layer="preflight"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("files_total", "Files", ("name",))
+    counter.inc(('say "hi"\n',))
+    assert list(counter.samples()) == ['files_total{name="say \\"hi\\"\\n"} 1']
+
+
+def test_timings_skip_the_clock_without_observers(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_observers", ())
+    with timed(LAYER, "spec_check") as block:
+        pass
+    assert block._started is None
+
+
+def test_layer_timings_events_and_hit_ratio_reach_the_registry():
+    # Importing app enables metrics for this process
+    assert app_module.app is not None
+    rejections = REJECTIONS.value(("test_layer",))
+    with timed(LAYER, "test_layer"):
+        pass
+    record_event(REJECTION, "test_layer")
+    record_event(CACHE_HIT, "test_cache")
+    record_event(CACHE_HIT, "test_cache")
+    record_event(CACHE_MISS, "test_cache")
+    record_event(CACHE_MISS, "test_cache")
+
+    text = render_metrics()
+    assert 'printshop_layer_duration_seconds_count{layer="test_layer"} 1' in text
+    assert REJECTIONS.value(("test_layer",)) == rejections + 1
+    assert CACHE_REQUESTS.value(("test_cache", "hit")) == 2
+    assert 'printshop_cache_hit_ratio{cache="test_cache"} 0.5' in text
+
+
+@pytest.fixture
+def client():
+    app_module.app.config["TESTING"] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+def test_metrics_endpoint_counts_requests(client):
+    client.get("/quote-grid")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert 'printshop_http_requests_total{endpoint="quote_grid",method="GET",status="200"}' in text
+    assert "printshop_http_requests_in_flight 1" in text
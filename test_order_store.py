@@ -0,0 +1,120 @@
+"""Tests for the batched order store (storage/order_store.py)."""
+
+import hashlib
+import logging
+import sqlite3
+
+import pytest
+
+from storage import Database, OrderStore
+from storage import order_store as order_store_module
+
+DIGEST = "cd" * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OrderStore(Database(tmp_path / "orders.sqlite3"))
+
+
+def result(paper="100lb Matte", quantity=10, price="$6.50"):
+    return {
+        "valid": True,
+        "order_summary": {"paper": paper, "size": "8x10", "quantity": quantity, "price": price},
+        "reasoning": ["All guardrails passed"],
+        "tool_calls": [{"tool": "calculate_price", "output": {"formatted_price": price}}],
+    }
+
+
+def order(email="Customer@Example.com", file_path=f"/uploads/{DIGEST}.jpg"):
+    return {"email": email, "name": "Customer", "filename": f"{DIGEST}.jpg", "file_path": file_path}
+
+
+def test_recorded_order_is_readable_before_and_after_the_write(store):
+    order_id = store.record(order(), result(), reservation_id="r1")
+    queued = store.get(order_id)
+    assert queued.status == "accepted"
+    assert queued.email == "customer@example.com"
+
+    store.flush()
+    stored = store.get(order_id)
+    assert stored == queued
+    assert stored.file_digest == DIGEST
+    assert (stored.paper, stored.quantity, stored.price) == ("100lb Matte", 10, "$6.50")
+    assert stored.tool_calls[0]["tool"] == "calculate_price"
+    assert "tool_calls" not in stored.guardrail_results
+    assert store._pending == {}
+
+
+def test_list_queries_page_newest_first(store):
+    ids = [store.record(order(), result(quantity=n)) for n in range(1, 6)]
+    other = store.record(order(email="someone@else.com", file_path=""), result())
+    store.flush()
+
+    page = store.by_email(" CUSTOMER@example.com ", limit=3)
+    assert [o.id for o in page] == ids[:1:-1]
+    page = store.by_email("customer@example.com", limit=3, before=page[-1].created_at)
+    assert [o.id for o in page] == ids[1::-1]
+
+    assert [o.id for o in store.recent(limit=1)] == [other]
+    assert len(store.by_file_digest(DIGEST)) == 5
+    assert store.count_by_status() == {"accepted": 6}
+
+
+def test_set_status(store):
+    order_id = store.record(order(), result())
+    store.set_status(order_id, "printing")
+    assert store.get(order_id).status == "printing"
+    store.flush()
+    assert store.get(order_id).status == "printing"
+    assert [o.id for o in store.by_status("printing")] == [order_id]
+
+
+def test_artwork_without_a_digest_name_is_hashed_on_the_writer(store, tmp_path):
+    path = tmp_path / "artwork.jpg"
+    path.write_bytes(b"pixels")
+    order_id = store.record(order(file_path=str(path)), result())
+    store.flush()
+    assert store.get(order_id).file_digest == hashlib.sha256(b"pixels").hexdigest()
+
+
+def failing_hash(monkeypatch, failures):
+    """Make the next ``failures`` writes fail as if the database stayed locked."""
+    attempts = []
+
+    def sha256_file(path):
+        attempts.append(path)
+        if len(attempts) <= failures:
+            raise sqlite3.OperationalError("database is locked")
+        return "ef" * 32
+
+    monkeypatch.setattr(order_store_module, "sha256_file", sha256_file)
+    return attempts
+
+
+def test_failed_writes_are_retried(store, tmp_path, monkeypatch):
+    attempts = failing_hash(monkeypatch, order_store_module.MAX_WRITE_ATTEMPTS - 1)
+    path = tmp_path / "artwork.jpg"
+    path.write_bytes(b"pixels")
+
+    order_id = store.record(order(file_path=str(path)), result())
+    store.flush(timeout=5)
+    assert len(attempts) == order_store_module.MAX_WRITE_ATTEMPTS
+    assert store._pending == {}
+    assert store.get(order_id).file_digest == "ef" * 32
+    assert [o.id for o in store.recent()] == [order_id]
+
+
+def test_order_is_logged_when_every_attempt_fails(store, tmp_path, monkeypatch, caplog):
+    failing_hash(monkeypatch, order_store_module.MAX_WRITE_ATTEMPTS)
+    path = tmp_path / "artwork.jpg"
+    path.write_bytes(b"pixels")
+
+    with caplog.at_level(logging.ERROR, logger=order_store_module.__name__):
+        order_id = store.record(order(file_path=str(path)), result())
+        store.flush(timeout=5)
+
+    assert store.get(order_id) is None
+    assert store._pending == {}
+    assert order_id in caplog.text
+    assert f"after {order_store_module.MAX_WRITE_ATTEMPTS} attempts" in caplog.text
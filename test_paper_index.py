@@ -0,0 +1,69 @@
+"""Tests for paper-name resolution (tools/paper_index.py)."""
+
+import pytest
+
+from tools import paper_index as paper_index_module
+from tools.paper_index import PaperIndex, get_paper_index, paper_key, paper_tokens
+from tools.inventory_tool import check_stock
+from tools.pricing_tool import quote_price
+from tools.shop_capabilities import PAPER_INDEX
+
+ORDER_FORM_PAPERS = ["80lb Glossy", "100lb Matte", "110lb Cardstock", "65lb Text", "80lb Text"]
+
+
+@pytest.mark.parametrize("spelling", ["110lb Cardstock", "110 lb card stock", "110# CARDSTOCK", "110 pounds cover"])
+def test_spellings_share_one_key(spelling):
+    assert paper_key(spelling) == "110lb cardstock"
+
+
+def test_tokens_drop_filler_and_normalize_weights():
+    assert paper_tokens("14 pt Silk paper") == {"14pt", "satin"}
+    assert paper_tokens("80lbs glossy_sheet") == {"80lb", "gloss"}
+
+
+@pytest.mark.parametrize("spelling, expected", [
+    ("100lb Matte", "100lb Matte"),
+    ("100 lb matt", "100lb Matte"),
+    ("80 lb glossy", "80lb Glossy"),
+    ("matte", "100lb Matte"),  # partial name
+    ("cardstock", "110lb Cardstock"),
+    ("80lb", "80lb Glossy"),  # ties go to the earlier name
+    ("100lb_cardstock", "110lb Cardstock"),  # alias from the config vocabulary
+    ("65lb Glossy", None),  # weights must agree
+    ("vellum", None),
+    ("", None),
+    (None, None),
+])
+def test_order_form_resolution(spelling, expected):
+    assert PaperIndex(ORDER_FORM_PAPERS).resolve(spelling) == expected
+
+
+def test_exact_resolution_skips_partial_names():
+    index = PaperIndex(ORDER_FORM_PAPERS)
+    assert index.resolve_exact("100 LB MATTE") == "100lb Matte"
+    assert index.resolve_exact("matte") is None
+    assert "110# card" in index
+    assert "silk" not in index
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(paper_index_module, "MAX_MEMO_ENTRIES", 3)
+    index = PaperIndex(ORDER_FORM_PAPERS)
+    for spelling in ("matte", "Matte", "MATTE", "matt"):
+        assert index.resolve(spelling) == "100lb Matte"
+    assert len(index._memo) <= 3
+
+
+def test_shop_indexes_cover_both_vocabularies():
+    assert PAPER_INDEX.resolve("110 lb card stock") == "110lb Cardstock"
+    config_index = get_paper_index()
+    assert config_index is get_paper_index()
+    assert config_index.resolve("110lb Cardstock") == "100lb_cardstock"
+    assert config_index.resolve("14 pt card") == "14pt_cardstock"
+    assert config_index.resolve("80lb Text") == "80lb_text"
+
+
+def test_tools_accept_any_spelling():
+    assert check_stock("100 lb matt")["paper"] == "100lb Matte"
+    assert quote_price("8x10", "100 lb matt")["paper_premium"] == quote_price("8x10", "100lb Matte")["paper_premium"]
+    assert check_stock("vellum")["available"] is False
@@ -0,0 +1,35 @@
+"""Tests for the synthetic-order benchmark (perf_benchmark.py)."""
+
+import perf_benchmark
+from perf_benchmark import STACKS, format_report, run_benchmark
+
+
+def small_benchmark(**overrides):
+    options = dict(orders=8, formats=("jpeg", "png"), megapixels=(0.2,), warmup=0)
+    options.update(overrides)
+    return run_benchmark(**options)
+
+
+def test_default_stacks_run():
+    report = small_benchmark()
+
+    assert set(report["stacks"]) == set(STACKS)
+    for stack in STACKS:
+        result = report["stacks"][stack]
+        assert result["orders"] == 8
+        assert sum(result["outcomes"].values()) == 8
+        assert not any(outcome.startswith("error:") for outcome in result["outcomes"]), result["outcomes"]
+    assert "spec_check" in report["stacks"]["printshop"]["layers"]
+
+
+def test_stack_that_fails_to_load_is_skipped(monkeypatch, capsys):
+    def broken():
+        raise ImportError("cannot import name 'Agent'")
+
+    monkeypatch.setitem(perf_benchmark.RUNNERS, "react", broken)
+    report = small_benchmark()
+
+    assert report["stacks"]["react"] == {"skipped": "ImportError: cannot import name 'Agent'"}
+    assert report["stacks"]["printshop"]["orders"] == 8
+    assert "Skipping stack 'react'" in capsys.readouterr().err
+    assert "[react] skipped: ImportError" in format_report(report)
@@ -0,0 +1,143 @@
+"""Tests for the compiled pricing engine and quote grid (tools/pricing_tool.py)."""
+
+import json
+
+import pytest
+
+from tools import pricing_tool
+from tools.config_store import ConfigStore
+from tools.pricing_tool import (
+    RATE_SCALE, RETAIL_PRICING, _parse_break, build_quote_grid, calculate_price, calculate_prices_batch,
+    compile_pricing, get_quote_grid, quote_price,
+)
+
+PRICING = {
+    "base_prices": {
+        "100lb_cardstock": {"per_sheet": 0.85, "setup_fee": 25.00, "color_surcharge": 0.15},
+        "80lb_text": {"per_sheet": 0.05, "setup_fee": 0.0, "color_surcharge": 0.0},
+    },
+    "quantity_breaks": {"100-499": 0.90, "0-99": 1.0, "1000+": 0.70},
+    "rush_surcharge": {"rush": 1.25, "express": 1.50},
+}
+
+
+@pytest.fixture
+def pricing(tmp_path, monkeypatch):
+    """Serve PRICING as pricing.json."""
+    (tmp_path / "pricing.json").write_text(json.dumps(PRICING))
+    monkeypatch.setattr(pricing_tool, "CONFIG_STORE", ConfigStore(tmp_path))
+    monkeypatch.setattr(pricing_tool, "_compiled", None)
+    return PRICING
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("0-99", (0, 99)),
+    (" 100-499 ", (100, 499)),
+    ("5000+", (5000, pricing_tool._OPEN_RANGE_END)),
+])
+def test_parse_break(label, expected):
+    assert _parse_break(label) == expected
+
+
+def test_compile_pricing_uses_exact_cents_and_sorted_breaks():
+    compiled = compile_pricing(PRICING, "abc")
+    stock = compiled.stock_index["100lb_cardstock"]
+    assert compiled.per_sheet_cents[stock] == 85
+    assert compiled.color_surcharge_cents[stock] == 15
+    assert compiled.setup_fee_cents[stock] == 2500
+    assert compiled.break_labels == ("0-99", "100-499", "1000+")
+    assert compiled.break_rates == (RATE_SCALE, 9000, 7000)
+    assert compiled.rush_rates == {"rush": 12500, "express": 15000}
+
+
+def test_calculate_price(pricing):
+    result = calculate_price("100lb_cardstock", 100, 8.5, 11)
+    # (85 + 15) cents x 0.9 x 100 sheets + $25 setup
+    assert result["total_cents"] == 11500
+    assert result["formatted_price"] == "$115.00"
+    assert result["per_sheet_cost"] == 0.9
+    assert result["quantity_discount"] == "10%"
+
+    express = calculate_price("100lb_cardstock", 100, 8.5, 11, full_color=False, rush_type="express")
+    # (85 x 0.9 x 100 + 2500) x 1.5
+    assert express["total_cents"] == 15225
+
+
+def test_half_cents_round_up(pricing):
+    # 5 cents x 0.9 = 4.5 cents, which binary floats would round down
+    result = calculate_price("80lb_text", 100, 4, 6)
+    assert result["total_cents"] == 450
+    assert result["price_per_unit"] == 0.05
+    assert calculate_price("80lb_text", 101, 4, 6)["total_cents"] == 455
+
+
+def test_quantity_outside_every_break_is_not_discounted(pricing):
+    assert calculate_price("80lb_text", 500, 4, 6)["quantity_discount"] == "0%"
+    assert calculate_price("80lb_text", 1000, 4, 6)["quantity_discount"] == "30%"
+
+
+def test_unknown_stock_is_an_error(pricing):
+    result = calculate_price("silk_paper", 10, 4, 6)
+    assert "error" in result
+    assert result["available_stocks"] == ["100lb_cardstock", "80lb_text"]
+
+
+def test_batch_matches_scalar_prices(pricing):
+    stocks = ["100lb_cardstock", "80lb_text", "silk_paper", "100lb_cardstock", "80lb_text"]
+    quantities = [100, 101, 10, 2500, 1]
+    colors = [True, False, True, False, True]
+    rush = [None, "rush", None, "express", ""]
+    batch = calculate_prices_batch(stocks, quantities, colors, rush)
+
+    assert batch["valid"].tolist() == [True, True, False, True, True]
+    for i, stock in enumerate(stocks):
+        if not batch["valid"][i]:
+            assert batch["total_cents"][i] == 0
+            continue
+        scalar = calculate_price(stock, quantities[i], 4, 6, colors[i], rush[i] or None)
+        assert batch["total_cents"][i] == scalar["total_cents"]
+        assert batch["price_per_unit"][i] == scalar["price_per_unit"]
+
+
+
+@pytest.mark.parametrize("quantity", [1, 10, 11, 37, 50, 51, 99, 100, 101, 250])
+def test_quote_grid_reproduces_quote_price(quantity):
+    grid = build_quote_grid()
+    quantity_break = next(
+        b for b in grid["quantity_breaks"] if b["min"] <= quantity and (b["max"] is None or quantity <= b["max"])
+    )
+    for size in grid["sizes"]:
+        for paper in grid["papers"]:
+            cell = grid["prices"][size][paper][quantity_break["label"]]
+            assert f"${cell * quantity:.2f}" == quote_price(size, paper, quantity)["formatted_price"]
+
+
+def test_quote_grid_axes():
+    grid = build_quote_grid()
+    assert grid["sizes"] == list(RETAIL_PRICING["size_multipliers"])
+    assert grid["papers"] == list(RETAIL_PRICING["paper_premiums"])
+    assert grid["quantity_breaks"][0] == {"label": "1-10", "min": 1, "max": 10, "discount_rate": 0.0}
+    assert grid["quantity_breaks"][-1] == {"label": "101+", "min": 101, "max": None, "discount_rate": 0.15}
+    # 8x10 on 100lb Matte: $0.65 a copy
+    assert grid["prices"]["8x10"]["100lb Matte"]["1-10"] == pytest.approx(0.65)
+
+
+def test_quote_grid_rush_comes_from_the_pricing_config(pricing):
+    assert build_quote_grid()["rush_multipliers"] == {"standard": 1.0, "rush": 1.25, "express": 1.5}
+
+
+def test_quote_grid_etag_follows_the_price_tables(pricing, tmp_path, monkeypatch):
+    etag, body = get_quote_grid()
+    assert get_quote_grid() == (etag, body)
+
+    changed = dict(PRICING, rush_surcharge={"rush": 1.30, "express": 1.50})
+    (tmp_path / "pricing.json").write_text(json.dumps(changed))
+    pricing_tool.CONFIG_STORE.invalidate()
+    rush_etag, rush_body = get_quote_grid()
+    assert rush_etag != etag
+    assert json.loads(rush_body)["rush_multipliers"]["rush"] == 1.3
+
+    monkeypatch.setitem(RETAIL_PRICING["size_multipliers"], "8x10", 1.1)
+    retail_etag, retail_body = get_quote_grid()
+    assert retail_etag not in (etag, rush_etag)
+    assert json.loads(retail_body)["prices"]["8x10"]["100lb Matte"]["1-10"] == pytest.approx(0.715)
@@ -0,0 +1,133 @@
+"""Tests for PrintShopAgent's guardrail pipeline: one rejection per stage, cheapest stages first."""
+
+import pytest
+from PIL import Image
+
+from agent import OrderContext, PrintShopAgent
+from agent import printshop_agent
+
+
+@pytest.fixture
+def artwork(tmp_path):
+    """Write a JPEG of the given pixel size and return its path."""
+    def make(width_px, height_px, name="artwork.jpg"):
+        path = tmp_path / name
+        Image.new("RGB", (width_px, height_px), color="white").save(path, "JPEG")
+        return str(path)
+    return make
+
+
+@pytest.fixture
+def measured(monkeypatch):
+    """Record the files the preflight stage measures."""
+    calls = []
+    real = printshop_agent.measure_artwork
+
+    def spy(file_path):
+        calls.append(file_path)
+        return real(file_path)
+
+    monkeypatch.setattr(printshop_agent, "measure_artwork", spy)
+    return calls
+
+
+def order(file_path, **overrides):
+    data = {
+        "email": "customer@example.com",
+        "size": "8,10",
+        "paper": "100lb Matte",
+        "quantity": 10,
+        "file_path": file_path,
+        "filename": "artwork.jpg",
+    }
+    data.update(overrides)
+    return data
+
+
+def tools_called(context):
+    return [call["tool"] for call in context.tool_calls]
+
+
+def test_stages_run_cheapest_first():
+    names = [stage["name"] for stage in PrintShopAgent().pipeline.describe()]
+    assert names == ["spec_check", "inventory", "quote", "output_guardrail", "file_present", "preflight"]
+
+
+def test_valid_order_passes_every_stage(artwork, measured):
+    context = OrderContext()
+    result = PrintShopAgent().process_order(order(artwork(2400, 3000)), context)
+
+    assert result["valid"] is True
+    assert result["order_summary"]["paper"] == "100lb Matte"
+    assert result["order_summary"]["file_quality"]["quality"] == "high"
+    assert result["order_summary"]["price"] == "$6.50"
+    assert tools_called(context) == ["check_inventory", "calculate_price", "check_resolution"]
+    assert len(measured) == 1
+
+
+def test_spec_check_rejects_before_any_tool(artwork, measured):
+    context = OrderContext()
+    result = PrintShopAgent().process_order(
+        order(artwork(2400, 3000), paper="Black cardstock with white ink"), context
+    )
+
+    assert result["valid"] is False
+    assert result["layer"] == "spec_check"
+    assert tools_called(context) == []
+    assert measured == []
+
+
+def test_inventory_rejects_before_quote_and_file(artwork, measured):
+    context = OrderContext()
+    result = PrintShopAgent().process_order(order(artwork(2400, 3000), quantity=10_000_000), context)
+
+    assert result["valid"] is False
+    assert result["layer"] == "inventory"
+    assert "available" in result["error"]
+    assert tools_called(context) == ["check_inventory"]
+    assert measured == []
+
+
+def test_output_guardrail_rejects_unquoted_price(artwork, measured, monkeypatch):
+    # A quote stage that "knows" the price without calling the pricing tool
+    def hallucinated_quote(self, state):
+        state.price = {"formatted_price": "$1.00"}
+
+    monkeypatch.setattr(PrintShopAgent, "_quote", hallucinated_quote)
+    context = OrderContext()
+    result = PrintShopAgent().process_order(order(artwork(2400, 3000)), context)
+
+    assert result["valid"] is False
+    assert result["layer"] == "output_guardrail"
+    assert "HALLUCINATION" in result["error"]
+    assert measured == []
+
+
+def test_missing_file_rejected_without_decoding(tmp_path, measured):
+    context = OrderContext()
+    result = PrintShopAgent().process_order(order(str(tmp_path / "missing.jpg")), context)
+
+    assert result["valid"] is False
+    assert result["layer"] == "preflight"
+    assert result["error"].startswith("File not found")
+    assert tools_called(context) == ["check_inventory", "calculate_price"]
+    assert measured == []
+
+
+def test_preflight_rejects_low_resolution(artwork, measured):
+    context = OrderContext()
+    result = PrintShopAgent().process_order(order(artwork(800, 1000)), context)
+
+    assert result["valid"] is False
+    assert result["layer"] == "preflight"
+    assert result["dpi"] == 100.0
+    assert tools_called(context) == ["check_inventory", "calculate_price", "check_resolution"]
+    assert len(measured) == 1
+
+
+def test_invalid_size_rejected_before_pipeline(artwork, measured):
+    result = PrintShopAgent().process_order(order(artwork(2400, 3000), size="large"))
+
+    assert result["valid"] is False
+    assert "Invalid size format" in result["error"]
+    assert measured == []
@@ -0,0 +1,50 @@
+"""Tests for the warm process pool (process_pool.py)."""
+
+import os
+
+import pytest
+
+import process_pool
+from process_pool import WarmProcessPool, get_process_pool, run_cpu_bound
+
+
+def worker_info(value):
+    return os.getpid(), process_pool._IN_WORKER, value * 2
+
+
+def dies_in_worker():
+    if process_pool._IN_WORKER:
+        os._exit(1)
+    return "inline"
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WarmProcessPool(1)
+    pool.warm()
+    yield pool
+    pool.shutdown()
+
+
+def test_calls_run_in_a_warmed_worker(pool):
+    pid, in_worker, result = pool.run(worker_info, 21)
+    assert pid != os.getpid()
+    assert in_worker is True
+    assert result == 42
+
+
+def test_broken_pool_falls_back_inline_and_is_rebuilt(pool):
+    assert pool.run(dies_in_worker) == "inline"
+    assert pool.run(worker_info, 1)[0] != os.getpid()
+
+
+def test_process_mode_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(process_pool, "PROCESS_WORKERS", 0)
+    assert get_process_pool() is None
+    assert run_cpu_bound(worker_info, 2) == (os.getpid(), False, 4)
+
+
+def test_no_nested_pools_inside_a_worker(monkeypatch):
+    monkeypatch.setattr(process_pool, "PROCESS_WORKERS", 2)
+    monkeypatch.setattr(process_pool, "_IN_WORKER", True)
+    assert get_process_pool() is None
@@ -0,0 +1,63 @@
+"""Tests for the on-demand request profiling hook (profiling.py)."""
+
+import time
+
+from flask import Flask
+
+from profiling import PROFILE_HEADER, PROFILE_ID_HEADER, ProfilingPolicy, install_flask_profiling
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_app(policy, output_dir):
+    app = Flask(__name__)
+
+    @app.route("/work")
+    def work():
+        busy_wait(0.02)
+        return "done"
+
+    install_flask_profiling(app, policy, output_dir)
+    return app.test_client()
+
+
+def test_sampling_policy():
+    policy = ProfilingPolicy(every=3, admin_ips=())
+    assert [policy.wants("10.0.0.1", None) for _ in range(6)] == [False, False, True, False, False, True]
+
+    admin = ProfilingPolicy(every=0, admin_ips=["10.0.0.9"])
+    assert admin.wants("10.0.0.9", "1")
+    assert not admin.wants("10.0.0.5", "1")
+    assert not admin.wants("10.0.0.9", None)
+    assert not ProfilingPolicy(every=0, admin_ips=()).enabled
+
+
+def test_admin_header_writes_flamegraph_profile_and_summary(tmp_path):
+    client = make_app(ProfilingPolicy(every=0, admin_ips=["127.0.0.1"]), tmp_path)
+
+    plain = client.get("/work")
+    assert PROFILE_ID_HEADER not in plain.headers
+    assert list(tmp_path.iterdir()) == []
+
+    profiled = client.get("/work", headers={PROFILE_HEADER: "1"})
+    assert profiled.data == b"done"
+    profile_id = profiled.headers[PROFILE_ID_HEADER]
+    assert "-work-" in profile_id
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{profile_id}.collapsed", f"{profile_id}.prof", f"{profile_id}.txt"
+    ]
+    assert "busy_wait" in (tmp_path / f"{profile_id}.collapsed").read_text()
+    summary = (tmp_path / f"{profile_id}.txt").read_text()
+    assert summary.startswith("work\n")
+    assert "busy_wait" in summary
+
+
+def test_disabled_policy_installs_nothing(tmp_path):
+    client = make_app(ProfilingPolicy(every=0, admin_ips=()), tmp_path)
+    response = client.get("/work", headers={PROFILE_HEADER: "1"})
+    assert PROFILE_ID_HEADER not in response.headers
+    assert not tmp_path.exists() or list(tmp_path.iterdir()) == []
@@ -0,0 +1,121 @@
+"""Tests for the analysis result cache and the upload store (storage/)."""
+
+import io
+import os
+
+import pytest
+
+from storage import Database, ResultCache, UploadStore
+from storage import result_cache as result_cache_module
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(tmp_path / "cache.sqlite3")
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Record every file the cache hashes."""
+    calls = []
+    sha256_file = result_cache_module.sha256_file
+
+    def spy(path):
+        calls.append(os.path.basename(path))
+        return sha256_file(path)
+
+    monkeypatch.setattr(result_cache_module, "sha256_file", spy)
+    return calls
+
+
+def test_file_digest_hashes_only_when_the_file_changes(db, tmp_path, hashed):
+    cache = ResultCache(db)
+    path = tmp_path / "artwork.jpg"
+    path.write_bytes(b"first version")
+
+    first = cache.file_digest(path)
+    assert cache.file_digest(path) == first
+    assert hashed == ["artwork.jpg"]
+
+    path.write_bytes(b"second, longer version")
+    second = cache.file_digest(path)
+    assert second != first
+    assert hashed == ["artwork.jpg", "artwork.jpg"]
+
+
+def test_file_digest_memory_is_bounded(db, tmp_path, hashed):
+    cache = ResultCache(db, max_remembered_digests=2)
+    paths = []
+    for name in ("a.png", "b.png", "c.png"):
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        paths.append(path)
+        cache.file_digest(path)
+
+    assert len(cache._digests) == 2
+    cache.file_digest(paths[2])  # still remembered
+    cache.file_digest(paths[0])  # evicted, hashed again
+    assert hashed == ["a.png", "b.png", "c.png", "a.png"]
+
+
+def test_content_addressed_names_are_not_hashed(db, tmp_path, hashed):
+    digest = "ab" * 32
+    path = tmp_path / f"{digest}.jpg"
+    path.write_bytes(b"anything")
+    assert ResultCache(db).file_digest(path) == digest
+    assert hashed == []
+
+
+def test_cached_file_result_computes_once(db, tmp_path):
+    cache = ResultCache(db)
+    path = tmp_path / "artwork.jpg"
+    path.write_bytes(b"pixels")
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return {"width_px": 10}
+
+    assert cache.cached_file_result("measure", path, {"v": 1}, compute) == {"width_px": 10}
+    assert cache.cached_file_result("measure", path, {"v": 1}, compute) == {"width_px": 10}
+    assert len(computed) == 1
+
+    # Errors aren't cached; other parameters are a different entry
+    cache.cached_file_result("measure", path, {"v": 2}, lambda: {"error": "x"},
+                             should_cache=lambda value: "error" not in value)
+    assert cache.get("measure", cache.file_digest(path), {"v": 2}) is None
+
+
+def test_upload_store_resolves_only_stored_names(db, tmp_path):
+    store = UploadStore(tmp_path / "uploads", db)
+    stored = store.put_stream(io.BytesIO(b"customer artwork"), "artwork.JPG")
+
+    assert stored.filename == f"{stored.digest}.jpg"
+    assert store.resolve(stored.filename) == stored.path
+    assert store.resolve(f"../../{stored.filename}") == stored.path
+
+    # Original names aren't unique across customers, so they don't resolve
+    assert store.resolve("artwork.JPG") is None
+    assert store.resolve("0" * 64 + ".jpg") is None
+    assert store.resolve("objects") is None
+    assert store.resolve("") is None
+
+
+def test_identical_uploads_are_stored_once(db, tmp_path):
+    store = UploadStore(tmp_path / "uploads", db)
+    first = store.put_stream(io.BytesIO(b"same bytes"), "a.png")
+    second = store.put_bytes(b"same bytes", "b.png")
+    assert first.path == second.path
+    assert list((tmp_path / "uploads" / "tmp").iterdir()) == []
+
+
+def test_failed_put_bytes_leaves_no_temp_file(db, tmp_path, monkeypatch):
+    store = UploadStore(tmp_path / "uploads", db)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        store.put_bytes(b"converted preview", "preview.jpg")
+    assert list((tmp_path / "uploads" / "tmp").iterdir()) == []
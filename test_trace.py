@@ -0,0 +1,71 @@
+"""Tests for bounded tool-call traces (agent/trace.py) and how ReActAgent records them."""
+
+import json
+
+from PIL import Image
+
+from agent.react_agent import AgentRun, ReActAgent
+from agent.trace import MAX_TRACE_ENTRIES, JsonlTraceSink, RecentTraces, TraceBuffer, summarize_tool_calls
+
+
+def test_trace_buffer_keeps_the_newest_entries():
+    buffer = TraceBuffer(maxlen=3)
+    for i in range(5):
+        buffer.append(i)
+    assert buffer.to_list() == [2, 3, 4]
+    assert buffer.dropped == 2
+    assert len(buffer) == 3
+    assert buffer[-1] == 4 and buffer[:2] == [2, 3]
+
+
+def test_summary_keeps_only_name_and_outcome():
+    calls = [
+        {"tool_name": "check_resolution", "arguments": {"file_path": "a.jpg"}, "result": {"dpi": 300}},
+        {"tool_name": "calculate_price", "arguments": {}, "result": {"error": "unknown stock"}},
+    ]
+    assert summarize_tool_calls(calls) == [
+        {"tool_name": "check_resolution", "ok": True},
+        {"tool_name": "calculate_price", "ok": False},
+    ]
+
+
+def test_recent_traces_are_bounded():
+    recent = RecentTraces(maxlen=2)
+    for i in range(3):
+        recent.add({"run_id": i})
+    assert recent.snapshot() == [{"run_id": 1}, {"run_id": 2}]
+
+
+def test_agent_streams_full_traces_and_keeps_summaries(tmp_path):
+    artwork = tmp_path / "artwork.jpg"
+    Image.new("RGB", (2400, 3000), "white").save(artwork, dpi=(300, 300))
+    sink = JsonlTraceSink(tmp_path / "traces" / "agent.jsonl")
+    agent = ReActAgent(trace_sink=sink)
+
+    result = agent.process_order("100 flyers", file_path=str(artwork))
+    agent.process_order("100 flyers", file_path=str(artwork))
+    sink.close()
+
+    assert result["status"] == "processing"
+    assert [call["tool_name"] for call in result["tool_calls"]] == ["check_resolution"]
+    summaries = agent.get_recent_traces()
+    assert len(summaries) == 2
+    assert summaries[0]["tool_calls"] == [{"tool_name": "check_resolution", "ok": True}]
+    assert "arguments" not in json.dumps(summaries)
+
+    lines = (tmp_path / "traces" / "agent.jsonl").read_text().splitlines()
+    traces = [json.loads(line) for line in lines]
+    assert [trace["run_id"] for trace in traces] == [summary["run_id"] for summary in summaries]
+    assert traces[0]["file_path"] == str(artwork)
+    assert traces[0]["tool_calls"][0]["arguments"] == {"file_path": str(artwork)}
+
+
+def test_runaway_tool_loop_is_capped():
+    agent = ReActAgent()
+    run = AgentRun()
+    for quantity in range(MAX_TRACE_ENTRIES + 44):
+        agent.call_tool("calculate_price", run, paper_stock="80lb_text", quantity=quantity + 1,
+                        width_inches=4, height_inches=6)
+    assert len(run.tool_calls_history) == MAX_TRACE_ENTRIES
+    assert run.tool_calls_history.dropped == 44
+    assert run.tool_calls_history[-1]["arguments"]["quantity"] == MAX_TRACE_ENTRIES + 44
@@ -1,12 +1,17 @@
 """Tools for the Print Shop AI Order Guardrail system."""
 
-from .inventory_tool import check_inventory
-from .resolution_tool import check_resolution
-from .pricing_tool import calculate_price
-
-__all__ = ["check_inventory", "check_resolution", "calculate_price"]
-
-
-
-
+from .inventory_tool import (
+    INVENTORY, check_inventory, check_stock, commit_inventory, release_inventory, reserve_inventory,
+)
+from .resolution_tool import check_print_resolution, check_resolution, evaluate_resolution, measure_artwork
+from .pricing_tool import calculate_price, calculate_prices_batch, quote_price
+from .paper_index import PaperIndex, get_paper_index
+from .shop_capabilities import PAPER_INDEX, SHOP_CAPABILITIES, check_spec_compatibility
 
+__all__ = [
+    "INVENTORY", "check_inventory", "check_stock", "commit_inventory", "release_inventory", "reserve_inventory",
+    "check_print_resolution", "check_resolution", "evaluate_resolution", "measure_artwork",
+    "calculate_price", "calculate_prices_batch", "quote_price",
+    "PaperIndex", "get_paper_index",
+    "PAPER_INDEX", "SHOP_CAPABILITIES", "check_spec_compatibility",
+]
@@ -0,0 +1,124 @@
+"""Per-request memoization of tool results and file analyses."""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from instrumentation import CACHE_HIT, CACHE_MISS, record_event
+except ImportError:
+    from ..instrumentation import CACHE_HIT, CACHE_MISS, record_event
+
+
+def _normalize(value: Any) -> Hashable:
+    """Normalize an argument so equivalent calls map to the same cache key."""
+    if isinstance(value, Path):
+        return str(value.resolve())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    return value
+
+
+class AnalysisContext:
+    """
+    Memoizes tool calls for the lifetime of one order.
+
+    Tools, guardrails and the agent all route expensive calls through the same
+    context, so e.g. a file's resolution check runs once per order no matter how
+    many layers ask for it. Results are shared, not copied - treat them as read-only.
+
+    A context that outlives one order (a form session) should set
+    ``max_entries``; the least recently used results are then dropped.
+    """
+
+    # Arguments that name files on disk; normalized to absolute paths
+    PATH_ARGUMENTS = ("file_path",)
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # key -> [lock, callers holding or waiting on it]; dropped when the last one leaves
+        self._key_locks: Dict[Hashable, List] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, tool_name: str, kwargs: Dict[str, Any]) -> Tuple:
+        """Build the cache key for a call: (tool, sorted normalized args)."""
+        normalized = []
+        for name, value in sorted(kwargs.items()):
+            if name in self.PATH_ARGUMENTS and value:
+                value = Path(value)
+            normalized.append((name, _normalize(value)))
+        return (tool_name, tuple(normalized))
+
+    def call(self, tool_name: str, function: Callable[..., Any], **kwargs) -> Any:
+        """
+        Call ``function(**kwargs)`` unless an equivalent call already ran in this context.
+
+        Args:
+            tool_name: Name used in the cache key (e.g., "check_resolution")
+            function: The tool function
+            **kwargs: Tool arguments
+
+        Returns:
+            The (possibly cached) tool result
+        """
+        key = self.make_key(tool_name, kwargs)
+        return self.memoize(key, lambda: function(**kwargs))
+
+    def memoize(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it at most once (exceptions are not cached)."""
+        with self._lock:
+            found = key in self._results
+            if found:
+                self.hits += 1
+                value = self._results[key]
+                self._results.move_to_end(key)
+            else:
+                entry = self._key_locks.get(key)
+                if entry is None:
+                    entry = self._key_locks[key] = [threading.Lock(), 0]
+                entry[1] += 1
+        if found:
+            record_event(CACHE_HIT, "analysis")
+            return value
+
+        # Concurrent callers of the same key wait for the first one instead of recomputing
+        try:
+            with entry[0]:
+                with self._lock:
+                    found = key in self._results
+                    if found:
+                        self.hits += 1
+                        value = self._results[key]
+                    else:
+                        self.misses += 1
+                if found:
+                    record_event(CACHE_HIT, "analysis")
+                    return value
+                record_event(CACHE_MISS, "analysis")
+                value = compute()
+                with self._lock:
+                    self._results[key] = value
+                    if self.max_entries is not None:
+                        while len(self._results) > self.max_entries:
+                            self._results.popitem(last=False)
+                return value
+        finally:
+            # The lock stays shared until its last caller is done, whether or not compute() raised
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache statistics for this request."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._results)}
@@ -0,0 +1,142 @@
+"""Process-wide, hot-reloadable cache for the JSON files in config/."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+# How often (seconds) a file is stat()ed to see whether it changed on disk
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class ConfigSnapshot(NamedTuple):
+    """An immutable, fully parsed view of one config file."""
+    name: str
+    data: Mapping[str, Any]
+    digest: str
+    mtime_ns: int
+    size: int
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into read-only structures."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a plain, mutable (JSON-serializable) copy of frozen config data."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ConfigStore:
+    """
+    Parses each config file once and serves the same immutable snapshot to every caller.
+
+    A file is re-read only when its mtime/size changes, and re-parsed only when its
+    SHA-256 digest changes. New snapshots are built off to the side and swapped in
+    with a single reference assignment, so readers never see a half-updated config.
+    """
+
+    def __init__(self, config_dir: Path = CONFIG_DIR, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.config_dir = Path(config_dir)
+        self.check_interval = check_interval
+        self._snapshots: Dict[str, ConfigSnapshot] = {}
+        self._next_check: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.config_dir / f"{name}.json"
+
+    def _load(self, name: str, current: Optional[ConfigSnapshot]) -> ConfigSnapshot:
+        """Build a new snapshot for ``name``, reusing ``current`` when the content is unchanged."""
+        path = self._path(name)
+        stat = os.stat(path)
+        if current and current.mtime_ns == stat.st_mtime_ns and current.size == stat.st_size:
+            return current
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if current and current.digest == digest:
+            # Touched but not edited - keep the parsed data, just remember the new stat
+            return current._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+        return ConfigSnapshot(
+            name=name,
+            data=_freeze(json.loads(raw)),
+            digest=digest,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
+    def snapshot(self, name: str) -> ConfigSnapshot:
+        """
+        Get the current snapshot for a config file.
+
+        Args:
+            name: Config file name without extension (e.g., "pricing")
+
+        Returns:
+            ConfigSnapshot for the file
+        """
+        current = self._snapshots.get(name)
+        now = time.monotonic()
+        if current is not None and now < self._next_check.get(name, 0.0):
+            return current
+
+        with self._lock:
+            current = self._snapshots.get(name)
+            if current is None or now >= self._next_check.get(name, 0.0):
+                try:
+                    current = self._load(name, current)
+                except (OSError, ValueError):
+                    # Keep serving the last good config if the file is mid-write or broken
+                    if current is None:
+                        raise
+                self._snapshots[name] = current
+                self._next_check[name] = now + self.check_interval
+            return current
+
+    def get(self, name: str) -> Mapping[str, Any]:
+        """Get the parsed (read-only) contents of a config file."""
+        return self.snapshot(name).data
+
+    def digest(self, name: str) -> str:
+        """Get the SHA-256 digest of the config file currently being served."""
+        return self.snapshot(name).digest
+
+    def invalidate(self, name: Optional[str] = None):
+        """Force the next read of ``name`` (or of every file) to re-check the disk."""
+        with self._lock:
+            if name is None:
+                self._next_check.clear()
+            else:
+                self._next_check.pop(name, None)
+
+
+CONFIG_STORE = ConfigStore()
+
+
+def get_config(name: str) -> Mapping[str, Any]:
+    """Get a config file from the process-wide store."""
+    return CONFIG_STORE.get(name)
+
+
+def get_config_digest(name: str) -> str:
+    """Get the content digest of a config file from the process-wide store."""
+    return CONFIG_STORE.digest(name)
@@ -1,15 +1,34 @@
 """Inventory checking tool for validating order specifications."""
 
-import json
-from pathlib import Path
-from typing import Dict, Any, Optional
+import sqlite3
+from typing import Dict, Any, Mapping, Optional, Tuple
 
-def load_shop_capabilities() -> Dict[str, Any]:
-    """Load shop capabilities from config file."""
-    config_path = Path(__file__).parent.parent / "config" / "shop_capabilities.json"
-    with open(config_path, "r") as f:
-        return json.load(f)
+from .config_store import get_config
+from .paper_index import get_paper_index
+from .shop_capabilities import PAPER_INDEX
 
+# Handle both relative and absolute imports
+try:
+    from instrumentation import TOOL, instrumented
+    from storage.inventory_store import InventoryError, get_inventory_store
+except ImportError:
+    from ..instrumentation import TOOL, instrumented
+    from ..storage.inventory_store import InventoryError, get_inventory_store
+
+# Starting stock of the order form's papers; live counts and reservations are kept in the shared inventory store
+INVENTORY = {
+    "80lb Glossy": {"available": True, "quantity": 500},
+    "100lb Matte": {"available": True, "quantity": 300},
+    "110lb Cardstock": {"available": True, "quantity": 200},
+    "65lb Text": {"available": True, "quantity": 1000},
+    "80lb Text": {"available": True, "quantity": 800},
+}
+
+def load_shop_capabilities() -> Mapping[str, Any]:
+    """Load shop capabilities from the shared config store (parsed once, read-only)."""
+    return get_config("shop_capabilities")
+
+@instrumented(TOOL)
 def check_inventory(paper_stock: str, color: str, finish: str) -> Dict[str, Any]:
     """
     Check if a paper stock combination is available.
@@ -24,7 +43,8 @@ def check_inventory(paper_stock: str, color: str, finish: str) -> Dict[str, Any]
     """
     capabilities = load_shop_capabilities()
     
-    # Check if paper stock exists
+    # Check if paper stock exists ("110lb Cardstock", "100lb card stock" -> "100lb_cardstock")
+    paper_stock = get_paper_index().resolve(paper_stock) or paper_stock
     if paper_stock not in capabilities["paper_stocks"]:
         return {
             "available": False,
@@ -46,7 +66,7 @@ def check_inventory(paper_stock: str, color: str, finish: str) -> Dict[str, Any]
         return {
             "available": False,
             "reason": f"Color '{color}' is not available for '{paper_stock}'.",
-            "available_colors": stock_info["colors"],
+            "available_colors": list(stock_info["colors"]),
             "white_ink_capable": stock_info["white_ink_capable"]
         }
     
@@ -55,7 +75,7 @@ def check_inventory(paper_stock: str, color: str, finish: str) -> Dict[str, Any]
         return {
             "available": False,
             "reason": f"Finish '{finish}' is not available for '{paper_stock}'.",
-            "available_finishes": stock_info["finish"]
+            "available_finishes": list(stock_info["finish"])
         }
     
     return {
@@ -67,6 +87,131 @@ def check_inventory(paper_stock: str, color: str, finish: str) -> Dict[str, Any]
     }
 
 
+def _stock_level(paper: str) -> Tuple[bool, int]:
+    """(in stock, free sheets) for a stocked paper, live from the inventory store when it's available."""
+    store = get_inventory_store(INVENTORY)
+    if store is not None:
+        try:
+            level = store.level(paper)
+        except sqlite3.Error:
+            level = None
+        if level is not None:
+            return level.in_stock, level.free
+    stock = INVENTORY[paper]
+    return stock["available"], stock["quantity"]
 
+@instrumented(TOOL)
+def check_stock(paper_type: str, quantity: int = 1) -> Dict[str, Any]:
+    """
+    Check that enough sheets of an order-form paper are in stock.
+    
+    Only reads the stock level; reserve_inventory is what takes the sheets.
+    
+    Args:
+        paper_type: Paper as named on the order form (e.g., "100lb Matte")
+        quantity: Sheets needed
+    
+    Returns:
+        Dictionary with availability status and the resolved paper name
+    """
+    available_paper = PAPER_INDEX.resolve(paper_type)
+    
+    if not available_paper:
+        return {
+            "available": False,
+            "message": f"Paper type '{paper_type}' not found in inventory.",
+            "available_options": list(INVENTORY.keys())
+        }
+    
+    in_stock, free = _stock_level(available_paper)
+    
+    if not in_stock:
+        return {
+            "available": False,
+            "message": f"Paper '{available_paper}' is currently out of stock.",
+            "available_options": [p for p in INVENTORY if _stock_level(p)[0]]
+        }
+    
+    if free < quantity:
+        return {
+            "available": False,
+            "message": f"Only {free} sheets of '{available_paper}' available, but {quantity} requested.",
+            "current_stock": free,
+            "requested": quantity
+        }
+    
+    return {
+        "available": True,
+        "paper": available_paper,
+        "quantity_available": free,
+        "message": f"Paper '{available_paper}' is available. Stock: {free} sheets."
+    }
+
+def reserve_inventory(paper_type: str, quantity: int = 1) -> Dict[str, Any]:
+    """
+    Hold paper for an accepted order, atomically across all workers.
+    
+    check_stock only reads the stock level; this is the step that takes
+    the sheets, so two orders can't both be accepted for the last of a paper.
+    
+    Args:
+        paper_type: Paper to reserve
+        quantity: Number of sheets
+    
+    Returns:
+        Dictionary with 'reserved', and the 'reservation_id' to pass to
+        commit_inventory / release_inventory when reserved
+    """
+    paper = PAPER_INDEX.resolve(paper_type)
+    if not paper:
+        return {
+            "reserved": False,
+            "message": f"Paper type '{paper_type}' not found in inventory."
+        }
+    
+    store = get_inventory_store(INVENTORY)
+    if store is None:
+        return {
+            "reserved": False,
+            "message": "Inventory is temporarily unavailable. Please try again."
+        }
+    
+    try:
+        reservation = store.reserve(paper, int(quantity))
+    except InventoryError as e:
+        return {"reserved": False, "paper": paper, "message": str(e)}
+    except sqlite3.Error:
+        return {
+            "reserved": False,
+            "paper": paper,
+            "message": "Inventory is temporarily unavailable. Please try again."
+        }
+    
+    return {
+        "reserved": True,
+        "reservation_id": reservation.id,
+        "paper": paper,
+        "quantity": reservation.quantity,
+        "message": f"Reserved {reservation.quantity} sheets of '{paper}'."
+    }
 
+def commit_inventory(reservation_id: str) -> bool:
+    """
+    Deduct a reservation from stock once the order is accepted.
+    
+    Returns False if the inventory store is unavailable or the reservation
+    was already settled or expired.
+    """
+    store = get_inventory_store(INVENTORY)
+    if store is None:
+        return False
+    try:
+        store.commit(reservation_id)
+    except InventoryError:
+        return False
+    return True
 
+def release_inventory(reservation_id: str) -> bool:
+    """Return a reservation's sheets to stock (order abandoned or failed after reserving)."""
+    store = get_inventory_store(INVENTORY)
+    return store.release(reservation_id) if store is not None else False
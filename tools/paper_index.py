@@ -0,0 +1,163 @@
+"""
+Normalized paper-name index shared by the inventory, pricing and spec-check tools.
+
+Customers, the order form and the two config vocabularies all spell paper
+differently ("110lb Cardstock", "100lb_cardstock", "110# card stock",
+"80 lb glossy"). Every name is reduced once to a canonical key - case-folded
+tokens, with weights and finish synonyms normalized - so lookups are a dict
+hit, with a token-overlap fallback for partial names like "matte".
+"""
+
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .config_store import CONFIG_STORE
+
+# Words that mean the same thing on an order
+SYNONYMS = {
+    "glossy": "gloss",
+    "matt": "matte",
+    "silk": "satin",
+    "card": "cardstock",
+    "cover": "cardstock",
+    "uncoated": "text",
+}
+
+# Words that don't distinguish one stock from another
+FILLER = frozenset({"paper", "stock", "sheet", "sheets", "weight"})
+
+# "100 lb", "100lbs", "100#", "100 pound", "14 pt" -> "100lb" / "14pt"
+_WEIGHT = re.compile(r"(\d+(?:\.\d+)?)\s*(lbs?|pounds?|#|pt|points?)(?![a-z])")
+_WEIGHT_TOKEN = re.compile(r"\d+(?:\.\d+)?(?:lb|pt)")
+_TOKEN = re.compile(r"[a-z0-9.]+")
+
+# Names for the same product in the two vocabularies (tools/shop_capabilities.py and config/*.json)
+PAPER_EQUIVALENTS: Tuple[Tuple[str, ...], ...] = (
+    ("110lb Cardstock", "100lb_cardstock"),
+    ("80lb Text", "80lb_text"),
+)
+
+# Distinct raw spellings remembered per index
+MAX_MEMO_ENTRIES = 4096
+
+_MISSING = object()
+
+
+def _weight_unit(unit: str) -> str:
+    return "pt" if unit.startswith(("pt", "point")) else "lb"
+
+
+def paper_tokens(text: str) -> FrozenSet[str]:
+    """Canonical token set of a paper name."""
+    text = text.casefold().replace("_", " ").replace("-", " ")
+    text = _WEIGHT.sub(lambda m: f" {m.group(1)}{_weight_unit(m.group(2))} ", text)
+    tokens = set()
+    for token in _TOKEN.findall(text):
+        token = SYNONYMS.get(token, token)
+        if token not in FILLER:
+            tokens.add(token)
+    return frozenset(tokens)
+
+
+def paper_key(text: str) -> str:
+    """Canonical lookup key: sorted canonical tokens."""
+    return " ".join(sorted(paper_tokens(text)))
+
+
+class PaperIndex:
+    """
+    Resolves any spelling of a paper to one of ``names``.
+
+    Exact (normalized) matches and aliases from PAPER_EQUIVALENTS are a single
+    dict lookup. Otherwise the name whose tokens contain, or are contained in,
+    the query's tokens with the most overlap wins (earlier names win ties);
+    stated weights must agree. Results are memoized per raw spelling.
+    """
+
+    def __init__(self, names: Iterable[str], equivalents: Sequence[Sequence[str]] = PAPER_EQUIVALENTS):
+        self.names: Tuple[str, ...] = tuple(dict.fromkeys(names))
+        self._exact: Dict[str, str] = {}
+        for name in self.names:
+            self._exact.setdefault(paper_key(name), name)
+
+        known = set(self.names)
+        for group in equivalents:
+            targets = [name for name in group if name in known]
+            if targets:
+                for alias in group:
+                    self._exact.setdefault(paper_key(alias), targets[0])
+
+        # Fuzzy candidates, in name order so ties resolve like a first-match scan
+        self._candidates: List[Tuple[FrozenSet[str], FrozenSet[str], str]] = []
+        for name in self.names:
+            tokens = paper_tokens(name)
+            weights = frozenset(token for token in tokens if _WEIGHT_TOKEN.fullmatch(token))
+            self._candidates.append((tokens, weights, name))
+
+        self._memo: Dict[str, object] = {}
+        self._memo_lock = threading.Lock()
+
+    def __contains__(self, text: str) -> bool:
+        return self.resolve(text) is not None
+
+    def resolve(self, text: Optional[str]) -> Optional[str]:
+        """The indexed name ``text`` refers to, or None."""
+        if not text:
+            return None
+        cached = self._memo.get(text, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        tokens = paper_tokens(text)
+        name = self._exact.get(" ".join(sorted(tokens)))
+        if name is None and tokens:
+            name = self._fuzzy(tokens)
+
+        with self._memo_lock:
+            if len(self._memo) >= MAX_MEMO_ENTRIES:
+                self._memo.clear()
+            self._memo[text] = name
+        return name
+
+    def resolve_exact(self, text: Optional[str]) -> Optional[str]:
+        """Like resolve, but only normalized exact matches and aliases."""
+        return self._exact.get(paper_key(text)) if text else None
+
+    def _fuzzy(self, tokens: FrozenSet[str]) -> Optional[str]:
+        weights = frozenset(token for token in tokens if _WEIGHT_TOKEN.fullmatch(token))
+        best, best_score = None, 0.0
+        for candidate, candidate_weights, name in self._candidates:
+            if weights and candidate_weights and not weights & candidate_weights:
+                continue
+            if not (candidate <= tokens or tokens <= candidate):
+                continue
+            score = len(candidate & tokens) / len(candidate | tokens)
+            if score > best_score:
+                best, best_score = name, score
+        return best
+
+
+_index: Optional[PaperIndex] = None
+_index_digests: Tuple[str, str] = ("", "")
+_index_lock = threading.Lock()
+
+
+def get_paper_index() -> PaperIndex:
+    """
+    Index of the paper stock ids in config/shop_capabilities.json and
+    config/pricing.json, rebuilt only when either file changes.
+    """
+    global _index, _index_digests
+    capabilities = CONFIG_STORE.snapshot("shop_capabilities")
+    pricing = CONFIG_STORE.snapshot("pricing")
+    digests = (capabilities.digest, pricing.digest)
+    index = _index
+    if index is None or _index_digests != digests:
+        with _index_lock:
+            if _index is None or _index_digests != digests:
+                names = list(capabilities.data["paper_stocks"]) + list(pricing.data["base_prices"])
+                _index = PaperIndex(names)
+                _index_digests = digests
+            index = _index
+    return index
@@ -1,15 +1,167 @@
 """Pricing calculation tool - must be used for all price quotes."""
 
+import hashlib
 import json
-from pathlib import Path
-from typing import Dict, Any, Optional
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Any, List, Mapping, NamedTuple, Optional, Sequence, Tuple
 
-def load_pricing_config() -> Dict[str, Any]:
-    """Load pricing configuration from config file."""
-    config_path = Path(__file__).parent.parent / "config" / "pricing.json"
-    with open(config_path, "r") as f:
-        return json.load(f)
+from .config_store import CONFIG_STORE, get_config
+from .paper_index import get_paper_index
+from .shop_capabilities import PAPER_INDEX
 
+# Handle both relative and absolute imports
+try:
+    from instrumentation import TOOL, instrumented
+except ImportError:
+    from ..instrumentation import TOOL, instrumented
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Retail prices of the order form's papers and standard print sizes (quote_price)
+RETAIL_PRICING = {
+    "base_price_per_sheet": 0.50,
+    "size_multipliers": {
+        "3x5": 0.5,
+        "4x6": 0.6,
+        "5x7": 0.7,
+        "8x10": 1.0,
+        "8.5x11": 1.2,
+        "11x14": 1.8,
+        "11x17": 2.5,
+        "12x18": 3.0,
+        "13x19": 3.5,
+    },
+    "paper_premiums": {
+        "80lb Glossy": 0.10,
+        "100lb Matte": 0.15,
+        "110lb Cardstock": 0.25,
+        "65lb Text": 0.0,
+        "80lb Text": 0.05,
+    },
+    "quantity_discounts": {
+        "1-10": 0.0,
+        "11-50": 0.05,
+        "51-100": 0.10,
+        "101+": 0.15,
+    }
+}
+
+# Multipliers (quantity breaks, rush surcharges) are stored as integers in units of 1/RATE_SCALE
+RATE_SCALE = 10000
+
+def load_pricing_config() -> Mapping[str, Any]:
+    """Load pricing configuration from the shared config store (parsed once, read-only)."""
+    return get_config("pricing")
+
+
+class CompiledPricing(NamedTuple):
+    """pricing.json flattened into integer-cent tables for fast lookups."""
+    digest: str
+    stock_names: Tuple[str, ...]
+    stock_index: Mapping[str, int]
+    per_sheet_cents: Tuple[int, ...]
+    setup_fee_cents: Tuple[int, ...]
+    color_surcharge_cents: Tuple[int, ...]
+    break_labels: Tuple[str, ...]
+    break_starts: Tuple[int, ...]  # sorted ascending
+    break_ends: Tuple[int, ...]  # inclusive; open-ended breaks ("5000+") use _OPEN_RANGE_END
+    break_rates: Tuple[int, ...]
+    rush_rates: Mapping[str, int]
+
+
+_OPEN_RANGE_END = 2 ** 62
+
+
+def _to_cents(amount: float) -> int:
+    return int(Decimal(str(amount)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _to_rate(multiplier: float) -> int:
+    return int((Decimal(str(multiplier)) * RATE_SCALE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _parse_break(label: str) -> Tuple[int, int]:
+    """Parse a quantity break label like "100-499" or "5000+" into an inclusive range."""
+    label = label.strip()
+    if label.endswith("+"):
+        return int(label[:-1]), _OPEN_RANGE_END
+    min_qty, max_qty = label.split("-")
+    return int(min_qty), int(max_qty)
+
+
+def compile_pricing(pricing: Mapping[str, Any], digest: str = "") -> CompiledPricing:
+    """
+    Compile a pricing config into sorted, integer-cent lookup tables.
+
+    Args:
+        pricing: Parsed pricing.json contents
+        digest: Content digest of the config (used to detect stale compilations)
+
+    Returns:
+        CompiledPricing tables
+    """
+    stock_names = tuple(pricing["base_prices"].keys())
+    stocks = [pricing["base_prices"][name] for name in stock_names]
+
+    breaks = sorted(
+        (_parse_break(label) + (_to_rate(rate), label))
+        for label, rate in pricing["quantity_breaks"].items()
+    )
+
+    return CompiledPricing(
+        digest=digest,
+        stock_names=stock_names,
+        stock_index={name: i for i, name in enumerate(stock_names)},
+        per_sheet_cents=tuple(_to_cents(s["per_sheet"]) for s in stocks),
+        setup_fee_cents=tuple(_to_cents(s["setup_fee"]) for s in stocks),
+        color_surcharge_cents=tuple(_to_cents(s["color_surcharge"]) for s in stocks),
+        break_labels=tuple(b[3] for b in breaks),
+        break_starts=tuple(b[0] for b in breaks),
+        break_ends=tuple(b[1] for b in breaks),
+        break_rates=tuple(b[2] for b in breaks),
+        rush_rates={name: _to_rate(rate) for name, rate in pricing["rush_surcharge"].items()},
+    )
+
+
+_compiled: Optional[CompiledPricing] = None
+
+
+def get_compiled_pricing() -> CompiledPricing:
+    """Get the compiled pricing tables, recompiling only when pricing.json changes."""
+    global _compiled
+    snapshot = CONFIG_STORE.snapshot("pricing")
+    compiled = _compiled
+    if compiled is None or compiled.digest != snapshot.digest:
+        compiled = compile_pricing(snapshot.data, snapshot.digest)
+        _compiled = compiled
+    return compiled
+
+
+def _quantity_rate(compiled: CompiledPricing, quantity: int) -> int:
+    """Find the quantity-break rate for ``quantity`` by bisection (RATE_SCALE if no break applies)."""
+    idx = bisect_right(compiled.break_starts, quantity) - 1
+    if idx >= 0 and quantity <= compiled.break_ends[idx]:
+        return compiled.break_rates[idx]
+    return RATE_SCALE
+
+
+def _round_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding half away from zero."""
+    if numerator < 0:
+        return -((-numerator + denominator // 2) // denominator)
+    return (numerator + denominator // 2) // denominator
+
+
+def _dollars(cents: int) -> float:
+    return cents / 100
+
+
+@instrumented(TOOL)
 def calculate_price(
     paper_stock: str,
     quantity: int,
@@ -20,10 +172,10 @@ def calculate_price(
 ) -> Dict[str, Any]:
     """
     Calculate the price for a print order.
-    
+
     This tool MUST be used for all price calculations.
     The agent must never estimate prices without using this tool.
-    
+
     Args:
         paper_stock: Paper stock type (e.g., "100lb_cardstock")
         quantity: Number of sheets to print
@@ -31,73 +183,286 @@ def calculate_price(
         height_inches: Height in inches
         full_color: Whether full-color printing is needed
         rush_type: Optional rush type ("rush" or "express")
-    
+
     Returns:
         Dictionary with price breakdown
     """
-    pricing = load_pricing_config()
-    
+    compiled = get_compiled_pricing()
+
     # Validate paper stock
-    if paper_stock not in pricing["base_prices"]:
+    paper_stock = get_paper_index().resolve(paper_stock) or paper_stock
+    stock = compiled.stock_index.get(paper_stock)
+    if stock is None:
         return {
             "error": f"Paper stock '{paper_stock}' not found in pricing database.",
-            "available_stocks": list(pricing["base_prices"].keys())
+            "available_stocks": list(compiled.stock_names)
         }
-    
-    base_prices = pricing["base_prices"][paper_stock]
-    
-    # Calculate quantity discount
-    quantity_multiplier = 1.0
-    for break_range, multiplier in pricing["quantity_breaks"].items():
-        min_qty, max_qty = break_range.split("-")
-        min_qty = int(min_qty)
-        max_qty = int(max_qty.replace("+", "999999"))
-        if min_qty <= quantity <= max_qty:
-            quantity_multiplier = multiplier
-            break
-    
-    # Calculate per-sheet cost
-    per_sheet_cost = base_prices["per_sheet"]
+
+    # Per-sheet cost in cents, before the quantity discount
+    per_sheet_cents = compiled.per_sheet_cents[stock]
     if full_color:
-        per_sheet_cost += base_prices["color_surcharge"]
-    
-    # Apply quantity discount
-    per_sheet_cost *= quantity_multiplier
-    
-    # Calculate total sheet cost
-    total_sheet_cost = per_sheet_cost * quantity
-    
-    # Add setup fee
-    setup_fee = base_prices["setup_fee"]
-    
-    # Apply rush surcharge if applicable
-    rush_multiplier = 1.0
-    if rush_type and rush_type in pricing["rush_surcharge"]:
-        rush_multiplier = pricing["rush_surcharge"][rush_type]
-    
-    subtotal = (total_sheet_cost + setup_fee) * rush_multiplier
-    
-    # Calculate price per unit
-    price_per_unit = subtotal / quantity if quantity > 0 else 0
-    
+        per_sheet_cents += compiled.color_surcharge_cents[stock]
+
+    quantity_rate = _quantity_rate(compiled, quantity)
+    rush_rate = compiled.rush_rates.get(rush_type, RATE_SCALE) if rush_type else RATE_SCALE
+    setup_fee_cents = compiled.setup_fee_cents[stock]
+
+    # Exact arithmetic in fractions of a cent; round to whole cents only for display
+    per_sheet_scaled = per_sheet_cents * quantity_rate  # cents * RATE_SCALE
+    total_sheet_scaled = per_sheet_scaled * quantity
+    subtotal_scaled = (total_sheet_scaled + setup_fee_cents * RATE_SCALE) * rush_rate  # cents * RATE_SCALE^2
+
+    subtotal_cents = _round_div(subtotal_scaled, RATE_SCALE * RATE_SCALE)
+    price_per_unit_cents = _round_div(subtotal_scaled, RATE_SCALE * RATE_SCALE * quantity) if quantity > 0 else 0
+
     return {
         "paper_stock": paper_stock,
         "quantity": quantity,
         "dimensions": f"{width_inches}\" × {height_inches}\"",
-        "per_sheet_cost": round(per_sheet_cost, 2),
-        "total_sheet_cost": round(total_sheet_cost, 2),
-        "setup_fee": round(setup_fee, 2),
+        "per_sheet_cost": _dollars(_round_div(per_sheet_scaled, RATE_SCALE)),
+        "total_sheet_cost": _dollars(_round_div(total_sheet_scaled, RATE_SCALE)),
+        "setup_fee": _dollars(setup_fee_cents),
         "rush_type": rush_type,
-        "rush_multiplier": rush_multiplier,
-        "quantity_discount": f"{(1 - quantity_multiplier) * 100:.0f}%",
-        "subtotal": round(subtotal, 2),
-        "price_per_unit": round(price_per_unit, 2),
-        "total_price": round(subtotal, 2),
+        "rush_multiplier": rush_rate / RATE_SCALE,
+        "quantity_discount": f"{(RATE_SCALE - quantity_rate) * 100 / RATE_SCALE:.0f}%",
+        "subtotal": _dollars(subtotal_cents),
+        "price_per_unit": _dollars(price_per_unit_cents),
+        "total_price": _dollars(subtotal_cents),
+        "total_cents": subtotal_cents,
         "currency": "USD",
-        "formatted_price": f"${subtotal:.2f}"
+        "formatted_price": f"${subtotal_cents // 100}.{subtotal_cents % 100:02d}"
+    }
+
+
+def calculate_prices_batch(
+    paper_stocks: Sequence[str],
+    quantities: Sequence[int],
+    full_color: Any = True,
+    rush_types: Optional[Sequence[Optional[str]]] = None
+) -> Dict[str, Any]:
+    """
+    Price many line items in one vectorized call.
+
+    Uses the same compiled tables and integer-cent arithmetic as calculate_price,
+    so every element matches the scalar result exactly.
+
+    Args:
+        paper_stocks: Array of paper stock names
+        quantities: Array of quantities
+        full_color: Scalar or boolean array of full-color flags
+        rush_types: Optional array of rush types ("rush", "express", None or "")
+
+    Returns:
+        Dictionary of NumPy arrays, one element per line item. Items with an
+        unknown paper stock have ``valid`` False and zero prices.
+    """
+    if not NUMPY_AVAILABLE:
+        return {
+            "error": "NumPy not available. Install with: pip install numpy"
+        }
+
+    compiled = get_compiled_pricing()
+
+    stocks = np.asarray(paper_stocks)
+    qty = np.asarray(quantities, dtype=np.int64)
+    if stocks.shape != qty.shape:
+        return {
+            "error": f"paper_stocks and quantities must have the same shape ({stocks.shape} != {qty.shape})"
+        }
+
+    # Map stock names to table indices (-1 for unknown) via the unique values only
+    unique_stocks, inverse = np.unique(stocks, return_inverse=True)
+    index = get_paper_index()
+    unique_index = np.array(
+        [compiled.stock_index.get(index.resolve(str(s)) or str(s), -1) for s in unique_stocks], dtype=np.int64
+    )
+    stock_idx = unique_index[inverse].reshape(stocks.shape)
+    valid = stock_idx >= 0
+    safe_idx = np.where(valid, stock_idx, 0)
+
+    per_sheet_table = np.array(compiled.per_sheet_cents, dtype=np.int64)
+    setup_table = np.array(compiled.setup_fee_cents, dtype=np.int64)
+    color_table = np.array(compiled.color_surcharge_cents, dtype=np.int64)
+
+    color = np.broadcast_to(np.asarray(full_color, dtype=bool), qty.shape)
+    per_sheet_cents = per_sheet_table[safe_idx] + np.where(color, color_table[safe_idx], 0)
+    setup_fee_cents = setup_table[safe_idx]
+
+    # Quantity breaks by vectorized bisection
+    quantity_rate = np.full(qty.shape, RATE_SCALE, dtype=np.int64)
+    if compiled.break_starts:
+        starts = np.array(compiled.break_starts, dtype=np.int64)
+        ends = np.array(compiled.break_ends, dtype=np.int64)
+        rates = np.array(compiled.break_rates, dtype=np.int64)
+        break_idx = np.searchsorted(starts, qty, side="right") - 1
+        safe_break = np.clip(break_idx, 0, len(starts) - 1)
+        in_break = (break_idx >= 0) & (qty <= ends[safe_break])
+        quantity_rate = np.where(in_break, rates[safe_break], quantity_rate)
+
+    if rush_types is None:
+        rush_rate = np.full(qty.shape, RATE_SCALE, dtype=np.int64)
+    else:
+        rush = np.asarray([r or "" for r in np.ravel(np.asarray(rush_types, dtype=object))])
+        unique_rush, rush_inverse = np.unique(rush, return_inverse=True)
+        unique_rates = np.array(
+            [compiled.rush_rates.get(str(r), RATE_SCALE) for r in unique_rush], dtype=np.int64
+        )
+        rush_rate = unique_rates[rush_inverse].reshape(qty.shape)
+
+    scale2 = RATE_SCALE * RATE_SCALE
+    per_sheet_scaled = per_sheet_cents * quantity_rate
+    total_sheet_scaled = per_sheet_scaled * qty
+    subtotal_scaled = (total_sheet_scaled + setup_fee_cents * RATE_SCALE) * rush_rate
+
+    # Round half up to whole cents (quantities are non-negative, so floor division is safe)
+    subtotal_cents = (subtotal_scaled + scale2 // 2) // scale2
+    safe_qty = np.where(qty > 0, qty, 1)
+    price_per_unit_cents = np.where(
+        qty > 0, (subtotal_scaled + (scale2 * safe_qty) // 2) // (scale2 * safe_qty), 0
+    )
+    subtotal_cents = np.where(valid, subtotal_cents, 0)
+    price_per_unit_cents = np.where(valid, price_per_unit_cents, 0)
+
+    return {
+        "valid": valid,
+        "quantity_multiplier": quantity_rate / RATE_SCALE,
+        "rush_multiplier": rush_rate / RATE_SCALE,
+        "per_sheet_cost": np.where(valid, (per_sheet_scaled + RATE_SCALE // 2) // RATE_SCALE, 0) / 100,
+        "total_cents": subtotal_cents,
+        "total_price": subtotal_cents / 100,
+        "price_per_unit": price_per_unit_cents / 100,
+    }
+
+
+@instrumented(TOOL)
+def quote_price(size: str, paper_type: str, quantity: int = 1) -> Dict[str, Any]:
+    """
+    Retail price of an order-form order (standard size, paper by display name).
+
+    This is the ONLY source of truth for the order form's prices.
+
+    Args:
+        size: Print size (e.g., "8x10")
+        paper_type: Paper type (e.g., "100lb Matte")
+        quantity: Number of copies
+
+    Returns:
+        Dictionary with price breakdown
+    """
+    base_price = RETAIL_PRICING["base_price_per_sheet"]
+    size_mult = RETAIL_PRICING["size_multipliers"].get(size, 1.0)
+    paper_premium = RETAIL_PRICING["paper_premiums"].get(PAPER_INDEX.resolve(paper_type), 0.0)
+
+    discount_rate = _retail_discount_rate(quantity)
+
+    per_sheet = (base_price + paper_premium) * size_mult
+    subtotal = per_sheet * quantity
+    # The same per-copy figure the quote grid serves, so the form's re-pricing matches to the cent
+    total = _retail_unit_price(size_mult, paper_premium, discount_rate) * quantity
+    discount_amount = subtotal - total
+
+    return {
+        "base_price_per_sheet": base_price,
+        "size_multiplier": size_mult,
+        "paper_premium": paper_premium,
+        "per_sheet_price": round(per_sheet, 2),
+        "quantity": quantity,
+        "subtotal": round(subtotal, 2),
+        "discount_rate": discount_rate,
+        "discount_amount": round(discount_amount, 2),
+        "total": round(total, 2),
+        "formatted_price": f"${total:.2f}"
     }
 
 
+def _retail_breaks() -> List[Tuple[str, int, int, float]]:
+    """The order form's quantity breaks as (label, first, last, discount rate), lowest first."""
+    return sorted(
+        ((label,) + _parse_break(label) + (rate,) for label, rate in RETAIL_PRICING["quantity_discounts"].items()),
+        key=lambda brk: brk[1]
+    )
+
+
+def _retail_discount_rate(quantity: int) -> float:
+    """Discount of the highest break ``quantity`` reaches (none below the first break)."""
+    discount_rate = 0.0
+    for _, first, _, rate in _retail_breaks():
+        if quantity >= first:
+            discount_rate = rate
+    return discount_rate
+
+
+def _retail_unit_price(size_mult: float, paper_premium: float, discount_rate: float) -> float:
+    """Per-copy retail price after the quantity discount."""
+    return (RETAIL_PRICING["base_price_per_sheet"] + paper_premium) * size_mult * (1 - discount_rate)
+
 
+_grid_cache: Dict[str, Tuple[str, bytes]] = {}
 
 
+def build_quote_grid(compiled: Optional[CompiledPricing] = None) -> Dict[str, Any]:
+    """
+    Build the order form's full price matrix (size x paper x quantity break), with rush on top.
+
+    Cells hold the per-copy price in dollars after the break's quantity discount,
+    from the same tables as quote_price: the total for an order is
+    ``cell * quantity * rush_multipliers[rush]``, which for standard turnaround
+    is exactly quote_price's total.
+
+    Args:
+        compiled: Compiled pricing tables, for the rush surcharges (defaults to the current config)
+
+    Returns:
+        Dictionary with the grid axes and nested price matrix
+    """
+    compiled = compiled or get_compiled_pricing()
+    breaks = _retail_breaks()
+    rush_multipliers = {"standard": 1.0}
+    rush_multipliers.update({rush: rate / RATE_SCALE for rush, rate in compiled.rush_rates.items()})
+
+    prices = {
+        size: {
+            paper: {
+                label: _retail_unit_price(size_mult, premium, rate)
+                for label, _, _, rate in breaks
+            }
+            for paper, premium in RETAIL_PRICING["paper_premiums"].items()
+        }
+        for size, size_mult in RETAIL_PRICING["size_multipliers"].items()
+    }
+
+    return {
+        "currency": "USD",
+        "sizes": list(RETAIL_PRICING["size_multipliers"]),
+        "papers": list(RETAIL_PRICING["paper_premiums"]),
+        "quantity_breaks": [
+            {"label": label, "min": first, "max": None if last == _OPEN_RANGE_END else last, "discount_rate": rate}
+            for label, first, last, rate in breaks
+        ],
+        "rush_multipliers": rush_multipliers,
+        "prices": prices
+    }
+
+
+def get_quote_grid() -> Tuple[str, bytes]:
+    """
+    Get the serialized quote grid and its strong ETag.
+
+    The ETag is a hash of the tables the grid is built from (RETAIL_PRICING and
+    pricing.json's rush surcharges); the grid is built and serialized once per
+    hash, so serving it costs only the hash and a dictionary lookup.
+
+    Returns:
+        Tuple of (etag, JSON body bytes)
+    """
+    compiled = get_compiled_pricing()
+    digest = hashlib.sha256(
+        json.dumps(RETAIL_PRICING, sort_keys=True).encode("utf-8") + compiled.digest.encode("ascii")
+    ).hexdigest()
+    cached = _grid_cache.get(digest)
+    if cached is None:
+        body = json.dumps(build_quote_grid(compiled), separators=(",", ":")).encode("utf-8")
+        cached = (f"quote-grid-{digest[:32]}", body)
+        _grid_cache.clear()
+        _grid_cache[digest] = cached
+    return cached
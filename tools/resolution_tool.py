@@ -1,8 +1,23 @@
 """Resolution checking tool for pre-flight file validation."""
 
+import math
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
-import json
+from typing import Dict, Any, List, Mapping, Optional, Union
+
+from .config_store import get_config
+from .shop_capabilities import SHOP_CAPABILITIES
+
+# Handle both relative and absolute imports
+try:
+    from image_probe import ImageMetadata, ProbeError, probe_image
+    from instrumentation import TOOL, instrumented
+    from process_pool import run_cpu_bound
+    from storage.result_cache import get_result_cache
+except ImportError:
+    from ..image_probe import ImageMetadata, ProbeError, probe_image
+    from ..instrumentation import TOOL, instrumented
+    from ..process_pool import run_cpu_bound
+    from ..storage.result_cache import get_result_cache
 
 try:
     from PIL import Image
@@ -10,18 +25,38 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+try:
+    from pdf2image import convert_from_path, pdfinfo_from_path
+    PDF2IMAGE_AVAILABLE = True
+except ImportError:
+    PDF2IMAGE_AVAILABLE = False
+
 try:
     import fitz  # PyMuPDF
     PYMUPDF_AVAILABLE = True
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
-def load_shop_capabilities() -> Dict[str, Any]:
-    """Load shop capabilities from config file."""
-    config_path = Path(__file__).parent.parent / "config" / "shop_capabilities.json"
-    with open(config_path, "r") as f:
-        return json.load(f)
+# Bump when the analysis below changes so cached results are recomputed
+RESOLUTION_CACHE_VERSION = 1
+
+# Order-form PDFs are measured as if rasterized at pdf2image's default DPI
+PDF_RENDER_DPI = 200
 
+# Images this small (in pixels) are fills or rules, not artwork, and are skipped
+MIN_MEASURED_IMAGE_PX = 2
+
+def load_shop_capabilities() -> Mapping[str, Any]:
+    """Load shop capabilities from the shared config store (parsed once, read-only)."""
+    return get_config("shop_capabilities")
+
+@instrumented(TOOL)
 def check_resolution(file_path: Union[str, Path]) -> Dict[str, Any]:
     """
     Check the resolution (DPI) of an image or PDF file.
@@ -50,18 +85,36 @@ def check_resolution(file_path: Union[str, Path]) -> Dict[str, Any]:
     file_ext = file_path.suffix.lower()
     
     if file_ext == ".pdf":
-        return _check_pdf_resolution(file_path, min_dpi)
+        check = _check_pdf_resolution
     elif file_ext in [".png", ".jpg", ".jpeg", ".tiff", ".tif"]:
-        return _check_image_resolution(file_path, min_dpi)
+        check = _check_image_resolution
     else:
         return {
             "valid": False,
             "error": f"Unsupported file format: {file_ext}",
-            "supported_formats": capabilities["file_requirements"]["supported_formats"]
+            "supported_formats": list(capabilities["file_requirements"]["supported_formats"])
         }
+    
+    # Results are cached on disk by file digest; errors (e.g. a missing library) are not.
+    # The analysis itself runs in the warm process pool when that's enabled.
+    cache = get_result_cache()
+    if cache is None:
+        return run_cpu_bound(check, file_path, min_dpi)
+    return cache.cached_file_result(
+        "check_resolution",
+        file_path,
+        {"ext": file_ext, "min_dpi": min_dpi, "v": RESOLUTION_CACHE_VERSION},
+        lambda: run_cpu_bound(check, file_path, min_dpi),
+        should_cache=lambda result: "error" not in result
+    )
 
 def _check_pdf_resolution(file_path: Path, min_dpi: int) -> Dict[str, Any]:
-    """Check PDF resolution using PyMuPDF."""
+    """
+    Check PDF resolution using PyMuPDF.
+    
+    Every embedded image on every page is measured at its placed size, so the
+    result reflects what will actually print. Nothing is rendered or decoded.
+    """
     if not PYMUPDF_AVAILABLE:
         return {
             "valid": False,
@@ -70,100 +123,152 @@ def _check_pdf_resolution(file_path: Path, min_dpi: int) -> Dict[str, Any]:
         }
     
     try:
-        doc = fitz.open(file_path)
-        if len(doc) == 0:
-            return {
-                "valid": False,
-                "error": "PDF file is empty",
-                "resolution_dpi": None
-            }
-        
-        # Check first page resolution
-        page = doc[0]
-        rect = page.rect
-        
-        # Get page dimensions in points (72 points = 1 inch)
-        width_pts = rect.width
-        height_pts = rect.height
-        
-        # Get image resolution from page (default is 72 DPI for PDFs)
-        # For vector PDFs, we check the rendered resolution
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom = 144 DPI
-        width_px = pix.width
-        height_px = pix.height
-        
-        # Calculate effective DPI
-        dpi_x = (width_px / width_pts) * 72
-        dpi_y = (height_px / height_pts) * 72
-        avg_dpi = (dpi_x + dpi_y) / 2
-        
-        doc.close()
-        
-        # For vector PDFs, check if embedded images meet requirements
-        # This is a simplified check - in production, you'd check all embedded images
-        valid = avg_dpi >= min_dpi or _check_pdf_embedded_images(file_path, min_dpi)
-        
-        return {
-            "valid": valid,
-            "resolution_dpi": round(avg_dpi, 1),
-            "resolution_x_dpi": round(dpi_x, 1),
-            "resolution_y_dpi": round(dpi_y, 1),
-            "width_px": width_px,
-            "height_px": height_px,
-            "width_inches": round(width_pts / 72, 2),
-            "height_inches": round(height_pts / 72, 2),
-            "min_required_dpi": min_dpi,
-            "file_type": "PDF"
-        }
+        with fitz.open(file_path) as doc:
+            if len(doc) == 0:
+                return {
+                    "valid": False,
+                    "error": "PDF file is empty",
+                    "resolution_dpi": None
+                }
+            
+            # Get page dimensions in points (72 points = 1 inch)
+            rect = doc[0].rect
+            width_pts = rect.width
+            height_pts = rect.height
+            page_count = len(doc)
+            
+            images = _check_pdf_embedded_images(doc, min_dpi)
     except Exception as e:
         return {
             "valid": False,
             "error": f"Error reading PDF: {str(e)}",
             "resolution_dpi": None
         }
+    
+    measured = [image for image in images if not image["ignored"]]
+    result = {
+        "width_inches": round(width_pts / 72, 2),
+        "height_inches": round(height_pts / 72, 2),
+        "page_count": page_count,
+        "min_required_dpi": min_dpi,
+        "file_type": "PDF",
+        "images": images
+    }
+    
+    if not measured:
+        # Pure vector artwork prints sharp at any size
+        result.update({
+            "valid": True,
+            "vector_only": True,
+            "resolution_dpi": None
+        })
+        return result
+    
+    worst = min(measured, key=lambda image: image["effective_dpi"])
+    result.update({
+        "valid": worst["effective_dpi"] >= min_dpi,
+        "vector_only": False,
+        "resolution_dpi": worst["effective_dpi"],
+        "resolution_x_dpi": worst["dpi_x"],
+        "resolution_y_dpi": worst["dpi_y"],
+        "width_px": worst["width_px"],
+        "height_px": worst["height_px"],
+        "worst_image_page": worst["page"],
+        "low_res_images": sum(1 for image in measured if not image["valid"])
+    })
+    return result
 
-def _check_pdf_embedded_images(file_path: Path, min_dpi: int) -> bool:
-    """Check if embedded images in PDF meet DPI requirements."""
-    if not PYMUPDF_AVAILABLE:
-        return False
+def _check_pdf_embedded_images(doc: "fitz.Document", min_dpi: int) -> List[Dict[str, Any]]:
+    """
+    Compute the effective DPI of every image placement in a PDF.
     
-    try:
-        doc = fitz.open(file_path)
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            image_list = page.get_images()
-            for img_idx, img in enumerate(image_list):
-                xref = img[0]
-                base_image = doc.extract_image(xref)
-                img_bytes = base_image["image"]
-                # Check image dimensions
-                # This is simplified - in production, check actual DPI
-                pass
-        doc.close()
-        return True  # Simplified - assume valid if we can read it
-    except:
-        return False
+    Uses each image's pixel size and its placement transform on the page
+    (page.get_image_info), so no image data is extracted or decoded.
+    
+    Returns:
+        List of per-placement reports
+    """
+    images = []
+    for page_num in range(len(doc)):
+        page = doc[page_num]
+        for info in page.get_image_info(xrefs=True):
+            width_px = info["width"]
+            height_px = info["height"]
+            
+            # The transform maps the image's unit square onto the page; the
+            # lengths of its column vectors are the placed size in points,
+            # which stays correct for rotated or skewed placements.
+            a, b, c, d = info["transform"][:4]
+            placed_width_pts = math.hypot(a, b)
+            placed_height_pts = math.hypot(c, d)
+            
+            report = {
+                "page": page_num + 1,
+                "xref": info.get("xref", 0),
+                "width_px": width_px,
+                "height_px": height_px,
+                "placed_width_inches": round(placed_width_pts / 72, 2),
+                "placed_height_inches": round(placed_height_pts / 72, 2),
+                "ignored": False
+            }
+            
+            # Solid fills, hairlines and invisible placements aren't photographic content
+            if width_px <= MIN_MEASURED_IMAGE_PX or height_px <= MIN_MEASURED_IMAGE_PX \
+                    or placed_width_pts < 1 or placed_height_pts < 1:
+                report.update({"ignored": True, "dpi_x": None, "dpi_y": None,
+                               "effective_dpi": None, "valid": True})
+                images.append(report)
+                continue
+            
+            dpi_x = width_px / (placed_width_pts / 72)
+            dpi_y = height_px / (placed_height_pts / 72)
+            effective_dpi = min(dpi_x, dpi_y)  # Use worst case
+            
+            report.update({
+                "dpi_x": round(dpi_x, 1),
+                "dpi_y": round(dpi_y, 1),
+                "effective_dpi": round(effective_dpi, 1),
+                "valid": effective_dpi >= min_dpi
+            })
+            images.append(report)
+    return images
+
+def _pillow_metadata(file_path: Path) -> ImageMetadata:
+    """Read image metadata with Pillow for formats the header probe doesn't parse."""
+    with Image.open(file_path) as img:
+        dpi = img.info.get("dpi")
+        if not dpi and "resolution" in img.info:
+            dpi = img.info["resolution"]
+        return ImageMetadata(
+            format=img.format,
+            width=img.size[0],
+            height=img.size[1],
+            dpi=tuple(dpi) if dpi else None,
+            color_mode=img.mode,
+            has_icc_profile="icc_profile" in img.info
+        )
 
 def _check_image_resolution(file_path: Path, min_dpi: int) -> Dict[str, Any]:
-    """Check image resolution using Pillow."""
-    if not PIL_AVAILABLE:
-        return {
-            "valid": False,
-            "error": "Pillow not available. Install with: pip install pillow",
-            "resolution_dpi": None
-        }
-    
+    """Check image resolution from the file headers, without decoding pixels."""
     try:
-        img = Image.open(file_path)
-        width_px, height_px = img.size
+        try:
+            metadata = probe_image(file_path)
+        except ProbeError:
+            if not PIL_AVAILABLE:
+                return {
+                    "valid": False,
+                    "error": "Pillow not available. Install with: pip install pillow",
+                    "resolution_dpi": None
+                }
+            metadata = _pillow_metadata(file_path)
         
-        # Get DPI from EXIF data
-        dpi_x = img.info.get("dpi", (72, 72))[0]
-        dpi_y = img.info.get("dpi", (72, 72))[1]
+        # Size as printed, i.e. after EXIF orientation (matches the order form's measurement)
+        width_px, height_px = metadata.display_size
         
-        # If DPI is not in metadata, calculate from physical size if available
-        if dpi_x == 72 and "resolution" in img.info:
-            dpi_x, dpi_y = img.info["resolution"]
+        # Get DPI from header metadata (JFIF/EXIF, pHYs, TIFF resolution tags)
+        dpi_x, dpi_y = metadata.dpi or (72, 72)
+        if metadata.orientation in (5, 6, 7, 8):  # rotated 90 degrees
+            dpi_x, dpi_y = dpi_y, dpi_x
         
         # Fallback: assume 72 DPI if not specified (common for web images)
         if dpi_x == 1 or dpi_x == 0:
@@ -187,8 +292,10 @@ def _check_image_resolution(file_path: Path, min_dpi: int) -> Dict[str, Any]:
             "width_inches": round(width_inches, 2),
             "height_inches": round(height_inches, 2),
             "min_required_dpi": min_dpi,
-            "file_type": img.format,
-            "color_mode": img.mode
+            "file_type": metadata.format,
+            "color_mode": metadata.color_mode,
+            "orientation": metadata.orientation,
+            "has_icc_profile": metadata.has_icc_profile
         }
     except Exception as e:
         return {
@@ -197,7 +304,151 @@ def _check_image_resolution(file_path: Path, min_dpi: int) -> Dict[str, Any]:
             "resolution_dpi": None
         }
 
+@instrumented(TOOL)
+def check_print_resolution(file_path: Union[str, Path], target_width_inch: float,
+                           target_height_inch: float) -> Dict[str, Any]:
+    """
+    Check whether a file has enough pixels to print at a given size.
+    
+    This is the order form's Layer 2 check: unlike check_resolution, the DPI
+    comes from the print size rather than the file's own DPI metadata.
+    
+    Args:
+        file_path: Path to the image or PDF
+        target_width_inch: Print width in inches
+        target_height_inch: Print height in inches
+    
+    Returns:
+        Dictionary with DPI analysis and quality status
+    """
+    return evaluate_resolution(measure_artwork(file_path), target_width_inch, target_height_inch)
 
+@instrumented(TOOL)
+def measure_artwork(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Pixel dimensions (and color metadata) of an uploaded file.
+    
+    This is the expensive half of check_print_resolution; the DPI for any
+    print size follows from it by arithmetic (evaluate_resolution).
+    
+    Returns:
+        Dictionary with width_px/height_px (+ color_mode, orientation,
+        has_icc_profile for probed images), or {"error": ..., "valid": False}
+    """
+    # Results are cached on disk by file digest; errors are not cached.
+    # The measurement runs in the warm process pool when that's enabled.
+    file_path = str(file_path)
+    cache = get_result_cache()
+    if cache is None:
+        return run_cpu_bound(_measure_artwork, file_path)
+    return cache.cached_file_result(
+        "tools.measure_artwork",
+        file_path,
+        {"pdf_dpi": PDF_RENDER_DPI},
+        lambda: run_cpu_bound(_measure_artwork, file_path),
+        should_cache=lambda result: "error" not in result
+    )
 
+def _pdf_first_page_pixels(file_path: str) -> Optional[tuple]:
+    """Pixel size of page 1 at PDF_RENDER_DPI, read from pdfinfo instead of rasterizing."""
+    try:
+        # e.g. "612 x 792 pts (letter)"
+        parts = pdfinfo_from_path(file_path)["Page size"].split()
+        return (round(float(parts[0]) / 72.0 * PDF_RENDER_DPI),
+                round(float(parts[2]) / 72.0 * PDF_RENDER_DPI))
+    except Exception:
+        pass
+    # Fall back to rendering just the first page
+    images = convert_from_path(file_path, dpi=PDF_RENDER_DPI, first_page=1, last_page=1)
+    return images[0].size if images else None
 
+def _measure_artwork(file_path: str) -> Dict[str, Any]:
+    """Uncached implementation of measure_artwork."""
+    try:
+        if file_path.lower().endswith('.pdf'):
+            if not PDF2IMAGE_AVAILABLE:
+                return {
+                    "error": "pdf2image not available. Install with: pip install pdf2image",
+                    "valid": False
+                }
+            page_size = _pdf_first_page_pixels(file_path)
+            if not page_size:
+                return {
+                    "error": "Could not open image file.",
+                    "valid": False
+                }
+            width_px, height_px = page_size
+            return {"width_px": width_px, "height_px": height_px}
+        
+        try:
+            # Read dimensions straight from the file headers - no pixel decode
+            metadata = probe_image(file_path)
+        except ProbeError:
+            # Formats the probe doesn't parse (GIF, BMP, WebP, ...)
+            if not PIL_AVAILABLE:
+                return {
+                    "error": "Pillow not available. Install with: pip install pillow",
+                    "valid": False
+                }
+            with Image.open(file_path) as img:
+                width_px, height_px = img.size
+            return {"width_px": width_px, "height_px": height_px}
+        
+        width_px, height_px = metadata.display_size
+        return {
+            "width_px": width_px,
+            "height_px": height_px,
+            "color_mode": metadata.color_mode,
+            "orientation": metadata.orientation,
+            "has_icc_profile": metadata.has_icc_profile
+        }
+    except Exception as e:
+        return {
+            "error": f"Error checking resolution: {str(e)}",
+            "valid": False
+        }
 
+def evaluate_resolution(measurement: Mapping[str, Any], target_width_inch: float,
+                        target_height_inch: float) -> Dict[str, Any]:
+    """DPI and quality of a measured file printed at the target size (pure arithmetic)."""
+    if "error" in measurement:
+        return dict(measurement)
+    
+    width_px = measurement["width_px"]
+    height_px = measurement["height_px"]
+    
+    dpi_width = width_px / target_width_inch
+    dpi_height = height_px / target_height_inch
+    effective_dpi = min(dpi_width, dpi_height)  # Use worst case
+    
+    min_dpi = SHOP_CAPABILITIES["file_requirements"]["min_dpi"]
+    recommended_dpi = SHOP_CAPABILITIES["file_requirements"]["recommended_dpi"]
+    
+    if effective_dpi >= recommended_dpi:
+        quality = "high"
+        message = f"Excellent quality: {effective_dpi:.1f} DPI (Recommended: {recommended_dpi}+ DPI)"
+    elif effective_dpi >= min_dpi:
+        quality = "acceptable"
+        message = f"Acceptable quality: {effective_dpi:.1f} DPI (Minimum: {min_dpi} DPI)"
+    else:
+        quality = "low"
+        message = f"Low quality: {effective_dpi:.1f} DPI (Minimum required: {min_dpi} DPI). Image may appear pixelated."
+    
+    result = {
+        "valid": effective_dpi >= min_dpi,
+        "quality": quality,
+        "dpi": round(effective_dpi, 1),
+        "dpi_width": round(dpi_width, 1),
+        "dpi_height": round(dpi_height, 1),
+        "pixel_dimensions": f"{width_px}x{height_px}",
+        "target_size": f"{target_width_inch}\"x{target_height_inch}\"",
+        "message": message,
+        "meets_minimum": effective_dpi >= min_dpi,
+        "meets_recommended": effective_dpi >= recommended_dpi
+    }
+    
+    for key in ("color_mode", "orientation", "has_icc_profile"):
+        if key in measurement:
+            result[key] = measurement[key]
+    
+    return result
@@ -4,6 +4,14 @@ This defines what the print shop CAN and CANNOT do.
 Used by Layer 1: Spec-Check Guardrail
 """
 
+from .paper_index import PaperIndex
+
+# Handle both relative and absolute imports
+try:
+    from instrumentation import TOOL, instrumented
+except ImportError:
+    from ..instrumentation import TOOL, instrumented
+
 SHOP_CAPABILITIES = {
     "paper_stocks": {
         "available": [
@@ -60,6 +68,10 @@ SHOP_CAPABILITIES = {
     ]
 }
 
+# Every spelling of the stocked papers, resolved once ("110 lb card stock" -> "110lb Cardstock")
+PAPER_INDEX = PaperIndex(SHOP_CAPABILITIES["paper_stocks"]["available"])
+
+@instrumented(TOOL)
 def check_spec_compatibility(order_spec):
     """
     Layer 1: Spec-Check Guardrail
@@ -79,7 +91,7 @@ def check_spec_compatibility(order_spec):
         paper = order_spec['paper'].lower()
         if any(restricted in paper for restricted in ['black', 'metallic', 'foil']):
             errors.append(f"Paper type '{order_spec['paper']}' is not available. We don't support black cardstock with white ink, metallic, or foil papers.")
-        elif paper not in [p.lower() for p in SHOP_CAPABILITIES["paper_stocks"]["available"]]:
+        elif PAPER_INDEX.resolve(order_spec['paper']) is None:
             warnings.append(f"Paper '{order_spec['paper']}' may not be in stock. Standard options: {', '.join(SHOP_CAPABILITIES['paper_stocks']['available'])}")
     
     # Check ink requirements